@@ -8,7 +8,7 @@ import platform
 import time
 import shutil
 from http.cookiejar import MozillaCookieJar
-from flask import Flask, render_template, request, jsonify, send_from_directory, send_file
+from flask import Flask, render_template, request, jsonify, send_from_directory, send_file, Response
 from googleapiclient.discovery import build
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
@@ -19,6 +19,14 @@ import traceback
 import logging
 import subprocess
 import sys # Added for sys.executable
+from segmented_downloader import SegmentedDownloader
+import metrics
+from server_timing import timed_view
+from source_fanout import FanOut, SourceTimeout
+from metadata_cache import get_metadata_cache
+from info_store import InfoStore
+from format_resolver import resolve_stream
+from parallel_fetch import ParallelFetch
 
 # from vpn_handler import get_ytdlp_proxy_url, mark_proxy_failed
 
@@ -67,6 +75,25 @@ API_KEY = os.getenv("YOUTUBE_API_KEY")
 # Get the proxy URL from environment variable
 YTDLP_PROXY_URL_ENV = os.getenv("YTDLP_PROXY_URL")
 
+# Upstream endpoints (point these at benchmarks/stubs.py for load tests)
+YOUTUBE_BASE_URL = os.getenv("YOUTUBE_BASE_URL", "https://www.youtube.com").rstrip("/")
+YOUTUBE_API_ENDPOINT = os.getenv("YOUTUBE_API_ENDPOINT")
+
+# Parallel byte-range connections used when fetching a media stream URL
+DOWNLOAD_SEGMENTS = int(os.getenv("DOWNLOAD_SEGMENTS", "4"))
+
+# /fetch_info queries yt-dlp, the Data API and the watch page at once; each
+# source gets its own deadline and whatever has returned by then is merged
+FETCH_INFO_YTDLP_DEADLINE = float(os.getenv("FETCH_INFO_YTDLP_DEADLINE", "25"))
+FETCH_INFO_API_DEADLINE = float(os.getenv("FETCH_INFO_API_DEADLINE", "10"))
+FETCH_INFO_SCRAPE_DEADLINE = float(os.getenv("FETCH_INFO_SCRAPE_DEADLINE", "15"))
+# A run past its deadline keeps its pool worker; a stalled connection must not hold it forever
+FETCH_INFO_YTDLP_SOCKET_TIMEOUT = float(os.getenv("FETCH_INFO_YTDLP_SOCKET_TIMEOUT", "10"))
+fetch_info_fanout = FanOut(max_workers=int(os.getenv("FETCH_INFO_WORKERS", "12")))
+
+# yt-dlp info JSON kept per video so /download reuses the /fetch_info extraction (--load-info-json)
+info_store = InfoStore(os.getenv("INFO_JSON_DIR") or None, ttl=int(os.getenv("INFO_JSON_TTL", "1800")))
+
 if not API_KEY:
     app.logger.warning("YOUTUBE_API_KEY environment variable is not set. API dependent features may fail.")
 
@@ -110,7 +137,8 @@ def detect_browser_from_user_agent(user_agent_string):
 def get_youtube_service():
     if not API_KEY:
         raise ValueError("YouTube API key is required but not set")
-    return build('youtube', 'v3', developerKey=API_KEY, cache_discovery=False)
+    client_options = {'api_endpoint': YOUTUBE_API_ENDPOINT} if YOUTUBE_API_ENDPOINT else None
+    return build('youtube', 'v3', developerKey=API_KEY, cache_discovery=False, client_options=client_options)
 
 # Format numbers for display (e.g., 1000 -> 1K, 1000000 -> 1M)
 def format_count(count_str):
@@ -202,7 +230,7 @@ def get_youtube_quality_from_web(video_id):
     Scrape YouTube webpage to detect actual available video qualities.
     This is more reliable when yt-dlp is blocked by YouTube's bot detection.
     """
-    url = f"https://www.youtube.com/watch?v={video_id}"
+    url = f"{YOUTUBE_BASE_URL}/watch?v={video_id}"
     
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -218,92 +246,95 @@ def get_youtube_quality_from_web(video_id):
         app.logger.info(f"Attempting web scraping for video {video_id}...")
         response = requests.get(url, headers=headers, timeout=15)
         response.raise_for_status()
-        html_content = response.text
-        
-        # Extract from ytInitialPlayerResponse
-        player_response_pattern = r'var ytInitialPlayerResponse = ({.*?});'
-        match = re.search(player_response_pattern, html_content)
-        
-        if match:
-            try:
-                player_data = json.loads(match.group(1))
-                streaming_data = player_data.get('streamingData', {})
-                
-                # Check adaptive formats (separate video and audio streams)
-                adaptive_formats = streaming_data.get('adaptiveFormats', [])
-                formats = streaming_data.get('formats', [])
-                
-                available_heights = set()
-                
-                # Process adaptive formats (usually higher quality)
-                for fmt in adaptive_formats:
-                    if fmt.get('mimeType', '').startswith('video/') and 'height' in fmt:
-                        height = fmt['height']
-                        available_heights.add(height)
-                        app.logger.info(f"Web scraping found adaptive format: {height}p - {fmt.get('qualityLabel', '?')}")
-                
-                # Process regular formats
-                for fmt in formats:
-                    if 'height' in fmt:
-                        height = fmt['height']
-                        available_heights.add(height)
-                        app.logger.info(f"Web scraping found regular format: {height}p - {fmt.get('qualityLabel', '?')}")
-                
-                if available_heights:
-                    max_height = max(available_heights)
-                    sorted_heights = sorted(available_heights, reverse=True)
-                    app.logger.info(f"Web scraping SUCCESS: Available resolutions for {video_id}: {sorted_heights}")
-                    return max_height, sorted_heights
-                    
-            except json.JSONDecodeError as e:
-                app.logger.warning(f"Could not parse player response JSON: {e}")
-        
-        # Fallback: Look for quality mentions in page content
-        quality_patterns = [
-            r'"qualityLabel":"([^"]*4K[^"]*)",',
-            r'"qualityLabel":"([^"]*2160p[^"]*)",', 
-            r'"qualityLabel":"([^"]*1440p[^"]*)",',
-            r'"qualityLabel":"([^"]*1080p[^"]*)",',
-            r'"qualityLabel":"([^"]*720p[^"]*)",'
-        ]
-        
-        found_qualities = set()
-        for pattern in quality_patterns:
-            matches = re.findall(pattern, html_content, re.IGNORECASE)
-            for match in matches:
-                found_qualities.add(match)
-                app.logger.info(f"Found quality label: {match}")
-        
-        if found_qualities:
-            # Parse height from quality labels
-            heights = set()
-            for quality in found_qualities:
-                if '4K' in quality or '2160p' in quality:
-                    heights.add(2160)
-                elif '1440p' in quality:
-                    heights.add(1440)
-                elif '1080p' in quality:
-                    heights.add(1080)
-                elif '720p' in quality:
-                    heights.add(720)
-                elif '480p' in quality:
-                    heights.add(480)
-                elif '360p' in quality:
-                    heights.add(360)
-            
-            if heights:
-                max_height = max(heights)
-                sorted_heights = sorted(heights, reverse=True)
-                app.logger.info(f"Web scraping extracted heights from quality labels: {sorted_heights}")
-                return max_height, sorted_heights
-        
-        app.logger.warning(f"Web scraping found no quality information for {video_id}")
-        return None, []
+        return parse_watch_page_qualities(video_id, response.text)
         
     except Exception as e:
+        metrics.record_failure("web_scrape", e)
         app.logger.error(f"Error scraping YouTube page for {video_id}: {e}")
         return None, []
 
+def parse_watch_page_qualities(video_id, html_content):
+    """Return (max_height, heights) from a watch page's player response or quality labels."""
+    # Extract from ytInitialPlayerResponse
+    player_response_pattern = r'var ytInitialPlayerResponse = ({.*?});'
+    match = re.search(player_response_pattern, html_content)
+    
+    if match:
+        try:
+            player_data = json.loads(match.group(1))
+            streaming_data = player_data.get('streamingData', {})
+            
+            # Check adaptive formats (separate video and audio streams)
+            adaptive_formats = streaming_data.get('adaptiveFormats', [])
+            formats = streaming_data.get('formats', [])
+            
+            available_heights = set()
+            
+            # Process adaptive formats (usually higher quality)
+            for fmt in adaptive_formats:
+                if fmt.get('mimeType', '').startswith('video/') and 'height' in fmt:
+                    height = fmt['height']
+                    available_heights.add(height)
+                    app.logger.info(f"Web scraping found adaptive format: {height}p - {fmt.get('qualityLabel', '?')}")
+            
+            # Process regular formats
+            for fmt in formats:
+                if 'height' in fmt:
+                    height = fmt['height']
+                    available_heights.add(height)
+                    app.logger.info(f"Web scraping found regular format: {height}p - {fmt.get('qualityLabel', '?')}")
+            
+            if available_heights:
+                max_height = max(available_heights)
+                sorted_heights = sorted(available_heights, reverse=True)
+                app.logger.info(f"Web scraping SUCCESS: Available resolutions for {video_id}: {sorted_heights}")
+                return max_height, sorted_heights
+                
+        except json.JSONDecodeError as e:
+            app.logger.warning(f"Could not parse player response JSON: {e}")
+    
+    # Fallback: Look for quality mentions in page content
+    quality_patterns = [
+        r'"qualityLabel":"([^"]*4K[^"]*)",',
+        r'"qualityLabel":"([^"]*2160p[^"]*)",', 
+        r'"qualityLabel":"([^"]*1440p[^"]*)",',
+        r'"qualityLabel":"([^"]*1080p[^"]*)",',
+        r'"qualityLabel":"([^"]*720p[^"]*)",'
+    ]
+    
+    found_qualities = set()
+    for pattern in quality_patterns:
+        matches = re.findall(pattern, html_content, re.IGNORECASE)
+        for match in matches:
+            found_qualities.add(match)
+            app.logger.info(f"Found quality label: {match}")
+    
+    if found_qualities:
+        # Parse height from quality labels
+        heights = set()
+        for quality in found_qualities:
+            if '4K' in quality or '2160p' in quality:
+                heights.add(2160)
+            elif '1440p' in quality:
+                heights.add(1440)
+            elif '1080p' in quality:
+                heights.add(1080)
+            elif '720p' in quality:
+                heights.add(720)
+            elif '480p' in quality:
+                heights.add(480)
+            elif '360p' in quality:
+                heights.add(360)
+        
+        if heights:
+            max_height = max(heights)
+            sorted_heights = sorted(heights, reverse=True)
+            app.logger.info(f"Web scraping extracted heights from quality labels: {sorted_heights}")
+            return max_height, sorted_heights
+    
+    app.logger.warning(f"Web scraping found no quality information for {video_id}")
+    return None, []
+
 def process_cookie_string(cookies_content_str):
     """
     Process cookie string to ensure it's properly formatted for Netscape format.
@@ -398,6 +429,104 @@ def create_cookie_file(cookies_content, identifier="default"):
             pass
         return None
 
+def extract_info_for_fetch(url, video_id, ydl_opts):
+    """yt-dlp metadata for /fetch_info (no download), also kept in the info store for /download."""
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl, metrics.time_stage("ytdlp_extract"):
+        info_dict = ydl.extract_info(url, download=False)
+        try:
+            info_store.save(video_id, ydl.sanitize_info(info_dict))
+        except (OSError, TypeError, ValueError) as e:
+            app.logger.warning(f"Could not store extracted info for {video_id}: {e}")
+    return info_dict
+
+def resolve_download_info(video_id, url, yt_dlp_base_cmd, temp_dir, reuse=True):
+    """(info_json_path, info_dict) for a download, extracting at most once.
+
+    Uses the info /fetch_info stored for this video while it is fresh;
+    otherwise runs one ``yt-dlp -J`` with the download's own options. With
+    ``reuse=False`` (user cookies) nothing is shared: the extraction is
+    written to ``temp_dir`` only. Returns (None, None) if extraction fails,
+    in which case callers fall back to passing the URL to yt-dlp.
+    """
+    if reuse:
+        path = info_store.path_for(video_id)
+        info_dict = info_store.load(video_id) if path else None
+        if info_dict:
+            app.logger.info(f"Reusing extracted info for {video_id} from {path}")
+            return path, info_dict
+
+    extract_cmd = yt_dlp_base_cmd + ['-J', '--no-warnings', '--no-check-certificate', url]
+    app.logger.info(f"Extracting info once for {video_id}: {' '.join(extract_cmd)}")
+    with metrics.time_stage("ytdlp_extract"):
+        process_info = subprocess.run(extract_cmd, capture_output=True, text=True, encoding='utf-8', timeout=60)
+    if process_info.returncode != 0:
+        app.logger.warning(f"yt-dlp info extraction failed for {video_id}: {process_info.stderr}")
+        return None, None
+    try:
+        info_dict = json.loads(process_info.stdout)
+    except ValueError as e:
+        app.logger.warning(f"yt-dlp returned unreadable info for {video_id}: {e}")
+        return None, None
+
+    if reuse and info_store.save(video_id, info_dict):
+        return info_store.path_for(video_id), info_dict
+    path = os.path.join(temp_dir, 'info.json')
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(info_dict, fh)
+    return path, info_dict
+
+def fetch_api_details(video_id):
+    """(video_response, channel_response) from the Data API.
+
+    The channel lookup needs the video's channel ID, so the two calls run
+    back to back; channel_response is None when the video is not found.
+    """
+    youtube_service = get_youtube_service()
+    with metrics.time_stage("data_api"):
+        video_response = youtube_service.videos().list(
+            part='snippet,statistics,contentDetails',
+            id=video_id
+        ).execute()
+    if not video_response.get('items'):
+        return video_response, None
+    channel_id = video_response['items'][0]['snippet'].get('channelId')
+    with metrics.time_stage("data_api"):
+        channel_response = youtube_service.channels().list(
+            part='snippet,statistics',
+            id=channel_id
+        ).execute()
+    return video_response, channel_response
+
+def format_stats(video_statistics, channel_statistics):
+    """Display counts for a video and its channel."""
+    return {
+        'subscribers': format_count(channel_statistics.get('subscriberCount', '0')),
+        'likes': format_count(video_statistics.get('likeCount', '0')),
+        'views': format_count(video_statistics.get('viewCount', '0')),
+        'comments': format_count(video_statistics.get('commentCount', '0')),
+    }
+
+def refresh_cached_stats(video_id, cached):
+    """Cached /fetch_info fields with fresh counts from the Data API, or None if the API gave none."""
+    results, errors = fetch_info_fanout.run({
+        "data_api": (lambda: fetch_api_details(video_id), FETCH_INFO_API_DEADLINE),
+    })
+    if "data_api" in errors:
+        metrics.record_failure("data_api", errors["data_api"])
+        app.logger.warning(f"Refreshing stats for {video_id} failed: {errors['data_api']}")
+        return None
+    video_response, channel_response = results["data_api"]
+    if not video_response.get('items') or not (channel_response or {}).get('items'):
+        return None
+    stats = format_stats(video_response['items'][0].get('statistics', {}),
+                         channel_response['items'][0].get('statistics', {}))
+    get_metadata_cache().store(video_id, stats, classes=("stats",))
+    return {**cached, **stats}
+
+def scrape_qualities_for_fetch(video_id):
+    with metrics.time_stage("web_scrape"):
+        return get_youtube_quality_from_web(video_id)
+
 # Custom progress hook to log yt-dlp status
 def ydl_progress_hook(d):
     if d['status'] == 'downloading':
@@ -412,6 +541,7 @@ def index():
     return render_template('index.html')
 
 @app.route('/fetch_info', methods=['POST'])
+@timed_view
 def fetch_info():
     data = request.json
     url = data.get('url')
@@ -420,6 +550,20 @@ def fetch_info():
     if not video_id:
         return jsonify({'error': 'Invalid YouTube URL'}), 400
 
+    # Hot videos answer from the metadata cache; expired counts alone only cost a Data API call
+    with metrics.time_stage("cache_lookup"):
+        cached, stale_classes = get_metadata_cache().lookup(video_id)
+    # The raw format list is only cached in memory; entries read back from SQLite have none
+    cached.setdefault('formats', [])
+    if not stale_classes:
+        app.logger.info(f"Metadata cache hit for {video_id}")
+        return jsonify(cached)
+    if stale_classes == {"stats"}:
+        refreshed = refresh_cached_stats(video_id, cached)
+        if refreshed:
+            app.logger.info(f"Metadata cache hit for {video_id} (stats refreshed)")
+            return jsonify(refreshed)
+
     temp_ydl_opts_for_info = {
         'quiet': False,  # Keep logging for debugging
         'no_warnings': False,
@@ -429,6 +573,7 @@ def fetch_info():
         'format': 'best',
         'ignoreerrors': True,
         'no_check_certificate': True,
+        'socket_timeout': FETCH_INFO_YTDLP_SOCKET_TIMEOUT,
         # Enhanced YouTube extractor arguments to bypass restrictions
         'extractor_args': {
             'youtube': {
@@ -454,10 +599,25 @@ def fetch_info():
     if EFFECTIVE_YTDLP_PROXY_URL:
         temp_ydl_opts_for_info['proxy'] = EFFECTIVE_YTDLP_PROXY_URL
 
-    try:
-        with yt_dlp.YoutubeDL(temp_ydl_opts_for_info) as ydl:
-                    info_dict = ydl.extract_info(url, download=False)
-    except Exception as e:
+    results, errors = fetch_info_fanout.run({
+        "ytdlp_extract": (lambda: extract_info_for_fetch(url, video_id, temp_ydl_opts_for_info),
+                          FETCH_INFO_YTDLP_DEADLINE),
+        "data_api": (lambda: fetch_api_details(video_id), FETCH_INFO_API_DEADLINE),
+        "web_scrape": (lambda: scrape_qualities_for_fetch(video_id), FETCH_INFO_SCRAPE_DEADLINE),
+    })
+    info_dict = results.get("ytdlp_extract") or {}
+    web_max_height, web_available_heights = results.get("web_scrape") or (None, [])
+    if "web_scrape" in errors:
+        metrics.record_failure("web_scrape", errors["web_scrape"])
+        app.logger.warning(f"Web scraping for {video_id} gave no result: {errors['web_scrape']}")
+
+    e = errors.get("ytdlp_extract")
+    if isinstance(e, SourceTimeout):
+        # Carry on with the API and web data; only the raw format list is missing
+        metrics.record_failure("ytdlp_extract", e)
+        app.logger.warning(f"yt-dlp info for {video_id} missed its deadline, continuing without it")
+    elif e is not None:
+        metrics.record_failure("ytdlp_extract", e)
         app.logger.error(f"Error fetching video info with yt-dlp: {str(e)}")
         # Check for common error patterns
         error_lower = str(e).lower()
@@ -469,13 +629,20 @@ def fetch_info():
             return jsonify({'error': 'Video is not available in your region.'}), 451
         return jsonify({'error': 'Failed to fetch video details. The video may be unavailable or the URL is incorrect.'}), 500
 
-    # API call to get more details like subscribers, likes
+    if not info_dict and "data_api" in errors:
+        # Neither yt-dlp nor the Data API produced details; there is no title or format list to return
+        api_error = errors["data_api"]
+        metrics.record_failure("data_api", api_error)
+        app.logger.error(f"No video details for {video_id}: yt-dlp {e or 'returned nothing'}, Data API {api_error}")
+        if isinstance(e, SourceTimeout) and isinstance(api_error, SourceTimeout):
+            return jsonify({'error': 'Timed out fetching video details. Please try again.'}), 504
+        return jsonify({'error': 'Could not fetch video details from YouTube. Please try again.'}), 502
+
+    # API details like subscribers, likes
     try:
-        youtube_service = get_youtube_service()
-        video_response = youtube_service.videos().list(
-            part='snippet,statistics,contentDetails',
-            id=video_id
-        ).execute()
+        if "data_api" in errors:
+            raise errors["data_api"]
+        video_response, channel_response = results["data_api"]
 
         if not video_response.get('items'):
             return jsonify({'error': 'Video not found via YouTube API'}), 404
@@ -484,11 +651,6 @@ def fetch_info():
         video_statistics = video_response['items'][0]['statistics']
         video_content_details = video_response['items'][0].get('contentDetails', {})
         channel_id = video_snippet.get('channelId')
-
-        channel_response = youtube_service.channels().list(
-            part='snippet,statistics',
-            id=channel_id
-        ).execute()
         
         channel_snippet = channel_response['items'][0]['snippet']
         channel_statistics = channel_response['items'][0]['statistics']
@@ -517,10 +679,7 @@ def fetch_info():
         else:
             app.logger.info(f"yt-dlp returned no usable video formats for {video_id}")
         
-        # CRITICAL FIX: Always try web scraping FIRST since it's more reliable than yt-dlp
-        app.logger.info(f"🔍 Starting web scraping quality detection for {video_id} (primary method)...")
-        web_max_height, web_available_heights = get_youtube_quality_from_web(video_id)
-        
+        # CRITICAL FIX: Always prefer web scraping since it's more reliable than yt-dlp
         if web_max_height and web_available_heights:
             max_height = web_max_height
             available_heights = web_available_heights
@@ -661,25 +820,25 @@ def fetch_info():
                 channel_snippet.get('thumbnails', {}).get('default', {}).get('url')
             ),
             'channel_id': channel_id,
-            'subscribers': format_count(channel_statistics.get('subscriberCount', '0')),
-            'likes': format_count(video_statistics.get('likeCount', '0')),
-            'views': format_count(video_statistics.get('viewCount', '0')),
-            'comments': format_count(video_statistics.get('commentCount', '0')),
+            **format_stats(video_statistics, channel_statistics),
             'description': video_snippet.get('description', '') or 'No description has been added to this video.',
             'duration': duration,
             'max_quality': max_quality,
             'available_qualities': available_qualities,
             'formats': info_dict.get('formats', [])
         }
+        # Without yt-dlp the format list is empty; leave that class uncached so the next request retries
+        get_metadata_cache().store(
+            video_id, detailed_info,
+            classes=("static", "stats") if "ytdlp_extract" in errors else None,
+        )
         return jsonify(detailed_info)
 
     except Exception as e:
+        metrics.record_failure("data_api", e)
         app.logger.error(f"Error fetching extended details from YouTube API: {str(e)}")
         # Fallback when API fails - try web scraping first, then yt-dlp
         
-        app.logger.info(f"🔍 Fallback: Trying web scraping for {video_id}...")
-        web_max_height, web_available_heights = get_youtube_quality_from_web(video_id)
-        
         if web_max_height and web_available_heights:
             max_height = web_max_height
             available_heights = web_available_heights
@@ -783,6 +942,7 @@ def fetch_info():
         return jsonify(fallback_info)
 
 @app.route('/download', methods=['POST'])
+@timed_view
 def download_video():
     data = request.json
     url = data.get('url')
@@ -845,6 +1005,14 @@ def download_video():
             if EFFECTIVE_YTDLP_PROXY_URL:
                 yt_dlp_base_cmd.extend(['--proxy', EFFECTIVE_YTDLP_PROXY_URL])
 
+            # One extraction per download: every later yt-dlp call loads this info instead of the URL.
+            # Info extracted with a user's cookies is not shared with other requests.
+            info_json_path, download_info = resolve_download_info(
+                video_id, url, yt_dlp_base_cmd, temp_dir, reuse=not cookie_file_path
+            )
+            download_info = download_info or {}
+            yt_dlp_source = ['--load-info-json', str(info_json_path)] if info_json_path else [url]
+
             app.logger.info(f"Checking quality for MP3 download: {quality}")
             # --- Enhanced MP3 logic with better error handling ---
             if quality == 'mp3':
@@ -864,8 +1032,24 @@ def download_video():
                     
                     audio_url = None
                     successful_format = None
-                    
-                    for audio_format in audio_format_strategies:
+                    stream_headers = {}
+                    last_stderr = ""
+
+                    # With extracted info the whole strategy chain is applied in-process, once
+                    if download_info:
+                        stream = resolve_stream(download_info, audio_format_strategies)
+                        if stream:
+                            audio_url = stream['url']
+                            successful_format = stream['format_spec']
+                            stream_headers = stream['http_headers']
+                            app.logger.info(f"✅ Resolved format '{successful_format}' (id {stream['format_id']}, "
+                                            f"{stream['ext']}) in-process: {audio_url[:100]}...")
+                        else:
+                            # Same wording yt-dlp uses, so the error mapping below applies
+                            last_stderr = "Requested format is not available"
+
+                    # Without extracted info, ask yt-dlp for each strategy in turn
+                    for audio_format in ([] if download_info else audio_format_strategies):
                         app.logger.info(f"Trying audio format: {audio_format}")
                         
                         get_url_opts = yt_dlp_base_cmd + [
@@ -875,13 +1059,15 @@ def download_video():
                             '--ignore-errors',           # Continue on download errors
                             '--no-check-certificate',    # Skip SSL certificate verification
                             '--prefer-insecure',         # Prefer insecure connections if needed
-                            url
+                            *yt_dlp_source
                         ]
                         
                         app.logger.info(f"Running command: {' '.join(get_url_opts)}")
-                        process_get_url = subprocess.run(get_url_opts, capture_output=True, text=True, encoding='utf-8', timeout=30)
+                        with metrics.time_stage("ytdlp_extract"):
+                            process_get_url = subprocess.run(get_url_opts, capture_output=True, text=True, encoding='utf-8', timeout=30)
                         
                         app.logger.info(f"yt-dlp exit code: {process_get_url.returncode}")
+                        last_stderr = process_get_url.stderr
                         if process_get_url.returncode == 0:
                             audio_url = process_get_url.stdout.strip()
                             if audio_url.startswith('http'):
@@ -896,9 +1082,10 @@ def download_video():
                     if not audio_url or not audio_url.startswith('http'):
                         # All format strategies failed - likely YouTube blocking
                         app.logger.error("All audio format strategies failed")
-                        app.logger.error(f"Last yt-dlp STDERR: {process_get_url.stderr}")
+                        metrics.record_failure("ytdlp_extract", "no_audio_url")
+                        app.logger.error(f"Last yt-dlp STDERR: {last_stderr}")
                         
-                        stderr_str = str(process_get_url.stderr).lower() if process_get_url.stderr else ""
+                        stderr_str = str(last_stderr).lower() if last_stderr else ""
                         if "signature extraction failed" in stderr_str or "precondition check failed" in stderr_str:
                             return jsonify({
                                 'error': 'YouTube is blocking audio downloads due to bot detection. To download audio from this video, please provide cookies from an active YouTube session using the cookies field above.'
@@ -909,31 +1096,29 @@ def download_video():
                             }), 404
                         else:
                             return jsonify({
-                                'error': f'Failed to get audio URL from YouTube. This video may be restricted. Try providing cookies or contact support. Technical details: {process_get_url.stderr}'
+                                'error': f'Failed to get audio URL from YouTube. This video may be restricted. Try providing cookies or contact support. Technical details: {last_stderr}'
                             }), 500
 
                     # Step 2: Download the audio from the URL using requests
                     app.logger.info("Step 2/3: Downloading audio stream using Python requests...")
                     temp_audio_filepath = os.path.join(temp_dir, 'downloaded_audio_stream')
                     
-                    # Pass the user's User-Agent to requests to avoid being throttled
-                    headers = {
+                    # Send the headers yt-dlp recorded for the chosen format (the URL is tied to that client),
+                    # else pass the user's User-Agent to requests to avoid being throttled
+                    headers = stream_headers or {
                         'User-Agent': user_agent if user_agent else 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
                     }
                     
                     app.logger.info(f"Downloading from URL with headers: {headers}")
-                    with requests.get(audio_url, stream=True, headers=headers, timeout=60) as r:
-                        r.raise_for_status()
-                        app.logger.info(f"HTTP response status: {r.status_code}")
-                        app.logger.info(f"Content-Type: {r.headers.get('Content-Type')}")
-                        app.logger.info(f"Content-Length: {r.headers.get('Content-Length')}")
-                        
-                        with open(temp_audio_filepath, 'wb') as f:
-                            downloaded_bytes = 0
-                            for chunk in r.iter_content(chunk_size=8192):
-                                f.write(chunk)
-                                downloaded_bytes += len(chunk)
-                            app.logger.info(f"Downloaded {downloaded_bytes} bytes")
+                    with metrics.time_stage("file_transfer"):
+                        stats = SegmentedDownloader(segments=DOWNLOAD_SEGMENTS).download(
+                            audio_url, temp_audio_filepath, headers=headers
+                        )
+                    app.logger.info(
+                        f"Downloaded {stats['bytes']} bytes in {stats['seconds']}s "
+                        f"({stats['throughput_mbps']} Mbit/s over {stats['segments']} connection(s), "
+                        f"{stats['retries']} retries)"
+                    )
                     
                     if not os.path.exists(temp_audio_filepath) or os.path.getsize(temp_audio_filepath) == 0:
                         raise Exception("Failed to download audio file or the file is empty.")
@@ -944,14 +1129,9 @@ def download_video():
                     # Step 3: Use FFmpeg to convert the temporary audio file to MP3
                     app.logger.info("Step 3/3: Converting to MP3 using FFmpeg...")
                     
-                    # Get video title for the final filename
-                    try:
-                        ydl_info = yt_dlp.YoutubeDL({'quiet': True, 'skip_download': True, 'simulate': True}).extract_info(url, download=False)
-                        title = ydl_info.get('title', 'audio')
-                        app.logger.info(f"Extracted title for MP3 filename: {title}")
-                    except Exception as info_e:
-                        app.logger.warning(f"Could not get video title for MP3 filename: {info_e}. Using 'audio'.")
-                        title = 'audio'
+                    # Get video title for the final filename from the extracted info
+                    title = download_info.get('title') or 'audio'
+                    app.logger.info(f"Title for MP3 filename: {title}")
 
                     safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '_', '-')).rstrip()
                     if not safe_title:  # Fallback if title is empty after sanitization
@@ -971,7 +1151,8 @@ def download_video():
                     ]
                     
                     app.logger.info(f"Running FFmpeg command: {' '.join(ffmpeg_convert_opts)}")
-                    process_ffmpeg_convert = subprocess.run(ffmpeg_convert_opts, capture_output=True, text=True, timeout=120)
+                    with metrics.time_stage("ffmpeg"):
+                        process_ffmpeg_convert = subprocess.run(ffmpeg_convert_opts, capture_output=True, text=True, timeout=120)
                     
                     app.logger.info(f"FFmpeg exit code: {process_ffmpeg_convert.returncode}")
                     app.logger.info(f"FFmpeg STDOUT: {process_ffmpeg_convert.stdout}")
@@ -996,6 +1177,7 @@ def download_video():
                     })
                     
                 except subprocess.CalledProcessError as e:
+                    metrics.record_failure("mp3_download", e)
                     app.logger.error(f"Subprocess failed during MP3 download:")
                     app.logger.error(f"Command: {e.cmd}")
                     app.logger.error(f"Exit code: {e.returncode}")
@@ -1016,10 +1198,12 @@ def download_video():
                         return jsonify({'error': f'Audio download failed. Error details: {e.stderr}'}), 500
                         
                 except requests.exceptions.RequestException as e:
+                    metrics.record_failure("mp3_download", e)
                     app.logger.error(f"HTTP request failed during MP3 download: {e}")
                     return jsonify({'error': f'Audio download failed during HTTP request: {str(e)}'}), 500
                     
                 except Exception as e:
+                    metrics.record_failure("mp3_download", e)
                     app.logger.error(f"Unexpected error during MP3 download: {e}")
                     app.logger.error(f"Error type: {type(e).__name__}")
                     import traceback
@@ -1028,32 +1212,34 @@ def download_video():
             
             # --- Existing Video Download Logic (else block) ---
             else:
-                # --- Step 1: Download Video-Only Stream ---
-                app.logger.info(f"--- Step 1 of 3: Downloading video stream for {quality} ---\n")
+                # --- Steps 1 and 2: Download Video-Only and Audio-Only Streams side by side ---
+                app.logger.info(f"--- Steps 1-2 of 3: Downloading video ({quality}) and audio streams in parallel ---\n")
                 video_format_string = f'bestvideo[height<={target_height}]' if target_height > 0 else 'bestvideo'
                 video_opts = yt_dlp_base_cmd + [
                     '-f', video_format_string,
                     '-o', os.path.join(temp_dir, 'video.%(ext)s'),
-                    url
+                    *yt_dlp_source
                 ]
-                process_video = subprocess.run(video_opts, check=True, capture_output=True, text=True) # Capture output for debugging
-                app.logger.info(f"Video STDOUT: \n{process_video.stdout}")
-                app.logger.error(f"Video STDERR: \n{process_video.stderr}")
-                video_file = next((os.path.join(temp_dir, f) for f in os.listdir(temp_dir) if f.startswith('video.')), None)
-                if not video_file:
-                    raise Exception(f"Failed to download video stream. STDOUT: {process_video.stdout}, STDERR: {process_video.stderr}")
-                app.logger.info(f"✅ Video stream downloaded to: {video_file}")
-
-                # --- Step 2: Download Audio-Only Stream ---
-                app.logger.info(f"\n--- Step 2 of 3: Downloading audio stream ---\n")
                 audio_opts = yt_dlp_base_cmd + [
                     '-f', 'bestaudio',
                     '-o', os.path.join(temp_dir, 'audio.%(ext)s'),
-                    url
+                    *yt_dlp_source
                 ]
-                process_audio = subprocess.run(audio_opts, check=True, capture_output=True, text=True) # Capture output for debugging
+                # If either stream fails the other is stopped, and CalledProcessError is raised as before
+                stream_fetch = ParallelFetch({'video': video_opts, 'audio': audio_opts}, logger=app.logger)
+                with metrics.time_stage("ytdlp_download"):
+                    streams = stream_fetch.run()
+                process_video, process_audio = streams['video'], streams['audio']
+                app.logger.info(f"Video STDOUT: \n{process_video.stdout}")
+                app.logger.error(f"Video STDERR: \n{process_video.stderr}")
                 app.logger.info(f"Audio STDOUT: \n{process_audio.stdout}")
                 app.logger.error(f"Audio STDERR: \n{process_audio.stderr}")
+                app.logger.info(f"Streams downloaded: {stream_fetch.progress()['downloaded']} bytes")
+
+                video_file = next((os.path.join(temp_dir, f) for f in os.listdir(temp_dir) if f.startswith('video.')), None)
+                if not video_file:
+                    raise Exception(f"Failed to download video stream. STDOUT: {process_video.stdout}, STDERR: {process_video.stderr}")
+                app.logger.info(f"✅ Video stream downloaded to: {video_file}")
                 audio_file = next((os.path.join(temp_dir, f) for f in os.listdir(temp_dir) if f.startswith('audio.')), None)
                 if not audio_file:
                     raise Exception(f"Failed to download audio stream. STDOUT: {process_audio.stdout}, STDERR: {process_audio.stderr}")
@@ -1061,15 +1247,9 @@ def download_video():
 
                 # --- Step 3: Merge and Convert Audio with FFmpeg ---
                 app.logger.info(f"\n--- Step 3 of 3: Merging video and converting audio to MP3 ---\n")
-                # Get video title for the final filename from yt-dlp's info_dict
-                try:
-                    # Use a separate, minimal yt-dlp instance just for info extraction to avoid conflicts
-                    ydl_info = yt_dlp.YoutubeDL({'quiet': True, 'skip_download': True, 'simulate': True}).extract_info(url, download=False)
-                    title = ydl_info.get('title', 'video')
-                    app.logger.info(f"Extracted title for filename: {title}")
-                except Exception as info_e:
-                    app.logger.warning(f"Could not get video title for filename: {info_e}. Using 'video'.")
-                    title = 'video'
+                # Get video title for the final filename from the extracted info
+                title = download_info.get('title') or 'video'
+                app.logger.info(f"Title for filename: {title}")
 
                 safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '_', '-')).rstrip()
                 app.logger.info(f"Safe title for filename: {safe_title}")
@@ -1086,7 +1266,8 @@ def download_video():
                     '-y',                 # Overwrite output file without asking
                     final_output_path
                 ]
-                process_merge = subprocess.run(merge_opts, check=True, capture_output=True, text=True) # Capture output for debugging
+                with metrics.time_stage("ffmpeg"):
+                    process_merge = subprocess.run(merge_opts, check=True, capture_output=True, text=True) # Capture output for debugging
                 app.logger.info(f"Merge STDOUT: \n{process_merge.stdout}")
                 app.logger.error(f"Merge STDERR: \n{process_merge.stderr}")
 
@@ -1103,11 +1284,13 @@ def download_video():
                 })
 
         except subprocess.CalledProcessError as e:
+            metrics.record_failure("video_download", e)
             app.logger.error(f"Command failed with exit code {e.returncode}: {e.cmd}")
             app.logger.error(f"STDOUT: {e.stdout}")
             app.logger.error(f"STDERR: {e.stderr}")
             return jsonify({'error': f'Download process failed. Details in server logs.'}), 500
         except Exception as e:
+            metrics.record_failure("video_download", e)
             app.logger.error(f"An unexpected error occurred during download: {str(e)}")
             error_lower = str(e).lower()
 
@@ -1132,6 +1315,22 @@ def download_video():
                 except OSError as e:
                     app.logger.error(f"Error removing cookie file {cookie_file_path}: {e}")
 
+def _metadata_cache_series():
+    stats = get_metadata_cache().stats()
+    return [
+        ({"cache": "metadata", "result": "hit"}, stats["hits"]),
+        ({"cache": "metadata", "result": "partial_hit"}, stats["partial_hits"]),
+        ({"cache": "metadata", "result": "miss"}, stats["misses"]),
+    ]
+
+metrics.REGISTRY.callback("sonnix_cache_events_total", "Cache lookups by cache and result.",
+                          _metadata_cache_series, kind="counter")
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text exposition of stage latencies, failures and cache lookups."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route('/downloads/<filename>')
 def serve_downloaded_file(filename):
     """Serves a downloaded file for the user to download."""
@@ -1270,10 +1469,11 @@ def download_thumbnail(video_id):
 def download_channel_logo(channel_id):
     try:
         youtube_service = get_youtube_service()
-        channel_response = youtube_service.channels().list(
-            part='snippet',
-            id=channel_id
-        ).execute()
+        with metrics.time_stage("data_api"):
+            channel_response = youtube_service.channels().list(
+                part='snippet',
+                id=channel_id
+            ).execute()
 
         if not channel_response.get('items'):
             return "Channel not found", 404
@@ -4,25 +4,39 @@ YouTube Song Search Web Interface
 Simple Flask app to search YouTube songs and get video URLs
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context, redirect
 import os
 import re
+import json
 import requests
 import time
 from pathlib import Path
+from urllib.parse import urlparse, parse_qs
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 import uuid
-import threading
 import gc
-import weakref
+import atexit
 from contextlib import contextmanager
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from werkzeug.utils import safe_join
+from audio_library import AudioLibrary
+from driver_pool import DriverPool
+from job_queue import JobQueue
+from live_stream import LiveRegistry, iter_live
+import metrics
+from server_timing import timed_view
+from segmented_downloader import SegmentedDownloader
+from song_list_parser import iter_songs
+from search_executor import BatchSearcher, RateLimited, TokenBucket
+from video_cache import get_video_cache
+from browser_waits import wait_for_element
+from page_profile import apply_request_blocking, load_blocklist
+from network_capture import NetworkCapture, enable_performance_logging
+from yt_search_parser import extract_initial_data, first_long_form, parse_search_results
 
 app = Flask(__name__)
 
@@ -34,10 +48,11 @@ def get_http_session():
     global _http_session
     if _http_session is None:
         _http_session = requests.Session()
+        # 429s are left to the shared search rate limiter rather than retried per request
         retry_strategy = Retry(
             total=2,
             backoff_factor=0.5,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[500, 502, 503, 504],
             allowed_methods=["GET", "POST"]
         )
         adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=10, pool_maxsize=20)
@@ -48,15 +63,66 @@ def get_http_session():
 # Create data folders
 DOWNLOADS_FOLDER = Path("downloaded_audios")
 DOWNLOADS_FOLDER.mkdir(parents=True, exist_ok=True)
+# /audio/<file> serving. Files never change once written, so browsers may cache them for
+# AUDIO_CACHE_MAX_AGE without revalidating. AUDIO_OFFLOAD hands the transfer to the front
+# server: "x-accel" (nginx, internal location AUDIO_OFFLOAD_PREFIX) or "x-sendfile"
+# (Apache/lighttpd); empty streams from the Python worker.
+AUDIO_CACHE_MAX_AGE = int(os.environ.get("AUDIO_CACHE_MAX_AGE", str(365 * 24 * 3600)))
+AUDIO_OFFLOAD = os.environ.get("AUDIO_OFFLOAD", "").strip().lower()
+AUDIO_OFFLOAD_PREFIX = os.environ.get("AUDIO_OFFLOAD_PREFIX", "/protected-audio/")
+app.config["USE_X_SENDFILE"] = AUDIO_OFFLOAD == "x-sendfile"
+# Upstream endpoints (point these at benchmarks/stubs.py for load tests)
+YOUTUBE_BASE_URL = os.environ.get("YOUTUBE_BASE_URL", "https://www.youtube.com").rstrip("/")
+EZCONV_URL = os.environ.get("EZCONV_URL", "https://ezconv.com/v820")
+
 DEBUG_FOLDER = Path("debug_artifacts")
 DEBUG_FOLDER.mkdir(parents=True, exist_ok=True)
 ENABLE_EZCONV_DEBUG = os.environ.get("ENABLE_EZCONV_DEBUG", "0") == "1"
 
-# Limit concurrency to reduce memory pressure
-_download_lock = threading.Lock()
+# Conversions run on background workers; /api/download-audio only enqueues them.
+# Workers default to one per pooled browser so no job waits on a driver.
+CONVERSION_WORKERS = int(os.environ.get("CONVERSION_WORKERS", os.environ.get("DRIVER_POOL_SIZE", "1")))
+CONVERSION_QUEUE_LIMIT = int(os.environ.get("CONVERSION_QUEUE_LIMIT", "50"))
+JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_SECONDS", "3600"))
+# How long to watch browser network traffic for the MP3 request after clicking Download
+MP3_CAPTURE_TIMEOUT = float(os.environ.get("MP3_CAPTURE_TIMEOUT", "15"))
+# Parallel byte-range connections used to fetch the converted MP3
+DOWNLOAD_SEGMENTS = int(os.environ.get("DOWNLOAD_SEGMENTS", "4"))
+
+# Batch search: songs are resolved concurrently, all requests sharing one token bucket
+SEARCH_CONCURRENCY = int(os.environ.get("SEARCH_CONCURRENCY", "4"))
+SEARCH_RATE_PER_SEC = float(os.environ.get("SEARCH_RATE_PER_SEC", "4"))
+
+# Warm browser pool: conversions check out an already-running Chromium instead of
+# cold-starting one per request. Drivers are recycled after DRIVER_MAX_JOBS uses or
+# once their process tree exceeds DRIVER_MAX_RSS_MB (0 disables the RSS check).
+DRIVER_POOL_SIZE = int(os.environ.get("DRIVER_POOL_SIZE", "1"))
+DRIVER_MAX_JOBS = int(os.environ.get("DRIVER_MAX_JOBS", "25"))
+DRIVER_MAX_RSS_MB = float(os.environ.get("DRIVER_MAX_RSS_MB", "400"))
+DRIVER_POOL_PREWARM = os.environ.get("DRIVER_POOL_PREWARM", "1") == "1"
+# Each pooled browser keeps its own persistent profile (<dir>/slot-N), so ezconv's consent
+# cookie survives between jobs and restarts. Set to an empty string for throwaway profiles.
+# One app process per directory: Chromium locks a profile to a single browser.
+CHROME_PROFILE_DIR = os.environ.get("CHROME_PROFILE_DIR", "chrome_profiles")
 
-# Memory optimization: Use weak references for temporary objects
-_active_drivers = weakref.WeakSet()
+# Page-load profile: "eager" returns from driver.get() at DOMContentLoaded instead of
+# waiting for every subresource; ad/tracker/font requests are blocked in the browser
+# (page_profile.DEFAULT_BLOCKED_URLS plus patterns from BLOCKED_URLS_FILE).
+PAGE_LOAD_STRATEGY = os.environ.get("PAGE_LOAD_STRATEGY", "eager")
+BLOCK_THIRD_PARTY = os.environ.get("BLOCK_THIRD_PARTY", "1") == "1"
+BLOCKED_URL_PATTERNS = load_blocklist(os.environ.get("BLOCKED_URLS_FILE")) if BLOCK_THIRD_PARTY else []
+
+# Converted audio is kept as downloaded_audios/<video_id>.mp3 and served again without
+# re-converting; least recently used files are deleted beyond these limits (0 = no file cap).
+AUDIO_LIBRARY_MAX_MB = int(os.environ.get("AUDIO_LIBRARY_MAX_MB", "700"))
+AUDIO_LIBRARY_MAX_FILES = int(os.environ.get("AUDIO_LIBRARY_MAX_FILES", "0"))
+_audio_library = AudioLibrary(
+    DOWNLOADS_FOLDER,
+    max_bytes=AUDIO_LIBRARY_MAX_MB * 1024 * 1024,
+    max_files=AUDIO_LIBRARY_MAX_FILES,
+)
+# Conversions still downloading, readable at /audio/<video_id>/live as bytes arrive
+_live_files = LiveRegistry()
 
 @contextmanager
 def memory_efficient_context():
@@ -69,59 +135,58 @@ def memory_efficient_context():
 
 def cleanup_memory():
     """Aggressive memory cleanup."""
-    # Close any remaining drivers
-    for driver in list(_active_drivers):
-        try:
-            driver.quit()
-        except Exception:
-            pass
-    _active_drivers.clear()
+    # Replace idle (possibly bloated) browsers with fresh ones; drivers in use are left alone
+    _driver_pool.recycle_idle(refill=True)
     
     # Force garbage collection
     gc.collect()
 
 def parse_song_list(song_input: str) -> list[str]:
     """Parse numbered song list from text input."""
-    songs: list[str] = []
-    if not song_input or not song_input.strip():
-        return songs
-    buffer = song_input.strip()
-    # Handle single-line input like "1. A 2. B 3. C"
-    if "\n" not in buffer and re.search(r"\d+\.\s*\w", buffer):
-        parts = re.findall(r"(\d+\.)\s*([^0-9]*?)(?=\d+\.|$)", buffer)
-        if parts:
-            for _, title in parts:
-                song_name = re.sub(r"\s+", " ", title.strip())
-                if song_name:
-                    songs.append(song_name)
-    # Handle multi-line input or if single-line parsing yielded nothing
-    if not songs:
-        numbered_item_regex = re.compile(r"\b(\d+)\.\s*([^\d].*?)(?=\s*\d+\.|$)", re.DOTALL)
-        matches = numbered_item_regex.findall(buffer)
-        if matches:
-            for _, title in matches:
-                song_name = re.sub(r"\s+", " ", title.strip())
-                if song_name:
-                    songs.append(song_name)
-        else:
-            line_regex = re.compile(r"^\s*\d+\.\s*(.+)$")
-            for raw in buffer.splitlines():
-                m = line_regex.match(raw.strip())
-                if m:
-                    song_name = re.sub(r"\s+", " ", m.group(1).strip())
-                    if song_name:
-                        songs.append(song_name)
-    return songs
+    return list(iter_songs(song_input))
+
+_VIDEO_ID_RE = re.compile(r"^[0-9A-Za-z_-]{11}$")
+
+def extract_video_id(url: str) -> str | None:
+    """Canonical 11-character video ID from any common YouTube URL form, else None."""
+    try:
+        parsed = urlparse(url.strip() if "://" in url else "https://" + url.strip())
+    except ValueError:
+        return None
+    host = (parsed.hostname or "").lower()
+    parts = [p for p in parsed.path.split("/") if p]
+    candidate = None
+    if host == "youtu.be" and parts:
+        candidate = parts[0]
+    elif host.endswith("youtube.com") or host.endswith("youtube-nocookie.com"):
+        if parts[:1] == ["watch"]:
+            candidate = parse_qs(parsed.query).get("v", [None])[0]
+        elif len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+            candidate = parts[1]
+    return candidate if candidate and _VIDEO_ID_RE.match(candidate) else None
 
 def is_shorts_url(video_id: str, html_content: str) -> bool:
     """Check if video ID belongs to a shorts video by looking for '/shorts/VIDEOID' in HTML."""
     return f"/shorts/{video_id}" in html_content
 
+def cached_youtube_video(song_name: str) -> tuple[bool, str | None]:
+    """Answer a song search from the persistent video cache: ``(hit, video_url)``."""
+    with metrics.time_stage("cache_lookup"):
+        hit, cached_id = get_video_cache().lookup(song_name)
+    return hit, (f"https://www.youtube.com/watch?v={cached_id}" if cached_id else None)
+
 def search_youtube_video(song_name: str, max_retries: int = 2) -> str | None:
-    """Search YouTube for a song and return long-form video URL."""
+    """Search YouTube for a song and return long-form video URL.
+
+    Always fetches from YouTube (the batch searcher checks ``cached_youtube_video``
+    first, before taking a rate-limit token). Definitive results (including
+    "nothing suitable found") are cached, transient failures are not.
+    Raises RateLimited on HTTP 429 so the batch searcher can back off and retry.
+    """
+    video_cache = get_video_cache()
     try:
         search_query = song_name.replace(" ", "+")
-        search_url = f"https://www.youtube.com/results?search_query={search_query}"
+        search_url = f"{YOUTUBE_BASE_URL}/results?search_query={search_query}"
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
             "Accept-Language": "en-US,en;q=0.9",
@@ -129,38 +194,71 @@ def search_youtube_video(song_name: str, max_retries: int = 2) -> str | None:
         }
         # Use session with connection pooling and shorter timeout
         session = get_http_session()
-        response = session.get(search_url, headers=headers, timeout=8)
+        with metrics.time_stage("youtube_search"):
+            response = session.get(search_url, headers=headers, timeout=8)
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "")
+            raise RateLimited(float(retry_after) if retry_after.isdigit() else None)
         if response.status_code != 200:
             print(f"YouTube search failed with status {response.status_code}")
             return None
-        video_id_pattern = r'"videoId":"([a-zA-Z0-9_-]{11})"'
-        matches = re.findall(video_id_pattern, response.text)
-        if not matches:
-            print(f"No video IDs found for: {song_name}")
+        initial_data = extract_initial_data(response.text)
+        candidates = parse_search_results(response.text, initial_data)
+        best = first_long_form(candidates, limit=15)
+        video_id = best["video_id"] if best else None
+        if not video_id and initial_data is None:
+            # Consent or bot-check interstitials come back as 200 without ytInitialData;
+            # that says nothing about the song, so don't cache it as a miss
+            print(f"No search results page for: {song_name}")
             return None
-        for video_id in matches[:15]:
-            if f"/shorts/{video_id}" in response.text:
-                continue
-            if len(video_id) == 11:
-                return f"https://www.youtube.com/watch?v={video_id}"
-        return None
-    except requests.Timeout:
+        if not candidates:
+            print(f"No video IDs found for: {song_name}")
+        video_cache.store(song_name, video_id)
+        return f"https://www.youtube.com/watch?v={video_id}" if video_id else None
+    except RateLimited:
+        metrics.record_failure("youtube_search", "RateLimited")
+        raise
+    except requests.Timeout as e:
+        metrics.record_failure("youtube_search", e)
         print(f"Timeout searching for: {song_name}")
         return None
     except requests.ConnectionError as e:
+        metrics.record_failure("youtube_search", e)
         print(f"Connection error for {song_name}: {str(e)[:100]}")
         return None
     except Exception as e:
+        metrics.record_failure("youtube_search", e)
         print(f"Error searching for {song_name}: {str(e)[:100]}")
         return None
                 
+_batch_searcher = BatchSearcher(
+    search_youtube_video,
+    TokenBucket(SEARCH_RATE_PER_SEC, burst=SEARCH_CONCURRENCY),
+    max_workers=SEARCH_CONCURRENCY,
+    lookup_fn=cached_youtube_video,
+)
+
 @app.route("/")
 def index():
     return render_template("index_web.html")
 
-def setup_selenium_driver():
-    """Setup headless Chrome driver for Selenium with aggressive memory optimization."""
+def setup_selenium_driver(slot=None):
+    """Setup headless Chrome driver for Selenium with aggressive memory optimization.
+
+    ``slot`` (from the driver pool) selects a persistent profile directory.
+    """
     chrome_options = Options()
+    chrome_options.page_load_strategy = PAGE_LOAD_STRATEGY
+    if CHROME_PROFILE_DIR and slot is not None:
+        profile_dir = Path(CHROME_PROFILE_DIR).resolve() / f"slot-{slot}"
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        # Left behind when a previous process was killed; Chromium would refuse the profile
+        for lock_name in ("SingletonLock", "SingletonCookie", "SingletonSocket"):
+            try:
+                (profile_dir / lock_name).unlink()
+            except OSError:
+                pass
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
@@ -229,6 +327,7 @@ def setup_selenium_driver():
         "profile.content_settings.exceptions.media_stream": {},
     }
     chrome_options.add_experimental_option("prefs", prefs)
+    enable_performance_logging(chrome_options)
 
     # Additional memory/perf flags
     chrome_options.add_argument("--blink-settings=imagesEnabled=false")
@@ -267,19 +366,30 @@ def setup_selenium_driver():
         if os.path.exists(chrome_binary_path):
             chrome_options.binary_location = chrome_binary_path
 
-        if os.path.exists(chromedriver_path):
-            service = Service(executable_path=chromedriver_path)
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-        else:
-            driver = webdriver.Chrome(options=chrome_options)
-        
-        # Track driver for cleanup
-        _active_drivers.add(driver)
+        with metrics.time_stage("driver_start"):
+            if os.path.exists(chromedriver_path):
+                service = Service(executable_path=chromedriver_path)
+                driver = webdriver.Chrome(service=service, options=chrome_options)
+            else:
+                driver = webdriver.Chrome(options=chrome_options)
+        apply_request_blocking(driver, BLOCKED_URL_PATTERNS)
         return driver
     except Exception as e:
+        metrics.record_failure("driver_start", e)
         print(f"Error setting up Selenium driver: {e}")
-        cleanup_memory()  # Cleanup on error
+        gc.collect()
         return None
+
+_driver_pool = DriverPool(
+    setup_selenium_driver,
+    size=DRIVER_POOL_SIZE,
+    max_jobs=DRIVER_MAX_JOBS,
+    max_rss_mb=DRIVER_MAX_RSS_MB,
+    keep_site_data=bool(CHROME_PROFILE_DIR),
+)
+if DRIVER_POOL_PREWARM:
+    _driver_pool.warm()
+atexit.register(_driver_pool.shutdown)
             
 def save_debug(driver, debug_dir: Path, label: str) -> None:
     """Save page HTML and screenshot for debugging."""
@@ -320,21 +430,52 @@ def try_click(driver, element) -> bool:
     except Exception:
         return False
 
-def handle_consent_and_popups(driver) -> None:
-    """Try to accept cookie banners and close ad popups if any."""
-    selectors = [
-        (By.ID, "onetrust-accept-btn-handler"),
-        (By.CSS_SELECTOR, "button#onetrust-accept-btn-handler"),
-        (By.XPATH, "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'accept')]")
-    ]
-    for by, sel in selectors:
-        try:
-            btn = WebDriverWait(driver, 3).until(EC.element_to_be_clickable((by, sel)))
-            if try_click(driver, btn):
+CONSENT_LOCATORS = [
+    (By.ID, "onetrust-accept-btn-handler"),
+    (By.CSS_SELECTOR, "button#onetrust-accept-btn-handler"),
+    (By.XPATH, "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'accept')]")
+]
+
+CONVERT_LOCATORS = [
+    (By.XPATH, "//button[@id=':R1ajalffata:']"),
+    (By.XPATH, "//button[contains(normalize-space(), 'Convert')]"),
+    (By.XPATH, "//*[self::button or self::a][contains(translate(normalize-space(.), 'abcdefghijklmnopqrstuvwxyz', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'), 'CONVERT')]")
+]
+
+DOWNLOAD_MP3_LOCATORS = [
+    (By.XPATH, "//button[normalize-space()='Download MP3']"),
+    (By.XPATH, "//a[normalize-space()='Download MP3']"),
+    (By.XPATH, "//*[self::a or self::button][contains(translate(normalize-space(.), 'abcdefghijklmnopqrstuvwxyz', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'), 'DOWNLOAD MP3')]")
+]
+
+# One round trip: has consent already been given (OneTrust cookie), or is a banner loading?
+CONSENT_STATE_SCRIPT = """
+return {
+    accepted: document.cookie.indexOf('OptanonAlertBoxClosed=') !== -1,
+    banner: !!(document.getElementById('onetrust-consent-sdk') || document.getElementById('onetrust-banner-sdk'))
+};
+"""
+
+def handle_consent_and_popups(driver, timeout: float = 3) -> None:
+    """Try to accept cookie banners and close ad popups if any.
+
+    Returns without waiting when the profile already holds the consent
+    cookie or no banner is on the page.
+    """
+    with metrics.time_stage("consent"):
+        _handle_consent_and_popups(driver, timeout)
+
+def _handle_consent_and_popups(driver, timeout):
+    try:
+        state = driver.execute_script(CONSENT_STATE_SCRIPT) or {}
+        if not state.get("accepted"):
+            # Only wait for the accept button if a banner is actually being shown
+            btn = wait_for_element(driver, CONSENT_LOCATORS, timeout=timeout if state.get("banner") else 0,
+                                   clickable=True)
+            if btn and try_click(driver, btn):
                 print("[DEBUG] Cookie/consent banner accepted")
-                break
-        except Exception:
-            pass
+    except Exception:
+        pass
 
     # Close extra windows (ads)
     try:
@@ -347,34 +488,47 @@ def handle_consent_and_popups(driver) -> None:
     except Exception:
         pass
 
-@app.route("/api/download-audio", methods=["POST"])
-def download_audio():
-    """Download audio from YouTube via ezconv.com automation."""
+def convert_with_ezconv(job):
+    """Job handler: download audio from YouTube via ezconv.com automation."""
     with memory_efficient_context():
-        data = request.get_json()
-        youtube_url = data.get("youtube_url", "")
-        if not youtube_url:
-            return jsonify({"success": False, "message": "No YouTube URL provided"})
-        print(f"Starting audio download for: {youtube_url}")
+        youtube_url = job.payload["youtube_url"]
+        video_id = job.payload.get("video_id")
+        print(f"[JOB {job.id}] Starting audio download for: {youtube_url}")
+        if video_id:
+            # Finished by an earlier job while this one was queued
+            stored = _audio_library.lookup(video_id)
+            if stored:
+                return {"success": True, "audio_url": f"/audio/{stored['filename']}",
+                        "filename": stored["filename"], "cached": True}
         debug_id = uuid.uuid4().hex[:8]
         debug_dir = DEBUG_FOLDER / f"job_{debug_id}"
-        if not _download_lock.acquire(blocking=False):
-            return jsonify({"success": False, "message": "Server busy. Please try again in a moment."})
-        driver = None
+        pool_entry = None
         try:
-            driver = setup_selenium_driver()
-            if not driver:
-                return jsonify({"success": False, "message": "Failed to initialize browser"})
+            job.set_stage("loading", "Waiting for a browser")
+            pool_entry = _driver_pool.acquire(timeout=120)
+            if not pool_entry:
+                return {"success": False, "message": "Failed to initialize browser", "error": "browser_unavailable"}
+            driver = pool_entry["driver"]
+            job.set_stage("loading", "Opening ezconv.com")
             print("Navigating to ezconv.com...")
-            driver.get("https://ezconv.com/v820")
-            time.sleep(2)
+            nav_started = time.time()
+            driver.get(EZCONV_URL)
+            page_load = time.time() - nav_started
+            metrics.observe_stage("page_load", page_load)
+            # Interactive once the URL field can be used, not after a fixed delay
+            url_input = wait_for_element(driver, [(By.CSS_SELECTOR, "input[type='text']")], timeout=10, clickable=True)
+            tti = time.time() - nav_started
+            metrics.observe_stage("page_interactive", tti)
             save_debug(driver, debug_dir, "01_loaded")
+            if not url_input:
+                save_debug(driver, debug_dir, "03_input_not_found")
+                return {"success": False, "message": "Could not find URL input field",
+                        "error": "input_not_found", "debug_id": debug_id}
+            print(f"[JOB {job.id}] ezconv interactive after {tti:.2f}s (driver.get {page_load:.2f}s, "
+                  f"strategy={PAGE_LOAD_STRATEGY}, blocking {len(BLOCKED_URL_PATTERNS)} patterns)")
+            job.publish(page_load_seconds=round(page_load, 3), tti_seconds=round(tti, 3))
             handle_consent_and_popups(driver)
             save_debug(driver, debug_dir, "02_after_consent")
-            print("Looking for URL input field...")
-            url_input = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='text']"))
-            )
             url_input.clear()
             url_input.send_keys(youtube_url)
             try:
@@ -388,84 +542,37 @@ def download_audio():
             print("YouTube URL pasted")
             save_debug(driver, debug_dir, "03_url_filled")
             print("Looking for Convert button...")
-            convert_locators = [
-                (By.XPATH, "//button[@id=':R1ajalffata:']"),
-                (By.XPATH, "//button[contains(normalize-space(), 'Convert')]"),
-                (By.XPATH, "//*[self::button or self::a][contains(translate(normalize-space(.), 'abcdefghijklmnopqrstuvwxyz', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'), 'CONVERT')]")
-            ]
-            convert_button = None
-            for by, sel in convert_locators:
-                try:
-                    convert_button = WebDriverWait(driver, 6).until(
-                        EC.element_to_be_clickable((by, sel))
-                    )
-                    break
-                except Exception:
-                    continue
+            convert_button = wait_for_element(driver, CONVERT_LOCATORS, timeout=6, clickable=True)
             if not convert_button:
                 save_debug(driver, debug_dir, "04_convert_not_found")
-                return jsonify({"success": False, "message": "Could not find Convert button", "debug_id": debug_id})
+                return {"success": False, "message": "Could not find Convert button",
+                        "error": "convert_not_found", "debug_id": debug_id}
             if not try_click(driver, convert_button):
                 save_debug(driver, debug_dir, "04_convert_click_failed")
-                return jsonify({"success": False, "message": "Failed to click Convert button", "debug_id": debug_id})
+                return {"success": False, "message": "Failed to click Convert button",
+                        "error": "convert_click_failed", "debug_id": debug_id}
             print("Convert button clicked")
-            time.sleep(1)
-            handle_consent_and_popups(driver)
+            job.set_stage("converting", "Converting on ezconv.com")
+            handle_consent_and_popups(driver, timeout=1)
             save_debug(driver, debug_dir, "05_after_convert_click")
             print("Waiting for conversion to complete...")
             download_button = None
             max_wait_time = 90
             try:
-                dl_locators = [
-                    (By.XPATH, "//button[normalize-space()='Download MP3']"),
-                    (By.XPATH, "//a[normalize-space()='Download MP3']"),
-                    (By.XPATH, "//*[self::a or self::button][contains(translate(normalize-space(.), 'abcdefghijklmnopqrstuvwxyz', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'), 'DOWNLOAD MP3')]")
-                ]
-                for seconds_elapsed in range(max_wait_time):
-                    found = False
-                    for by, sel in dl_locators:
-                        try:
-                            elem = driver.find_element(by, sel)
-                            download_button = elem
-                            found = True
-                            break
-                        except Exception:
-                            pass
-                    if not found:
-                        try:
-                            frames = driver.find_elements(By.TAG_NAME, "iframe")
-                            for frame in frames:
-                                driver.switch_to.frame(frame)
-                                for by, sel in dl_locators:
-                                    try:
-                                        elem = driver.find_element(by, sel)
-                                        download_button = elem
-                                        found = True
-                                        break
-                                    except Exception:
-                                        pass
-                                driver.switch_to.default_content()
-                                if found:
-                                    break
-                        except Exception:
-                            driver.switch_to.default_content()
-                    if found:
-                        print(f"✅ Download MP3 control appeared after {seconds_elapsed + 1} seconds!")
-                        break
-                    time.sleep(1)
-                    if (seconds_elapsed + 1) % 5 == 0:
-                        print(f"   ⏳ Still converting... ({seconds_elapsed + 1}s elapsed)")
+                wait_started = time.time()
+                download_button = wait_for_element(driver, DOWNLOAD_MP3_LOCATORS, timeout=max_wait_time, frames=True)
                 if not download_button:
                     print(f"❌ Timeout: Download button did not appear after {max_wait_time} seconds")
                     save_debug(driver, debug_dir, "06_timeout_no_download")
-                    return jsonify({"success": False, "message": f"Conversion timeout after {max_wait_time} seconds", "debug_id": debug_id})
-                time.sleep(1)
-                try:
-                    download_button = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//*[self::a or self::button][contains(translate(normalize-space(.), 'abcdefghijklmnopqrstuvwxyz', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'), 'DOWNLOAD MP3')]")
-                    ))
-                except Exception:
-                    pass
+                    return {"success": False, "message": f"Conversion timeout after {max_wait_time} seconds",
+                            "error": "conversion_timeout", "debug_id": debug_id}
+                print(f"✅ Download MP3 control appeared after {time.time() - wait_started:.1f} seconds!")
+                metrics.observe_stage("convert_wait", time.time() - wait_started)
+                discovery_started = time.time()
+                # Searched in whichever frame the control turned up in
+                download_button = wait_for_element(
+                    driver, DOWNLOAD_MP3_LOCATORS, timeout=10, clickable=True
+                ) or download_button
                 print("Download button is clickable, getting download link...")
                 download_link = download_button.get_attribute("href")
                 if not download_link:
@@ -482,14 +589,24 @@ def download_audio():
                     if download_links:
                         download_link = download_links[0].get_attribute("href")
                         print(f"Found download link via CSS selector: {download_link}")
-                print("Clicking Download MP3 button...")
-                if not try_click(driver, download_button):
-                    driver.execute_script("arguments[0].click();", download_button)
-                time.sleep(3)
-                time.sleep(2)
+                capture = NetworkCapture(driver)
+                capture.start()
+                try:
+                    print("Clicking Download MP3 button...")
+                    if not try_click(driver, download_button):
+                        driver.execute_script("arguments[0].click();", download_button)
+                    driver.switch_to.default_content()
+                    # With an href already in hand, don't wait longer than the old fixed delay
+                    captured = capture.wait_for(timeout=5 if download_link else MP3_CAPTURE_TIMEOUT)
+                finally:
+                    # The browser goes back to the pool; later jobs must not inherit "deny"
+                    capture.stop()
                 current_url = driver.current_url
                 print(f"Current URL after click: {current_url}")
-                if "download" in current_url.lower() or ".mp3" in current_url.lower():
+                if captured:
+                    download_link = captured["url"]
+                    print(f"Captured MP3 request from network: {download_link}")
+                elif "download" in current_url.lower() or ".mp3" in current_url.lower():
                     download_link = current_url
                     print(f"Download link from redirect: {download_link}")
                 if not download_link:
@@ -506,14 +623,17 @@ def download_audio():
                     if matches:
                         download_link = matches[0]
                         print(f"Extracted download link from source: {download_link}")
+                metrics.observe_stage("link_discovery", time.time() - discovery_started)
                 if download_link:
                     print(f"Final download link: {download_link}")
                     download_link = download_link.replace("&amp;", "&")
                     print("Starting download via requests...")
+                    job.set_stage("downloading", "Downloading MP3")
                     session = requests.Session()
+                    browser_headers = captured["request_headers"] if captured else {}
                     session.headers.update({
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-                        "Referer": current_url,
+                        "User-Agent": browser_headers.get("User-Agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"),
+                        "Referer": browser_headers.get("Referer", current_url),
                         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
                     })
                     try:
@@ -521,55 +641,199 @@ def download_audio():
                             session.cookies.set(c.get("name"), c.get("value"))
                     except Exception:
                         pass
-                    response = session.get(download_link, stream=True, timeout=60, allow_redirects=True)
-                    response.raise_for_status()
-                    filename = f"audio_{uuid.uuid4().hex[:8]}.mp3"
-                    filepath = DOWNLOADS_FOLDER / filename
+                    if video_id:
+                        filepath = _audio_library.temp_path(video_id)
+                    else:
+                        filepath = DOWNLOADS_FOLDER / f"audio_{uuid.uuid4().hex[:8]}.mp3"
                     print(f"Saving to: {filepath}")
-                    with open(filepath, "wb") as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
+                    live = _live_files.open(video_id, filepath) if video_id else None
+
+                    def on_progress(contiguous, total):
+                        if live is None:
+                            return
+                        if contiguous and not live.written:
+                            # First bytes are on disk: the live stream can start
+                            live.expected_size = total
+                            job.publish(live_url=f"/audio/{video_id}/live")
+                        live.update(contiguous)
+
+                    try:
+                        with metrics.time_stage("file_transfer"):
+                            stats = SegmentedDownloader(session, segments=DOWNLOAD_SEGMENTS).download(
+                                download_link, filepath, progress=on_progress
+                            )
+                        print(f"Downloaded {stats['bytes']} bytes in {stats['seconds']}s "
+                              f"({stats['throughput_mbps']} Mbit/s over {stats['segments']} connection(s))")
+                        if video_id:
+                            stored = _audio_library.commit(video_id, filepath, source_url=youtube_url)
+                            filename = stored["filename"]
+                            live.finish(_audio_library.path_for(video_id))
+                        else:
+                            _audio_library.track(filepath)
+                            filename = filepath.name
+                    except Exception as e:
+                        if live:
+                            live.fail(str(e))
+                        raise
+                    finally:
+                        if live:
+                            _live_files.close(video_id, live)
+                        if video_id:
+                            SegmentedDownloader.discard(filepath)
                     print(f"Audio downloaded successfully: {filename}")
-                    return jsonify({
+                    return {
                         "success": True,
                         "audio_url": f"/audio/{filename}",
                         "filename": filename,
                         "debug_id": debug_id,
-                    })
+                    }
                 else:
                     print("ERROR: Could not find any download link")
                     save_debug(driver, debug_dir, "07_no_download_link")
-                    return jsonify({"success": False, "message": "Could not find download link after conversion", "debug_id": debug_id})
+                    return {"success": False, "message": "Could not find download link after conversion",
+                            "error": "no_download_link", "debug_id": debug_id}
             except Exception as e:
                 print(f"Error finding download button: {str(e)}")
                 save_debug(driver, debug_dir, "08_exception")
-                return jsonify({"success": False, "message": f"Download button not found: {str(e)[:100]}", "debug_id": debug_id})
+                return {"success": False, "message": f"Download button not found: {str(e)[:100]}",
+                        "error": type(e).__name__, "debug_id": debug_id}
         except Exception as e:
             print(f"Error during automation: {str(e)}")
-            return jsonify({"success": False, "message": f"Automation error: {str(e)[:100]}", "debug_id": debug_id})
+            return {"success": False, "message": f"Automation error: {str(e)[:100]}",
+                    "error": type(e).__name__, "debug_id": debug_id}
         finally:
-            try:
-                if driver:
-                    driver.quit()
-                    _active_drivers.discard(driver)
-            except Exception:
-                pass
-            cleanup_memory()
-            _download_lock.release()
+            if pool_entry:
+                _driver_pool.release(pool_entry)
+
+def run_conversion_job(job):
+    """Queue handler: ``convert_with_ezconv`` plus timing and failure counts.
+
+    The job's own stage breakdown is returned as ``timings`` (milliseconds).
+    """
+    with metrics.collect_timings() as timings:
+        try:
+            result = convert_with_ezconv(job)
+        except Exception as e:
+            metrics.record_failure("conversion", e)
+            job.publish(timings=timings.as_dict())
+            raise
+    metrics.observe_stage("conversion", time.perf_counter() - timings.started)
+    if not result.get("success"):
+        metrics.record_failure("conversion", result.get("error"))
+    result["timings"] = timings.as_dict()
+    return result
+
+_conversion_queue = JobQueue(
+    run_conversion_job,
+    workers=CONVERSION_WORKERS,
+    max_pending=CONVERSION_QUEUE_LIMIT,
+    retention_seconds=JOB_RETENTION_SECONDS,
+)
+_conversion_queue.start()
+
+@app.route("/api/download-audio", methods=["POST"])
+@timed_view
+def download_audio():
+    """Queue an ezconv conversion and return its job ID immediately."""
+    data = request.get_json(silent=True) or {}
+    youtube_url = data.get("youtube_url", "")
+    if not youtube_url:
+        return jsonify({"success": False, "message": "No YouTube URL provided"})
+    video_id = extract_video_id(youtube_url)
+    if video_id:
+        with metrics.time_stage("library_lookup"):
+            stored = _audio_library.lookup(video_id)
+        if stored:
+            print(f"Serving {video_id} from the audio library")
+            return jsonify({
+                "success": True,
+                "audio_url": f"/audio/{stored['filename']}",
+                "filename": stored["filename"],
+                "duration": stored.get("duration"),
+                "cached": True,
+            })
+    # Concurrent requests for the same video share one conversion
+    with metrics.time_stage("enqueue"):
+        job = _conversion_queue.submit({"youtube_url": youtube_url, "video_id": video_id},
+                                       key=video_id or youtube_url.strip())
+    if job is None:
+        return jsonify({"success": False, "message": "Server busy. Please try again in a moment."}), 503
+    print(f"Conversion job {job.id} for: {youtube_url} (requests {job.requests}, queue depth {_conversion_queue.depth()})")
+    return jsonify({
+        "success": True,
+        "job_id": job.id,
+        "stage": job.stage,
+        "status_url": f"/api/jobs/{job.id}",
+    }), 202
+
+@app.route("/api/jobs/<job_id>")
+def job_status(job_id):
+    """Report the stage of a queued conversion (and its result once finished).
+
+    Finished jobs carry their stage breakdown as ``timings`` and ``Server-Timing``.
+    """
+    job = _conversion_queue.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "message": "Job not found"}), 404
+    data = job.to_dict()
+    response = jsonify(data)
+    if data.get("timings"):
+        response.headers["Server-Timing"] = metrics.server_timing_header(data["timings"])
+    return response
 
 @app.route("/audio/<filename>")
 def serve_audio(filename):
+    """Serve a converted MP3 with Range (206), ETag/Last-Modified (304) and immutable caching."""
     try:
-        filepath = DOWNLOADS_FOLDER / filename
-        if filepath.exists():
-            return send_file(filepath, mimetype="audio/mpeg")
-        else:
+        safe_path = safe_join(str(DOWNLOADS_FOLDER.resolve()), filename)
+        if not safe_path or not os.path.isfile(safe_path):
             return jsonify({"error": "File not found"}), 404
+        filepath = Path(safe_path)
+        _audio_library.touch(filepath.stem)
+        if AUDIO_OFFLOAD == "x-accel":
+            # nginx serves the bytes (and Range/conditional requests) from its internal location
+            response = Response(mimetype="audio/mpeg")
+            response.headers["X-Accel-Redirect"] = AUDIO_OFFLOAD_PREFIX.rstrip("/") + "/" + filepath.name
+        else:
+            # With USE_X_SENDFILE set this emits an X-Sendfile header instead of the body
+            response = send_file(filepath, mimetype="audio/mpeg", conditional=True, etag=True)
+        response.headers["Accept-Ranges"] = "bytes"
+        response.headers["Cache-Control"] = f"public, max-age={AUDIO_CACHE_MAX_AGE}, immutable"
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+_RANGE_RE = re.compile(r"^bytes=(\d+)-(\d*)$")
+
+@app.route("/audio/<video_id>/live")
+def serve_live_audio(video_id):
+    """Stream a conversion's MP3 while it is still downloading."""
+    live = _live_files.get(video_id)
+    if live is None:
+        stored = _audio_library.lookup(video_id)
+        if stored:
+            return redirect(f"/audio/{stored['filename']}")
+        return jsonify({"error": "No download in progress"}), 404
+    start, end, status = 0, None, 200
+    size = live.expected_size
+    match = _RANGE_RE.match(request.headers.get("Range", ""))
+    if match and size:
+        start = int(match.group(1))
+        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+        if start >= size or start > end:
+            return Response(status=416, headers={"Content-Range": f"bytes */{size}"})
+        status = 206
+    headers = {"Cache-Control": "no-store", "X-Accel-Buffering": "no"}
+    if size:
+        headers["Accept-Ranges"] = "bytes"
+        headers["Content-Length"] = str((end if end is not None else size - 1) - start + 1)
+        if status == 206:
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return Response(stream_with_context(iter_live(live, start=start, end=end)),
+                    status=status, mimetype="audio/mpeg", headers=headers)
+
 @app.route("/api/search", methods=["POST"])
+@timed_view
 def search_songs():
     with memory_efficient_context():
         try:
@@ -578,25 +842,97 @@ def search_songs():
             songs = parse_song_list(song_input)
             if not songs:
                 return jsonify({"success": False, "message": "No valid songs found! Please use format: 1. Song Name"})
+            print(f"Searching {len(songs)} songs ({SEARCH_CONCURRENCY} at a time)...")
+            with metrics.time_stage("search_batch"):
+                video_urls = _batch_searcher.run(songs)
             results = []
-            for i, song in enumerate(songs, 1):
-                print(f"Searching {i}/{len(songs)}: {song}")
-                video_url = search_youtube_video(song)
+            for i, (song, video_url) in enumerate(zip(songs, video_urls), 1):
                 results.append({"number": i, "song": song, "url": video_url, "status": "success" if video_url else "failed"})
-                if i < len(songs):
-                    time.sleep(0.5)
-                    if i % 3 == 0:
-                        gc.collect()
             return jsonify({"success": True, "total": len(songs), "results": results})
         except Exception as e:
             return jsonify({"success": False, "message": f"Error: {str(e)}"})
 
+@app.route("/api/search/stream", methods=["POST"])
+def search_songs_stream():
+    """Stream search results as NDJSON: a start record, one record per song
+    in completion order, then a summary record."""
+    data = request.get_json(silent=True) or {}
+    songs = parse_song_list(data.get("songs", ""))
+    if not songs:
+        return jsonify({"success": False, "message": "No valid songs found! Please use format: 1. Song Name"})
+    print(f"Streaming search for {len(songs)} songs ({SEARCH_CONCURRENCY} at a time)...")
+
+    def generate():
+        started = time.time()
+        found = 0
+        yield json.dumps({"type": "start", "total": len(songs), "songs": songs}) + "\n"
+        for i, song, video_url in _batch_searcher.iter_results(songs):
+            found += 1 if video_url else 0
+            yield json.dumps({
+                "type": "result",
+                "number": i + 1,
+                "song": song,
+                "url": video_url,
+                "status": "success" if video_url else "failed",
+            }) + "\n"
+        yield json.dumps({
+            "type": "summary",
+            "success": True,
+            "total": len(songs),
+            "found": found,
+            "elapsed": round(time.time() - started, 2),
+        }) + "\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route("/api/cache/stats")
+def cache_stats():
+    """Hit/miss counters for the song-to-video cache and the audio library."""
+    return jsonify({
+        "success": True,
+        "video_cache": get_video_cache().stats(),
+        "audio_library": _audio_library.stats(),
+    })
+
+def _cache_event_series():
+    video = get_video_cache().stats()
+    library = _audio_library.stats()
+    return [
+        ({"cache": "video", "result": "hit"}, video["hits"]),
+        ({"cache": "video", "result": "negative_hit"}, video["negative_hits"]),
+        ({"cache": "video", "result": "miss"}, video["misses"]),
+        ({"cache": "audio_library", "result": "hit"}, library["hits"]),
+        ({"cache": "audio_library", "result": "miss"}, library["misses"]),
+    ]
+
+def _driver_pool_series():
+    stats = _driver_pool.stats()
+    return [({"state": "idle"}, stats["idle"]), ({"state": "in_use"}, stats["in_use"])]
+
+metrics.REGISTRY.callback("sonnix_cache_events_total", "Cache lookups by cache and result.",
+                          _cache_event_series, kind="counter")
+metrics.REGISTRY.callback("sonnix_conversion_queue_depth", "Conversion jobs waiting for a worker.",
+                          lambda: [({}, _conversion_queue.depth())])
+metrics.REGISTRY.callback("sonnix_driver_pool_browsers", "Pooled Chromium browsers by state.",
+                          _driver_pool_series)
+metrics.REGISTRY.callback("sonnix_audio_library_bytes", "Bytes of MP3s held in the audio library.",
+                          lambda: [({}, _audio_library.stats()["bytes"])])
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus text exposition of stage latencies, failures, caches and queues."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route("/api/cleanup", methods=["POST"])
 def cleanup_endpoint():
     """Manual memory cleanup endpoint."""
     try:
         cleanup_memory()
-        return jsonify({"success": True, "message": "Memory cleanup completed"})
+        return jsonify({"success": True, "message": "Memory cleanup completed", "driver_pool": _driver_pool.stats()})
     except Exception as e:
         return jsonify({"success": False, "message": f"Cleanup error: {str(e)}"})
 
@@ -0,0 +1,213 @@
+"""
+Audio Library
+Stores converted MP3s by YouTube video ID with a JSON sidecar, under a size quota
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+
+# MPEG-1 Layer III bitrates (kbps) and sample rates, indexed by header fields
+_MPEG1_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_MPEG2_BITRATES = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def mp3_duration(path) -> float | None:
+    """Estimate an MP3's duration in seconds from its first frame header.
+
+    Uses the Xing/Info frame count when present (VBR), otherwise assumes
+    constant bitrate. Returns None if no MPEG audio frame is found.
+    """
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as fh:
+            head = fh.read(64 * 1024)
+    except OSError:
+        return None
+    base = offset = 0  # file position of head[0], position within head
+    if head[:3] == b"ID3" and len(head) >= 10:
+        tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+        offset = 10 + tag_size
+        if offset + 4 > len(head):
+            base, offset = offset, 0
+            try:
+                with open(path, "rb") as fh:
+                    fh.seek(base)
+                    head = fh.read(64 * 1024)
+            except OSError:
+                return None
+    while offset + 4 <= len(head):
+        if head[offset] == 0xFF and head[offset + 1] & 0xE0 == 0xE0:
+            b1, b2, b3 = head[offset + 1], head[offset + 2], head[offset + 3]
+            version = (b1 >> 3) & 0x03      # 3 = MPEG1, 2 = MPEG2, 0 = MPEG2.5
+            bitrate_idx, rate_idx = b2 >> 4, (b2 >> 2) & 0x03
+            if version != 1 and (b1 >> 1) & 0x03 == 1 and 0 < bitrate_idx < 15 and rate_idx < 3:
+                break
+        offset += 1
+    else:
+        return None
+    sample_rate = _SAMPLE_RATES[version][rate_idx]
+    samples_per_frame = 1152 if version == 3 else 576
+    mono = (b3 >> 6) == 3
+    side_info = (17 if mono else 32) if version == 3 else (9 if mono else 17)
+    xing = offset + 4 + side_info
+    if head[xing:xing + 4] in (b"Xing", b"Info") and head[xing + 7] & 0x01:
+        frames = struct.unpack(">I", head[xing + 8:xing + 12])[0]
+        return round(frames * samples_per_frame / sample_rate, 2)
+    bitrates = _MPEG1_BITRATES if version == 3 else _MPEG2_BITRATES
+    audio_bytes = size - (base + offset)
+    return round(audio_bytes * 8 / (bitrates[bitrate_idx] * 1000), 2)
+
+
+class AudioLibrary:
+    """Converted audio stored as ``<video_id>.mp3`` plus ``<video_id>.json``.
+
+    The folder is kept under ``max_bytes`` (and ``max_files``, if set) by
+    deleting least recently used files. Other MP3s already in the folder
+    count towards the quota and are evicted the same way.
+    """
+
+    def __init__(self, root, max_bytes: int = 700 * 1024 * 1024, max_files: int = 0):
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self.max_files = int(max_files)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index: dict[str, dict] = {}  # stem -> {"size", "last_used"}
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._scan()
+
+    def _scan(self) -> None:
+        # Leftovers from interrupted conversions (recent ones may still be in progress)
+        stale = time.time() - 3600
+        for part in self.root.glob("*.part"):
+            try:
+                if part.stat().st_mtime < stale:
+                    part.unlink()
+            except OSError:
+                pass
+        for mp3 in self.root.glob("*.mp3"):
+            try:
+                st = mp3.stat()
+            except OSError:
+                continue
+            self._index[mp3.stem] = {"size": st.st_size, "last_used": max(st.st_atime, st.st_mtime)}
+
+    def path_for(self, video_id: str) -> Path:
+        return self.root / f"{video_id}.mp3"
+
+    def temp_path(self, video_id: str) -> Path:
+        """Where a conversion should write before ``commit()`` publishes it."""
+        return self.root / f"{video_id}.{os.getpid()}.{threading.get_ident()}.part"
+
+    def lookup(self, video_id: str) -> dict | None:
+        """Metadata for a stored video (and mark it recently used), else None."""
+        with self._lock:
+            entry = self._index.get(video_id)
+            path = self.path_for(video_id)
+            if entry is None or not path.exists():
+                self._index.pop(video_id, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+        self.touch(video_id)
+        meta = self._read_sidecar(video_id)
+        meta.setdefault("video_id", video_id)
+        meta.setdefault("size", entry["size"])
+        meta["filename"] = path.name
+        return meta
+
+    def touch(self, stem: str) -> None:
+        """Record a use of ``<stem>.mp3`` for LRU eviction."""
+        now = time.time()
+        with self._lock:
+            entry = self._index.get(stem)
+            if entry is None:
+                return
+            entry["last_used"] = now
+        try:
+            path = self.root / f"{stem}.mp3"
+            os.utime(path, (now, path.stat().st_mtime))
+        except OSError:
+            pass
+
+    def commit(self, video_id: str, temp_path, source_url: str = "") -> dict:
+        """Publish a finished download under its video ID and write the sidecar."""
+        path = self.path_for(video_id)
+        os.replace(temp_path, path)
+        size = path.stat().st_size
+        meta = {
+            "video_id": video_id,
+            "source_url": source_url,
+            "size": size,
+            "duration": mp3_duration(path),
+            "created_at": time.time(),
+        }
+        sidecar = self.root / f"{video_id}.json"
+        tmp_sidecar = sidecar.with_suffix(".json.tmp")
+        tmp_sidecar.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp_sidecar, sidecar)
+        with self._lock:
+            self._index[video_id] = {"size": size, "last_used": meta["created_at"]}
+        self.evict(keep=video_id)
+        meta["filename"] = path.name
+        return meta
+
+    def track(self, path) -> None:
+        """Count a file written outside ``commit()`` towards the quota."""
+        path = Path(path)
+        with self._lock:
+            self._index[path.stem] = {"size": path.stat().st_size, "last_used": time.time()}
+        self.evict(keep=path.stem)
+
+    def _read_sidecar(self, stem: str) -> dict:
+        try:
+            return json.loads((self.root / f"{stem}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def evict(self, keep: str | None = None) -> list[str]:
+        """Delete least recently used files until the folder is within quota."""
+        removed = []
+        with self._lock:
+            total = sum(e["size"] for e in self._index.values())
+            by_age = sorted(self._index.items(), key=lambda item: item[1]["last_used"])
+            for stem, entry in by_age:
+                over_size = total > self.max_bytes
+                over_count = self.max_files and len(self._index) > self.max_files
+                if not (over_size or over_count):
+                    break
+                if stem == keep:
+                    continue
+                for suffix in (".mp3", ".json"):
+                    try:
+                        (self.root / f"{stem}{suffix}").unlink()
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        print(f"[LIBRARY] Could not remove {stem}{suffix}: {e}")
+                del self._index[stem]
+                total -= entry["size"]
+                removed.append(stem)
+        if removed:
+            print(f"[LIBRARY] Evicted {len(removed)} file(s) to stay under quota")
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = sum(e["size"] for e in self._index.values())
+            files = len(self._index)
+        lookups = self.hits + self.misses
+        return {
+            "files": files,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,244 @@
+"""
+Helper Micro-Benchmarks
+Times the pure-Python helpers on realistic fixtures and writes a JSON report to compare commits
+
+Each case has a time budget; with ``--baseline`` a previous report is also
+compared and cases slower by more than ``--tolerance`` are flagged. Modules
+that cannot be imported here (missing dependencies, newer Python needed) are
+reported as skipped. Module-level side effects (folders, logs, caches) land
+in a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_helpers [--json report.json] [--baseline old.json] [--tolerance 0.25]
+                                       [--filter extract_video_id] [--min-time 0.2]
+"""
+
+import argparse
+import builtins
+import contextlib
+import importlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import fixtures
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _song_list_reader(downloader_cls):
+    """Drive the interactive ``get_song_list`` with a paste instead of a keyboard."""
+    downloader = downloader_cls.__new__(downloader_cls)
+
+    def run(paste):
+        lines = iter(paste.split("\n") + [""])
+        original = builtins.input
+        builtins.input = lambda *_: next(lines)
+        try:
+            return downloader.get_song_list()
+        finally:
+            builtins.input = original
+
+    return run
+
+
+def _method(cls_name, method_name):
+    def load(module):
+        cls = getattr(module, cls_name)
+        return getattr(cls.__new__(cls), method_name)
+    return load
+
+
+def _each(fn):
+    """Apply a per-item helper across a whole fixture list."""
+    return lambda items: [fn(item) for item in items]
+
+
+# name, module, loader(module) -> callable(fixture), fixture name, budget in ms per call
+CASES = [
+    ("parse_song_list[app_web] 1000 lines", "app_web", lambda m: m.parse_song_list, "paste_lines", 15),
+    ("parse_song_list[app_web] 1000 inline", "app_web", lambda m: m.parse_song_list, "paste_inline", 15),
+    ("parse_song_list[song_list_parser] 10000 lines", "song_list_parser", lambda m: m.parse_song_list,
+     "paste_lines_10k", 100),
+    ("parse_song_list[song_list_parser] 10000 inline", "song_list_parser", lambda m: m.parse_song_list,
+     "paste_inline_10k", 100),
+    ("get_song_list[youtube_auto_downloader] 1000 lines", "youtube_auto_downloader",
+     lambda m: _song_list_reader(m.YouTubeAutoDownloader), "paste_lines", 40),
+    ("get_song_list[youtube_auto_downloader] 1000 inline", "youtube_auto_downloader",
+     lambda m: _song_list_reader(m.YouTubeAutoDownloader), "paste_inline", 40),
+    ("extract_video_id[app_web] x1000", "app_web", lambda m: _each(m.extract_video_id), "urls", 25),
+    ("extract_video_id[app] x1000", "app", lambda m: _each(m.extract_video_id), "urls", 5),
+    ("extract_video_id[youtube_auto_downloader] x1000", "youtube_auto_downloader",
+     lambda m: _each(_method("YouTubeAutoDownloader", "extract_video_id")(m)), "urls", 5),
+    ("extract_video_id[quick_thumbnail_downloader] x1000", "quick_thumbnail_downloader",
+     lambda m: _each(_method("QuickThumbnailDownloader", "extract_video_id")(m)), "urls", 5),
+    ("extract_video_id[fast_audio_downloader] x1000", "fast_audio_downloader",
+     lambda m: _each(_method("FastYTAudioDownloader", "extract_video_id")(m)), "urls", 5),
+    ("process_cookie_string[app] 3000 lines", "app", lambda m: m.process_cookie_string, "cookies", 35),
+    ("parse_duration[app] x1000", "app", lambda m: _each(m.parse_duration), "durations", 5),
+    ("parse_watch_page_qualities[app] 500 KB", "app",
+     lambda m: lambda page: m.parse_watch_page_qualities("dQw4w9WgXcQ", page), "watch_page", 10),
+    ("clean_filename[youtube_auto_downloader] x1000", "youtube_auto_downloader",
+     lambda m: _each(_method("YouTubeAutoDownloader", "clean_filename")(m)), "titles", 10),
+    ("clean_filename[quick_thumbnail_downloader] x1000", "quick_thumbnail_downloader",
+     lambda m: _each(_method("QuickThumbnailDownloader", "clean_filename")(m)), "titles", 10),
+    ("clean_filename_simple[fast_audio_downloader] x1000", "fast_audio_downloader",
+     lambda m: _each(_method("FastYTAudioDownloader", "clean_filename_simple")(m)), "titles", 10),
+]
+
+
+def build_fixtures() -> dict:
+    return {
+        "paste_lines": fixtures.build_song_paste(1000),
+        "paste_inline": fixtures.build_song_paste(1000, inline=True),
+        "paste_lines_10k": fixtures.build_song_paste(10000),
+        "paste_inline_10k": fixtures.build_song_paste(10000, inline=True),
+        "urls": fixtures.build_video_urls(1000),
+        "cookies": fixtures.build_cookie_file(3000),
+        "durations": fixtures.build_iso_durations(1000),
+        "watch_page": fixtures.build_watch_page(padding_kb=500),
+        "titles": fixtures.build_titles(1000),
+    }
+
+
+def import_modules(names, workdir) -> dict:
+    """Import each app module from ``workdir``; values are modules or the error that stopped them."""
+    os.environ.setdefault("DRIVER_POOL_PREWARM", "0")
+    os.environ.setdefault("VIDEO_CACHE_PATH", str(Path(workdir) / "video_cache.sqlite3"))
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    loaded = {}
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        for name in names:
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    loaded[name] = importlib.import_module(name)
+            except BaseException as e:  # SyntaxError, ImportError, SystemExit from a module...
+                loaded[name] = f"{type(e).__name__}: {e}"
+    finally:
+        os.chdir(cwd)
+    return loaded
+
+
+def measure(fn, arg, min_time: float = 0.2, repeat: int = 5) -> dict:
+    """Best and median milliseconds per call over ``repeat`` batches of at least ``min_time / repeat``."""
+    batch = max(min_time / repeat, 0.005)
+    number = 1
+    with contextlib.redirect_stdout(io.StringIO()):
+        while True:
+            started = time.perf_counter()
+            for _ in range(number):
+                fn(arg)
+            if time.perf_counter() - started >= batch:
+                break
+            number *= 2
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                fn(arg)
+            samples.append((time.perf_counter() - started) / number * 1000)
+    return {"best_ms": round(min(samples), 4), "median_ms": round(statistics.median(samples), 4),
+            "calls_per_batch": number}
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(name_filter: str = "", min_time: float = 0.2, baseline: dict | None = None,
+              tolerance: float = 0.25) -> dict:
+    cases = [case for case in CASES if name_filter in case[0]]
+    data = build_fixtures()
+    workdir = tempfile.mkdtemp(prefix="bench_helpers_")
+    modules = import_modules(sorted({case[1] for case in cases}), workdir)
+    previous = {row["name"]: row for row in (baseline or {}).get("results", []) if row.get("status") != "skipped"}
+    results = []
+    logging.disable(logging.INFO)  # app.py logs every format it finds; time the parsing, not the log I/O
+    try:
+        for name, module_name, loader, fixture_name, budget_ms in cases:
+            row = {"name": name, "module": module_name, "fixture": fixture_name, "budget_ms": budget_ms}
+            module = modules[module_name]
+            if isinstance(module, str):
+                row.update(status="skipped", reason=module)
+                results.append(row)
+                continue
+            cwd = os.getcwd()
+            os.chdir(workdir)
+            try:
+                row.update(measure(loader(module), data[fixture_name], min_time=min_time))
+            except Exception as e:
+                row.update(status="error", reason=f"{type(e).__name__}: {e}")
+                results.append(row)
+                continue
+            finally:
+                os.chdir(cwd)
+            row["status"] = "ok" if row["best_ms"] <= budget_ms else "over_budget"
+            before = previous.get(name)
+            if before:
+                row["baseline_ms"] = before["best_ms"]
+                row["change"] = round(row["best_ms"] / before["best_ms"] - 1, 3) if before["best_ms"] else None
+                if row["change"] is not None and row["change"] > tolerance:
+                    row["status"] = "regressed"
+            results.append(row)
+    finally:
+        logging.disable(logging.NOTSET)
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "tolerance": tolerance,
+        "results": results,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"{'case':54} {'best ms':>9} {'median ms':>10} {'budget':>7} {'change':>8}  status")
+    for row in report["results"]:
+        if row["status"] in ("skipped", "error"):
+            print(f"{row['name']:54} {'-':>9} {'-':>10} {row['budget_ms']:>7} {'-':>8}  {row['status']} ({row['reason'][:60]})")
+            continue
+        change = f"{row['change'] * 100:+.0f}%" if row.get("change") is not None else "-"
+        print(f"{row['name']:54} {row['best_ms']:>9.3f} {row['median_ms']:>10.3f} {row['budget_ms']:>7} "
+              f"{change:>8}  {row['status']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds spent timing each case")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    report = run_suite(args.filter, args.min_time, baseline, args.tolerance)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    failed = [row for row in report["results"] if row["status"] in ("over_budget", "regressed", "error")]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Search Page Parser Benchmark
+Compares the single-pass ytInitialData parser against the old regex + per-ID scan
+
+Usage:
+    python -m benchmarks.bench_search_parser                 # synthesized pages
+    python -m benchmarks.bench_search_parser saved/*.html    # pages saved from youtube.com/results
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.fixtures import build_search_page
+from yt_search_parser import first_long_form, parse_search_results
+
+
+def legacy_pick(html: str) -> str | None:
+    """The previous app_web.search_youtube_video logic, kept verbatim for comparison."""
+    matches = re.findall(r'"videoId":"([a-zA-Z0-9_-]{11})"', html)
+    for video_id in matches[:15]:
+        if f"/shorts/{video_id}" in html:
+            continue
+        if len(video_id) == 11:
+            return video_id
+    return None
+
+
+def parser_pick(html: str) -> str | None:
+    best = first_long_form(parse_search_results(html), limit=15)
+    return best["video_id"] if best else None
+
+
+def time_per_call(fn, html: str, repeat: int) -> float:
+    """Best-of-3 mean CPU time per call, in milliseconds."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.process_time()
+        for _ in range(repeat):
+            fn(html)
+        best = min(best, (time.process_time() - start) / repeat)
+    return best * 1000
+
+
+def load_pages(paths):
+    if paths:
+        return [(Path(p).name, Path(p).read_text(encoding="utf-8", errors="replace")) for p in paths]
+    return [
+        ("synthetic-no-shorts", build_search_page(shorts=0, leading_shorts=0, seed=1)),
+        ("synthetic-2-leading-shorts", build_search_page(seed=2)),
+        ("synthetic-6-leading-shorts", build_search_page(shorts=10, leading_shorts=6, seed=3)),
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pages", nargs="*", help="saved YouTube search result pages (.html)")
+    parser.add_argument("--repeat", type=int, default=20, help="calls per timing sample")
+    args = parser.parse_args(argv)
+
+    print(f"{'page':32} {'KB':>6} {'legacy ms':>10} {'parser ms':>10} {'speedup':>8}  match")
+    mismatches = 0
+    for name, html in load_pages(args.pages):
+        legacy_id, parser_id = legacy_pick(html), parser_pick(html)
+        legacy_ms = time_per_call(legacy_pick, html, args.repeat)
+        parser_ms = time_per_call(parser_pick, html, args.repeat)
+        same = legacy_id == parser_id
+        mismatches += not same
+        print(f"{name[:32]:32} {len(html) // 1024:>6} {legacy_ms:>10.3f} {parser_ms:>10.3f} "
+              f"{legacy_ms / parser_ms if parser_ms else float('inf'):>7.1f}x  "
+              f"{'yes' if same else f'NO ({legacy_id} vs {parser_id})'}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
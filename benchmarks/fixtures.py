@@ -0,0 +1,193 @@
+"""
+Benchmark Fixtures
+Synthesizes YouTube search result pages shaped like the real thing
+"""
+
+import json
+import random
+import string
+
+_ID_CHARS = string.ascii_letters + string.digits + "-_"
+
+
+def _video_id(rng: random.Random) -> str:
+    return "".join(rng.choice(_ID_CHARS) for _ in range(11))
+
+
+def _video_renderer(rng: random.Random, video_id: str, index: int) -> dict:
+    minutes, seconds = rng.randint(2, 9), rng.randint(0, 59)
+    return {"videoRenderer": {
+        "videoId": video_id,
+        "thumbnail": {"thumbnails": [
+            {"url": f"https://i.ytimg.com/vi/{video_id}/hq720.jpg", "width": 360, "height": 202},
+        ]},
+        "title": {"runs": [{"text": f"Song Title {index} (Official Video)"}]},
+        "longBylineText": {"runs": [{"text": f"Artist {index}"}]},
+        "ownerText": {"runs": [{"text": f"Artist {index}"}]},
+        "lengthText": {"simpleText": f"{minutes}:{seconds:02d}"},
+        "viewCountText": {"simpleText": f"{rng.randint(1000, 90_000_000):,} views"},
+        "navigationEndpoint": {
+            "commandMetadata": {"webCommandMetadata": {"url": f"/watch?v={video_id}"}},
+            "watchEndpoint": {"videoId": video_id},
+        },
+        "detailedMetadataSnippets": [{"snippetText": {"runs": [{"text": "lyrics " * 20}]}}],
+        "trackingParams": "".join(rng.choice(_ID_CHARS) for _ in range(120)),
+    }}
+
+
+def _shorts_renderer(rng: random.Random, video_id: str, index: int) -> dict:
+    return {"shortsLockupViewModel": {
+        "entityId": f"shorts-shelf-item-{video_id}",
+        "overlayMetadata": {"primaryText": {"content": f"Short clip {index}"}},
+        "onTap": {"innertubeCommand": {
+            "commandMetadata": {"webCommandMetadata": {"url": f"/shorts/{video_id}"}},
+            "reelWatchEndpoint": {"videoId": video_id},
+        }},
+    }}
+
+
+def build_search_page(videos: int = 20, shorts: int = 8, leading_shorts: int = 2,
+                      padding_kb: int = 600, seed: int = 0) -> str:
+    """Return an HTML page with ``leading_shorts`` Shorts ranked first.
+
+    Real result pages are ~1 MB, most of it inline player/config script; the
+    ``padding_kb`` of filler script before and after ytInitialData stands in
+    for that.
+    """
+    rng = random.Random(seed)
+    items = []
+    short_ids = [_video_id(rng) for _ in range(shorts)]
+    video_ids = [_video_id(rng) for _ in range(videos)]
+    for i, vid in enumerate(short_ids[:leading_shorts]):
+        items.append({"videoRenderer": {
+            **_video_renderer(rng, vid, i)["videoRenderer"],
+            "navigationEndpoint": {
+                "commandMetadata": {"webCommandMetadata": {"url": f"/shorts/{vid}"}},
+                "reelWatchEndpoint": {"videoId": vid},
+            },
+        }})
+    for i, vid in enumerate(video_ids):
+        items.append(_video_renderer(rng, vid, i))
+        if i == 3 and shorts > leading_shorts:
+            items.append({"reelShelfRenderer": {"items": [
+                _shorts_renderer(rng, sid, j) for j, sid in enumerate(short_ids[leading_shorts:])
+            ]}})
+    data = {
+        "responseContext": {"serviceTrackingParams": [{"service": "GFEEDBACK", "params": []}]},
+        "estimatedResults": str(rng.randint(10**5, 10**7)),
+        "contents": {"twoColumnSearchResultsRenderer": {"primaryContents": {"sectionListRenderer": {
+            "contents": [{"itemSectionRenderer": {"contents": items}}],
+        }}}},
+    }
+    filler = "var ytcfg_blob = '" + "x" * (padding_kb * 512) + "';\n"
+    return (
+        "<!DOCTYPE html><html><head><script>" + filler + "</script></head><body>"
+        "<script>var ytInitialData = " + json.dumps(data, separators=(",", ":")) + ";</script>"
+        "<script>" + filler + "</script></body></html>"
+    )
+
+
+
+_WORDS = ("love", "night", "summer", "heart", "dance", "fire", "rain", "city", "dream", "lights",
+          "blue", "gold", "wild", "home", "stay", "falling", "forever", "young", "stars", "river")
+_ARTISTS = ("Ed Sheeran", "The Weeknd", "Dua Lipa", "Arijit Singh", "Sajjan Raj Vaidya", "Taylor Swift",
+            "Coldplay", "Billie Eilish", "Bipul Chettri", "Imagine Dragons", "Adele", "Post Malone")
+_DIGIT_TITLES = ("22", "7 Rings", "Summer of '69", "1999", "4 Minutes", "99 Problems", "Route 66")
+
+
+def _song_title(rng: random.Random) -> str:
+    if rng.random() < 0.1:
+        return rng.choice(_DIGIT_TITLES)
+    words = " ".join(rng.choice(_WORDS).title() for _ in range(rng.randint(1, 4)))
+    suffix = rng.choice(("", "", " (Official Video)", " - Remastered", " feat. Artist", " (Live)"))
+    return f"{rng.choice(_ARTISTS)} - {words}{suffix}"
+
+
+def build_song_paste(count: int = 1000, inline: bool = False, seed: int = 0) -> str:
+    """A numbered song list as users paste it: one per line, or run together on one line."""
+    rng = random.Random(seed)
+    items = [f"{i}. {_song_title(rng)}" for i in range(1, count + 1)]
+    return "".join(items) if inline else "\n".join(items)
+
+
+def build_watch_page(video_id: str = "dQw4w9WgXcQ", padding_kb: int = 500, seed: int = 0) -> str:
+    """A ~``padding_kb`` watch page with ytInitialPlayerResponse carrying muxed and adaptive formats."""
+    rng = random.Random(seed)
+
+    def stream_url(itag):
+        sig = "".join(rng.choice(_ID_CHARS) for _ in range(400))
+        return f"https://rr1---sn-stub.googlevideo.com/videoplayback?expire=1&itag={itag}&id={video_id}&sig={sig}"
+
+    adaptive = []
+    for itag, height, mime in ((313, 2160, "video/webm"), (271, 1440, "video/webm"), (137, 1080, "video/mp4"),
+                               (248, 1080, "video/webm"), (136, 720, "video/mp4"), (247, 720, "video/webm"),
+                               (135, 480, "video/mp4"), (244, 480, "video/webm"), (134, 360, "video/mp4"),
+                               (243, 360, "video/webm"), (133, 240, "video/mp4"), (160, 144, "video/mp4")):
+        adaptive.append({"itag": itag, "url": stream_url(itag), "mimeType": f'{mime}; codecs="avc1.640028"',
+                         "bitrate": rng.randint(10**5, 10**7), "width": height * 16 // 9, "height": height,
+                         "qualityLabel": f"{height}p", "fps": 30, "contentLength": str(rng.randint(10**6, 10**8))})
+    for itag in (140, 249, 250, 251):
+        adaptive.append({"itag": itag, "url": stream_url(itag), "mimeType": 'audio/webm; codecs="opus"',
+                         "bitrate": rng.randint(5 * 10**4, 2 * 10**5), "audioQuality": "AUDIO_QUALITY_MEDIUM"})
+    player = {
+        "playabilityStatus": {"status": "OK"},
+        "streamingData": {
+            "expiresInSeconds": "21540",
+            "formats": [{"itag": 18, "url": stream_url(18), "mimeType": "video/mp4", "width": 640,
+                         "height": 360, "qualityLabel": "360p"}],
+            "adaptiveFormats": adaptive,
+        },
+        "videoDetails": {"videoId": video_id, "title": "Song Title (Official Video)", "lengthSeconds": "213",
+                         "keywords": [rng.choice(_WORDS) for _ in range(30)], "shortDescription": "lyrics " * 200},
+    }
+    player_json = json.dumps(player, separators=(",", ":"))
+    filler = "var ytcfg_blob = '" + "x" * (max(0, padding_kb * 1024 - len(player_json)) // 2) + "';\n"
+    return (
+        "<!DOCTYPE html><html><head><script>" + filler + "</script></head><body>"
+        "<script>var ytInitialPlayerResponse = " + player_json + ";var meta = document.createElement('meta');</script>"
+        "<script>" + filler + "</script></body></html>"
+    )
+
+
+def build_cookie_file(lines: int = 3000, seed: int = 0) -> str:
+    """A Netscape cookie export with comments, blank lines and space- or tab-separated fields."""
+    rng = random.Random(seed)
+    out = ["# Netscape HTTP Cookie File", "# https://curl.haxx.se/rfc/cookie_spec.html",
+           "# This is a generated file!  Do not edit.", ""]
+    domains = (".youtube.com", "www.youtube.com", ".google.com", "accounts.google.com", ".doubleclick.net")
+    while len(out) < lines:
+        if rng.random() < 0.02:
+            out.append("")
+            continue
+        sep = "\t" if rng.random() < 0.7 else rng.choice(("  ", " ", " \t"))
+        value = "".join(rng.choice(_ID_CHARS) for _ in range(rng.randint(10, 180)))
+        fields = (rng.choice(domains), "TRUE", "/", rng.choice(("TRUE", "FALSE")),
+                  str(rng.randint(1.7e9, 1.9e9)), f"COOKIE_{len(out)}", value)
+        out.append(sep.join(fields))
+    return "\r\n".join(out) + "\r\n"
+
+
+def build_iso_durations(count: int = 1000, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    durations = []
+    for _ in range(count):
+        hours, minutes, seconds = rng.choice((0, 0, 0, 1, 2)), rng.randint(0, 59), rng.randint(0, 59)
+        text = "PT" + (f"{hours}H" if hours else "") + (f"{minutes}M" if minutes else "") + (f"{seconds}S" if seconds else "")
+        durations.append(text if text != "PT" else "PT0S")
+    return durations
+
+
+def build_video_urls(count: int = 1000, seed: int = 0) -> list[str]:
+    """Watch, short-link, Shorts, embed and mobile URLs, some with extra query parameters."""
+    rng = random.Random(seed)
+    shapes = ("https://www.youtube.com/watch?v={id}", "https://www.youtube.com/watch?v={id}&list=PL{x}&index=3",
+              "https://youtu.be/{id}?si={x}", "https://www.youtube.com/shorts/{id}",
+              "https://www.youtube.com/embed/{id}?autoplay=1", "https://m.youtube.com/watch?feature=share&v={id}")
+    return [rng.choice(shapes).format(id=_video_id(rng), x=_video_id(rng)) for _ in range(count)]
+
+
+def build_titles(count: int = 1000, seed: int = 0) -> list[str]:
+    """Video titles with emoji, punctuation and non-Latin text, as fed to clean_filename."""
+    rng = random.Random(seed)
+    decorations = ("", " 🔥", " | Official Music Video", " [4K]", " (नेपाली गीत)", " — Live @ Wembley!", ' "Acoustic"')
+    return [_song_title(rng) + rng.choice(decorations) for _ in range(count)]
@@ -0,0 +1,164 @@
+"""
+Web Load Driver
+Replays concurrent /api/search and /api/download-audio requests and reports latency percentiles
+
+Run app_web.py against the stubs (``python -m benchmarks.stubs``) for reproducible
+numbers. ``download-audio`` latency is measured until the job finishes, polling
+``/api/jobs/<id>``; the time to the 202 response is reported separately.
+
+Usage:
+    python -m benchmarks.load_driver [--base-url http://127.0.0.1:5000] [--endpoint search]
+                                     [--requests 100] [--concurrency 8] [--json report.json]
+"""
+
+import argparse
+import json
+import random
+import string
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(name: str, samples: list, wall_seconds: float) -> dict:
+    """``samples`` are ``(ok, seconds)`` pairs."""
+    latencies = sorted(seconds for ok, seconds in samples if ok)
+    ok = len(latencies)
+    return {
+        "name": name,
+        "requests": len(samples),
+        "ok": ok,
+        "errors": len(samples) - ok,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(ok / wall_seconds, 2) if wall_seconds else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+    }
+
+
+def _session(concurrency: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(10, concurrency))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _run(fn, count: int, concurrency: int):
+    """Call ``fn(i)`` ``count`` times on ``concurrency`` threads; returns (results, wall seconds)."""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fn, range(count)))
+    return results, time.perf_counter() - started
+
+
+def search_load(base_url: str, count: int, concurrency: int, songs_per_request: int, tag: str) -> list[dict]:
+    session = _session(concurrency)
+
+    def one(i):
+        songs = "\n".join(f"{j + 1}. Benchmark Song {tag} {i}-{j}" for j in range(songs_per_request))
+        began = time.perf_counter()
+        try:
+            response = session.post(f"{base_url}/api/search", json={"songs": songs}, timeout=120)
+            ok = response.status_code == 200 and response.json().get("success")
+        except (requests.RequestException, ValueError):
+            ok = False
+        return bool(ok), time.perf_counter() - began
+
+    samples, wall = _run(one, count, concurrency)
+    return [summarize(f"search ({songs_per_request} songs)", samples, wall)]
+
+
+def download_load(base_url: str, count: int, concurrency: int, distinct_videos: int, tag: str,
+                  poll: float, job_timeout: float) -> list[dict]:
+    session = _session(concurrency)
+    rng = random.Random(tag)
+    alphabet = string.ascii_letters + string.digits
+    video_ids = ["".join(rng.choice(alphabet) for _ in range(11)) for _ in range(distinct_videos)]
+    accepted = []
+    lock = threading.Lock()
+
+    def one(i):
+        url = f"https://www.youtube.com/watch?v={video_ids[i % len(video_ids)]}"
+        began = time.perf_counter()
+        try:
+            response = session.post(f"{base_url}/api/download-audio", json={"youtube_url": url}, timeout=30)
+            data = response.json()
+            with lock:
+                accepted.append((response.status_code in (200, 202), time.perf_counter() - began))
+            if not data.get("success"):
+                return False, time.perf_counter() - began
+            status_url = data.get("status_url")
+            while status_url:
+                if time.perf_counter() - began > job_timeout:
+                    return False, time.perf_counter() - began
+                time.sleep(poll)
+                data = session.get(f"{base_url}{status_url}", timeout=30).json()
+                if data.get("stage") in ("done", "failed"):
+                    break
+            return bool(data.get("success")), time.perf_counter() - began
+        except (requests.RequestException, ValueError):
+            return False, time.perf_counter() - began
+
+    samples, wall = _run(one, count, concurrency)
+    return [
+        summarize("download-audio (accepted)", accepted, wall),
+        summarize(f"download-audio (complete, {distinct_videos} videos)", samples, wall),
+    ]
+
+
+def print_report(rows: list[dict]) -> None:
+    print(f"{'scenario':40} {'ok/req':>9} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for row in rows:
+        print(f"{row['name']:40} {row['ok']:>4}/{row['requests']:<4} {row['throughput_rps']:>8.2f} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000", help="app_web.py under test")
+    parser.add_argument("--endpoint", choices=("search", "download-audio", "both"), default="search")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--songs-per-request", type=int, default=5)
+    parser.add_argument("--distinct-videos", type=int, default=0,
+                        help="download-audio: cycle through this many video IDs (default: one per request)")
+    parser.add_argument("--poll", type=float, default=0.5, help="job status poll interval")
+    parser.add_argument("--job-timeout", type=float, default=300)
+    parser.add_argument("--tag", default=None, help="run tag mixed into songs/video IDs (default: random, "
+                        "so caches start cold; reuse a tag to measure warm caches)")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    base_url = args.base_url.rstrip("/")
+    tag = args.tag or "".join(random.choice(string.ascii_lowercase) for _ in range(6))
+    rows = []
+    if args.endpoint in ("search", "both"):
+        rows += search_load(base_url, args.requests, args.concurrency, args.songs_per_request, tag)
+    if args.endpoint in ("download-audio", "both"):
+        rows += download_load(base_url, args.requests, args.concurrency, args.distinct_videos or args.requests,
+                              tag, args.poll, args.job_timeout)
+    print(f"run tag: {tag}, concurrency {args.concurrency}")
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"tag": tag, "base_url": base_url, "concurrency": args.concurrency, "results": rows}, fh, indent=2)
+    return 0 if all(row["errors"] == 0 for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
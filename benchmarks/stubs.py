@@ -0,0 +1,356 @@
+"""
+Benchmark Stub Servers
+Local stand-ins for YouTube, ezconv, the media CDN, the YouTube Data API and Supabase storage
+
+Each stub runs on its own ephemeral port. Point the apps at them with the
+environment variables printed on start-up (YOUTUBE_BASE_URL, EZCONV_URL,
+YOUTUBE_API_ENDPOINT, SUPABASE_URL). yt-dlp still talks to the real YouTube.
+
+Usage:
+    python -m benchmarks.stubs [--convert-delay 3] [--media-kb 4096] [--per-conn-mbps 40]
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from benchmarks.fixtures import build_search_page
+
+_RANGE_RE = re.compile(r"bytes=(\d+)-(\d*)")
+
+# One MPEG-1 Layer III frame: 128 kbit/s, 44.1 kHz, stereo, no padding (417 bytes)
+_MP3_FRAME = b"\xff\xfb\x90\x00" + bytes(413)
+
+
+def synthetic_mp3(size: int) -> bytes:
+    """Silent constant-bitrate MP3 of about ``size`` bytes (whole frames)."""
+    return _MP3_FRAME * max(1, size // len(_MP3_FRAME))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Base handler; ``config`` is filled in per server by ``start_server``."""
+
+    protocol_version = "HTTP/1.1"
+    config: dict = {}
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, status: int, body, content_type: str, headers: dict | None = None) -> None:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def send_json(self, status: int, data) -> None:
+        self.send_body(status, json.dumps(data), "application/json; charset=utf-8")
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def simulate_latency(self) -> None:
+        latency = self.config.get("latency", 0)
+        if latency:
+            time.sleep(latency)
+
+    def send_range(self, payload: bytes, content_type: str = "audio/mpeg") -> None:
+        """Serve ``payload`` honouring ``Range``, throttled per connection like a CDN edge."""
+        start, end = 0, len(payload) - 1
+        match = _RANGE_RE.match(self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), end) if match.group(2) else end
+            if start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(payload)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(payload)}")
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        rate = self.config.get("per_conn_bytes_per_sec") or 0
+        drop = self.config.get("drop_once")
+        block = 64 * 1024
+        pos = start
+        began = time.monotonic()
+        while pos <= end:
+            data = payload[pos:min(pos + block, end + 1)]
+            try:
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            pos += len(data)
+            if drop is not None and not drop.is_set() and pos - start > (end - start) // 2 > block:
+                drop.set()
+                self.close_connection = True
+                self.connection.shutdown(2)
+                return
+            if rate:
+                ahead = (pos - start) / rate - (time.monotonic() - began)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+
+def start_server(handler_cls, **config):
+    """Run ``handler_cls`` on an ephemeral localhost port; returns (server, base_url)."""
+    handler = type(handler_cls.__name__, (handler_cls,), {"config": config})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name=f"stub-{handler_cls.__name__}", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+# ----------------------------------------------------------------------
+# YouTube (search results and watch pages)
+# ----------------------------------------------------------------------
+class YouTubeHandler(StubHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self.simulate_latency()
+        if url.path == "/results":
+            search = query.get("search_query", [""])[0]
+            page = build_search_page(padding_kb=self.config.get("padding_kb", 600),
+                                     seed=zlib.crc32(search.encode("utf-8")))
+            self.send_body(200, page, "text/html; charset=utf-8")
+        elif url.path == "/watch":
+            player = {"streamingData": {"formats": [], "adaptiveFormats": [
+                {"itag": itag, "mimeType": "video/mp4", "height": height, "qualityLabel": f"{height}p"}
+                for itag, height in ((137, 1080), (136, 720), (135, 480), (134, 360))
+            ]}}
+            page = f"<html><body><script>var ytInitialPlayerResponse = {json.dumps(player)};</script></body></html>"
+            self.send_body(200, page, "text/html; charset=utf-8")
+        else:
+            self.send_body(404, "not found", "text/plain")
+
+
+# ----------------------------------------------------------------------
+# ezconv (converter page whose Download MP3 link appears after a delay)
+# ----------------------------------------------------------------------
+_EZCONV_PAGE = """<!DOCTYPE html>
+<html><head><title>ezconv stub</title></head>
+<body>
+<div id="onetrust-consent-sdk" style="display:%(banner)s">
+  <button id="onetrust-accept-btn-handler"
+          onclick="document.cookie='OptanonAlertBoxClosed=1; path=/'; this.parentNode.remove()">Accept</button>
+</div>
+<input type="text" id="url" placeholder="Paste YouTube URL">
+<button id="convert">Convert</button>
+<div id="result"></div>
+<script>
+document.getElementById('convert').addEventListener('click', function () {
+  var m = document.getElementById('url').value.match(/(?:v=|youtu\\.be\\/|shorts\\/)([0-9A-Za-z_-]{11})/);
+  var id = m ? m[1] : 'unknown0000';
+  document.getElementById('result').textContent = 'Converting...';
+  setTimeout(function () {
+    document.getElementById('result').innerHTML =
+      '<a href="%(media)s/media/' + id + '.mp3">Download MP3</a>';
+  }, %(delay_ms)d);
+});
+</script>
+</body></html>
+"""
+
+
+class EzconvHandler(StubHandler):
+    def do_GET(self):
+        self.simulate_latency()
+        if "OptanonAlertBoxClosed=" in (self.headers.get("Cookie") or "") or not self.config.get("consent"):
+            banner = "none"
+        else:
+            banner = "block"
+        page = _EZCONV_PAGE % {
+            "banner": banner,
+            "media": self.config["media_url"],
+            "delay_ms": int(self.config.get("convert_delay", 3) * 1000),
+        }
+        self.send_body(200, page, "text/html; charset=utf-8", {"Cache-Control": "no-store"})
+
+
+# ----------------------------------------------------------------------
+# Media CDN (range-capable MP3 server)
+# ----------------------------------------------------------------------
+class MediaHandler(StubHandler):
+    def do_GET(self):
+        payload = self.config.get("payload")
+        if payload is None:
+            payload = synthetic_mp3(self.config.get("media_bytes", 4 * 1024 * 1024))
+            self.config["payload"] = payload
+        self.send_range(payload)
+
+    do_HEAD = do_GET
+
+
+def start_media_server(payload: bytes, per_conn_bytes_per_sec: float = 0, drop_once: bool = False):
+    """Range server returning ``payload`` for every path; returns (server, url of one file)."""
+    server, base_url = start_server(MediaHandler, payload=payload,
+                                    per_conn_bytes_per_sec=per_conn_bytes_per_sec,
+                                    drop_once=threading.Event() if drop_once else None)
+    return server, f"{base_url}/media/audio.mp3"
+
+
+# ----------------------------------------------------------------------
+# YouTube Data API v3 (videos.list / channels.list)
+# ----------------------------------------------------------------------
+class DataApiHandler(StubHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        ids = [i for value in query.get("id", []) for i in value.split(",") if i]
+        self.simulate_latency()
+        if url.path.endswith("/youtube/v3/videos"):
+            self.send_json(200, {"kind": "youtube#videoListResponse", "items": [{
+                "id": vid,
+                "snippet": {
+                    "title": f"Stub Video {vid}",
+                    "channelId": f"UC{vid}stubchannel",
+                    "channelTitle": "Stub Channel",
+                    "publishedAt": "2024-01-01T00:00:00Z",
+                    "description": "Served by benchmarks/stubs.py",
+                    "thumbnails": {"high": {"url": f"https://i.ytimg.com/vi/{vid}/hqdefault.jpg"}},
+                },
+                "statistics": {"viewCount": "123456", "likeCount": "2345", "commentCount": "67"},
+                "contentDetails": {"duration": "PT3M45S", "definition": "hd"},
+            } for vid in ids]})
+        elif url.path.endswith("/youtube/v3/channels"):
+            self.send_json(200, {"kind": "youtube#channelListResponse", "items": [{
+                "id": cid,
+                "snippet": {"title": "Stub Channel", "thumbnails": {
+                    "high": {"url": "https://yt3.ggpht.com/stub=s800"},
+                    "default": {"url": "https://yt3.ggpht.com/stub=s88"},
+                }},
+                "statistics": {"subscriberCount": "98765", "videoCount": "42"},
+            } for cid in ids]})
+        else:
+            self.send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+
+# ----------------------------------------------------------------------
+# Supabase storage (upload, list, public download, remove)
+# ----------------------------------------------------------------------
+class SupabaseHandler(StubHandler):
+    def _objects(self) -> dict:
+        return self.config.setdefault("objects", {})
+
+    def _split(self, prefix: str):
+        rest = unquote(urlparse(self.path).path)[len(prefix):]
+        bucket, _, name = rest.partition("/")
+        return bucket, name
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        body = self.read_body()
+        self.simulate_latency()
+        if path.startswith("/storage/v1/object/list/"):
+            bucket, _ = self._split("/storage/v1/object/list/")
+            self.send_json(200, [
+                {"name": name, "id": name, "created_at": meta["created_at"], "updated_at": meta["created_at"],
+                 "metadata": {"size": len(meta["data"]), "mimetype": meta["content_type"]}}
+                for (b, name), meta in sorted(self._objects().items()) if b == bucket
+            ])
+        elif path.startswith("/storage/v1/object/"):
+            bucket, name = self._split("/storage/v1/object/")
+            self._objects()[(bucket, name)] = {
+                "data": body,
+                "content_type": self.headers.get("Content-Type", "application/octet-stream"),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }
+            self.send_json(200, {"Key": f"{bucket}/{name}", "Id": name})
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    do_PUT = do_POST
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path.startswith("/storage/v1/object/public/"):
+            meta = self._objects().get(self._split("/storage/v1/object/public/"))
+            if meta is None:
+                self.send_json(404, {"error": "Object not found"})
+            else:
+                self.send_range(meta["data"], meta["content_type"])
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_DELETE(self):
+        bucket, _ = self._split("/storage/v1/object/")
+        try:
+            prefixes = json.loads(self.read_body() or b"{}").get("prefixes", [])
+        except ValueError:
+            prefixes = []
+        removed = [name for name in prefixes if self._objects().pop((bucket, name), None) is not None]
+        self.send_json(200, [{"name": name} for name in removed])
+
+
+def start_all(convert_delay: float = 3, media_bytes: int = 4 * 1024 * 1024,
+              per_conn_bytes_per_sec: float = 0, padding_kb: int = 600, latency: float = 0,
+              consent: bool = True) -> dict:
+    """Start every stub; returns ``{"servers": [...], "env": {VAR: url}}``."""
+    media, media_url = start_server(MediaHandler, media_bytes=media_bytes,
+                                    per_conn_bytes_per_sec=per_conn_bytes_per_sec)
+    youtube, youtube_url = start_server(YouTubeHandler, padding_kb=padding_kb, latency=latency)
+    ezconv, ezconv_url = start_server(EzconvHandler, media_url=media_url, convert_delay=convert_delay,
+                                      consent=consent, latency=latency)
+    data_api, data_api_url = start_server(DataApiHandler, latency=latency)
+    supabase, supabase_url = start_server(SupabaseHandler, latency=latency)
+    return {
+        "servers": [media, youtube, ezconv, data_api, supabase],
+        "env": {
+            "YOUTUBE_BASE_URL": youtube_url,
+            "EZCONV_URL": f"{ezconv_url}/v820",
+            "YOUTUBE_API_ENDPOINT": data_api_url,
+            "YOUTUBE_API_KEY": "stub-key",
+            "SUPABASE_URL": supabase_url,
+            "SUPABASE_KEY": "stub-key",
+            "BENCH_MEDIA_URL": media_url,
+        },
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--convert-delay", type=float, default=3, help="seconds until Download MP3 appears")
+    parser.add_argument("--media-kb", type=int, default=4096, help="size of every served MP3")
+    parser.add_argument("--per-conn-mbps", type=float, default=0, help="media throttle per connection (0 = none)")
+    parser.add_argument("--padding-kb", type=int, default=600, help="filler script per search results page")
+    parser.add_argument("--latency", type=float, default=0, help="extra seconds before each stub response")
+    parser.add_argument("--no-consent", action="store_true", help="don't show the cookie banner on ezconv")
+    args = parser.parse_args(argv)
+
+    stubs = start_all(convert_delay=args.convert_delay, media_bytes=args.media_kb * 1024,
+                      per_conn_bytes_per_sec=args.per_conn_mbps * 1e6 / 8, padding_kb=args.padding_kb,
+                      latency=args.latency, consent=not args.no_consent)
+    print("Stub servers running. Start the app with:\n")
+    for name, value in stubs["env"].items():
+        print(f"export {name}={value}")
+    print("\nPress Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    for server in stubs["servers"]:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
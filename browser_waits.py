@@ -0,0 +1,155 @@
+"""
+Event-Driven Browser Waits
+Resolves Selenium waits inside the page with a MutationObserver instead of polling chromedriver
+"""
+
+import time
+
+from selenium.common.exceptions import (
+    NoSuchFrameException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+
+# Probes every locator in the top document (and, optionally, same-origin
+# iframes) whenever the DOM changes. A slow interval covers iframe content,
+# which the top-level observer cannot see. Resolves with
+# {element, frame} on a hit (frame is the iframe index, -1 for the top
+# document) or null once timeoutMs passes.
+_WAIT_SCRIPT = r"""
+var locators = arguments[0], clickable = arguments[1], searchFrames = arguments[2],
+    timeoutMs = arguments[3], done = arguments[arguments.length - 1];
+
+function ready(el) {
+  if (!clickable) return true;
+  var style = el.ownerDocument.defaultView.getComputedStyle(el);
+  return el.getClientRects().length > 0 && style.visibility !== 'hidden' && !el.disabled;
+}
+
+function matches(doc, kind, sel) {
+  try {
+    if (kind === 'id') { var el = doc.getElementById(sel); return el ? [el] : []; }
+    if (kind === 'css selector') return Array.prototype.slice.call(doc.querySelectorAll(sel));
+    if (kind === 'xpath') {
+      var snap = doc.evaluate(sel, doc, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null), out = [];
+      for (var i = 0; i < snap.snapshotLength; i++) out.push(snap.snapshotItem(i));
+      return out;
+    }
+  } catch (e) {}
+  return [];
+}
+
+function find(doc) {
+  for (var i = 0; i < locators.length; i++) {
+    var found = matches(doc, locators[i][0], locators[i][1]);
+    for (var j = 0; j < found.length; j++) if (ready(found[j])) return found[j];
+  }
+  return null;
+}
+
+function probe() {
+  var el = find(document);
+  if (el) return {element: el, frame: -1};
+  if (!searchFrames) return null;
+  var frames = document.getElementsByTagName('iframe');
+  for (var k = 0; k < frames.length; k++) {
+    var doc = null;
+    try { doc = frames[k].contentDocument; } catch (e) {}
+    if (doc && find(doc)) return {element: null, frame: k};
+  }
+  return null;
+}
+
+var finished = false, observer = null, interval = null, deadline = null;
+function finish(result) {
+  if (finished) return;
+  finished = true;
+  if (observer) observer.disconnect();
+  clearInterval(interval);
+  clearTimeout(deadline);
+  done(result);
+}
+function check() { var hit = probe(); if (hit) finish(hit); }
+
+check();
+if (finished) return;
+if (timeoutMs <= 0) { finish(null); return; }
+observer = new MutationObserver(check);
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+interval = setInterval(check, 250);
+deadline = setTimeout(function () { finish(null); }, timeoutMs);
+"""
+
+# chromedriver's wording when the document running the wait script goes away
+_NAVIGATION_MESSAGES = (
+    "document unloaded",
+    "execution context was destroyed",
+    "cannot find context",
+    "no such execution context",
+    "target frame detached",
+    "inspected target navigated",
+)
+
+
+def _is_navigation_error(error: WebDriverException) -> bool:
+    """True if ``error`` only means the page changed under the wait script."""
+    if isinstance(error, (StaleElementReferenceException, NoSuchFrameException, TimeoutException)):
+        return True
+    message = (error.msg or "").lower()
+    return any(text in message for text in _NAVIGATION_MESSAGES)
+
+
+def wait_for_element(driver, locators, timeout: float = 10, clickable: bool = False, frames: bool = False):
+    """Wait for the first element matching any of ``locators``.
+
+    ``locators`` are Selenium ``(By.ID | By.CSS_SELECTOR | By.XPATH, selector)``
+    tuples, tried in priority order on every DOM change. With ``clickable``
+    the element must also be visible and enabled. With ``frames``,
+    same-origin iframes are searched too; a hit there leaves the driver
+    switched into that frame (call ``driver.switch_to.default_content()``
+    when done). ``timeout=0`` probes once without waiting. Returns the
+    WebElement, or None on timeout. WebDriver errors other than navigation
+    and stale elements (e.g. a crashed browser) are raised immediately.
+    """
+    locators = [[by, sel] for by, sel in locators]
+    deadline = time.monotonic() + timeout
+    first = True
+    while True:
+        remaining = max(0.0, deadline - time.monotonic())
+        if remaining <= 0 and not first:
+            return None
+        first = False
+        try:
+            driver.set_script_timeout(remaining + 5)
+            hit = driver.execute_async_script(_WAIT_SCRIPT, locators, clickable, frames, int(remaining * 1000))
+        except WebDriverException as e:
+            if not _is_navigation_error(e):
+                raise
+            # The document was replaced mid-wait (navigation); watch the new one
+            time.sleep(0.1)
+            continue
+        if not hit:
+            return None
+        if hit["frame"] < 0:
+            return hit["element"]
+        element = _resolve_in_frame(driver, locators, clickable, hit["frame"])
+        if element is not None:
+            return element
+        time.sleep(0.25)
+
+
+def _resolve_in_frame(driver, locators, clickable, index):
+    """Switch into iframe ``index`` and fetch the element there (elements can't cross frames)."""
+    try:
+        iframe = driver.find_elements(By.TAG_NAME, "iframe")[index]
+        driver.switch_to.frame(iframe)
+        driver.set_script_timeout(5)
+        hit = driver.execute_async_script(_WAIT_SCRIPT, locators, clickable, False, 0)
+        if hit:
+            return hit["element"]
+    except (IndexError, WebDriverException):
+        pass
+    driver.switch_to.default_content()
+    return None
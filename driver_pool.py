@@ -0,0 +1,286 @@
+"""
+Headless Chromium Driver Pool
+Keeps a bounded set of warm Selenium drivers so conversions skip browser start-up
+"""
+
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+def process_tree_rss_mb(root_pid) -> float:
+    """Return the resident memory (MB) of a process and all its descendants.
+
+    Reads /proc directly, so it only reports on Linux; elsewhere it returns 0.
+    """
+    if not root_pid or not os.path.isdir("/proc"):
+        return 0.0
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as fh:
+                stat = fh.read().decode(errors="ignore")
+            # The command name may contain spaces, so split after its closing paren
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+            children.setdefault(ppid, []).append(int(entry))
+        except (OSError, ValueError, IndexError):
+            continue
+    total_kb = 0
+    pending = [int(root_pid)]
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status", "r", encoding="utf-8", errors="ignore") as fh:
+                for line in fh:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024.0
+
+
+class DriverPool:
+    """Bounded pool of reusable Selenium drivers.
+
+    Drivers are created by ``factory(slot)`` (which returns a driver or None),
+    checked for health on checkout, reset between jobs and recycled after
+    ``max_jobs`` uses or once the browser process tree grows past
+    ``max_rss_mb``. ``slot`` is a stable index in ``range(size)`` that no two
+    live drivers share, e.g. for per-browser profile directories. With
+    ``keep_site_data`` the reset between jobs leaves cookies and storage alone.
+    """
+
+    def __init__(self, factory, size=1, max_jobs=25, max_rss_mb=0, blank_url="about:blank",
+                 keep_site_data=False):
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.max_jobs = int(max_jobs)
+        self.max_rss_mb = float(max_rss_mb)
+        self.blank_url = blank_url
+        self.keep_site_data = keep_site_data
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._entries = []
+        self._free_slots = set(range(self.size))
+        self._launching = 0
+        self._closed = False
+        self.created_count = 0
+        self.recycled_count = 0
+
+    # ------------------------------------------------------------------
+    # Driver lifecycle
+    # ------------------------------------------------------------------
+    def _reserve_launch(self):
+        """Claim capacity for one new browser; returns its slot, or None if the pool is full."""
+        with self._lock:
+            if self._closed or len(self._entries) + self._launching >= self.size:
+                return None
+            self._launching += 1
+            slot = min(self._free_slots)
+            self._free_slots.discard(slot)
+            return slot
+
+    def _launch(self, slot):
+        """Start a driver for a reserved slot; returns its entry or None on failure."""
+        started = time.time()
+        try:
+            driver = self.factory(slot)
+        except Exception as e:
+            print(f"[POOL] Browser launch failed: {str(e)[:100]}")
+            driver = None
+        with self._lock:
+            self._launching -= 1
+            if driver is None:
+                self._free_slots.add(slot)
+                return None
+            entry = {"driver": driver, "jobs": 0, "created_at": time.time(), "slot": slot}
+            self._entries.append(entry)
+            self.created_count += 1
+        print(f"[POOL] Browser started in {time.time() - started:.1f}s "
+              f"({len(self._entries)}/{self.size} alive)")
+        return entry
+
+    def _destroy(self, entry, reason=""):
+        """Quit a driver and forget about it."""
+        try:
+            entry["driver"].quit()
+        except Exception:
+            pass
+        # Capacity and the slot are only handed out again once the browser
+        # (and the lock on its profile directory) is gone
+        with self._lock:
+            if entry in self._entries:
+                self._entries.remove(entry)
+                self._free_slots.add(entry["slot"])
+            self.recycled_count += 1
+        if reason:
+            print(f"[POOL] Recycled browser after {entry['jobs']} job(s): {reason}")
+
+    def _is_healthy(self, entry) -> bool:
+        """Cheap liveness probe: one script round trip and a window to work in."""
+        try:
+            driver = entry["driver"]
+            return driver.execute_script("return 1") == 1 and bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def _rss_mb(self, entry) -> float:
+        try:
+            pid = entry["driver"].service.process.pid
+        except Exception:
+            return 0.0
+        return process_tree_rss_mb(pid)
+
+    def _reset(self, entry) -> bool:
+        """Return a driver to a single blank tab (and no site state unless ``keep_site_data``)."""
+        driver = entry["driver"]
+        try:
+            handles = driver.window_handles
+            main = handles[0]
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(main)
+            driver.switch_to.default_content()
+            if not self.keep_site_data:
+                try:
+                    driver.delete_all_cookies()
+                    driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+                except Exception:
+                    pass
+            driver.get(self.blank_url)
+            return True
+        except Exception as e:
+            print(f"[POOL] Reset failed: {str(e)[:100]}")
+            return False
+
+    def _recycle_reason(self, entry):
+        if self.max_jobs and entry["jobs"] >= self.max_jobs:
+            return f"reached {self.max_jobs} jobs"
+        if self.max_rss_mb:
+            rss = self._rss_mb(entry)
+            if rss > self.max_rss_mb:
+                return f"RSS {rss:.0f} MB > {self.max_rss_mb:.0f} MB"
+        return None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def warm(self, background=True):
+        """Pre-launch drivers until the pool holds ``size`` of them."""
+        def _fill():
+            while True:
+                slot = self._reserve_launch()
+                if slot is None:
+                    return
+                entry = self._launch(slot)
+                if entry is None:
+                    return
+                self._idle.put(entry)
+
+        if background:
+            threading.Thread(target=_fill, name="driver-pool-warm", daemon=True).start()
+        else:
+            _fill()
+
+    def acquire(self, timeout=None):
+        """Check out a healthy driver entry, launching one if none is idle.
+
+        Returns None if no slot frees up within ``timeout`` or the browser
+        cannot be started.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            return None
+        try:
+            while True:
+                try:
+                    entry = self._idle.get_nowait()
+                except queue.Empty:
+                    slot = self._reserve_launch()
+                    if slot is not None:
+                        entry = self._launch(slot)
+                    else:
+                        # A warm-up launch holds the spare capacity; wait for it to land
+                        try:
+                            entry = self._idle.get(timeout=timeout or 60)
+                        except queue.Empty:
+                            entry = None
+                    if entry is None:
+                        self._slots.release()
+                        return None
+                if self._is_healthy(entry):
+                    return entry
+                self._destroy(entry, "failed health check")
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, entry):
+        """Return a driver after a job, recycling it if it is worn out."""
+        try:
+            entry["jobs"] += 1
+            reason = None if not self._closed else "pool closed"
+            reason = reason or self._recycle_reason(entry)
+            if reason is None and not self._reset(entry):
+                reason = "reset failed"
+            if reason:
+                self._destroy(entry, reason)
+                if not self._closed:
+                    self.warm()
+            else:
+                self._idle.put(entry)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Context manager yielding a pooled driver (or None if unavailable)."""
+        entry = self.acquire(timeout=timeout)
+        try:
+            yield entry["driver"] if entry else None
+        finally:
+            if entry:
+                self.release(entry)
+
+    def recycle_idle(self, refill=True):
+        """Quit every idle driver, optionally launching fresh replacements."""
+        drained = 0
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._destroy(entry)
+            drained += 1
+        if refill and not self._closed:
+            self.warm()
+        return drained
+
+    def shutdown(self):
+        """Quit all drivers, idle or not, and stop refilling."""
+        self._closed = True
+        self.recycle_idle(refill=False)
+        with self._lock:
+            remaining = list(self._entries)
+        for entry in remaining:
+            self._destroy(entry)
+
+    def stats(self) -> dict:
+        with self._lock:
+            alive = len(self._entries)
+        idle = self._idle.qsize()
+        return {
+            "size": self.size,
+            "alive": alive,
+            "idle": idle,
+            "in_use": alive - idle,
+            "created": self.created_count,
+            "recycled": self.recycled_count,
+        }
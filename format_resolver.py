@@ -0,0 +1,50 @@
+"""
+Stream Format Resolver
+Applies yt-dlp format specs to an already extracted info dict, without running yt-dlp again
+"""
+
+import yt_dlp
+
+# Formats SegmentedDownloader can fetch as a single file (no HLS/DASH manifests)
+DIRECT_PROTOCOLS = ("https", "http")
+
+
+def _selector_context(formats: list) -> dict:
+    """The context yt-dlp's format selectors expect (as built in YoutubeDL.process_video_result)."""
+    return {
+        "formats": formats,
+        "has_merged_format": any(f.get("acodec") != "none" and f.get("vcodec") != "none" for f in formats),
+        "incomplete_formats": (all(f.get("vcodec") == "none" for f in formats)
+                               or all(f.get("acodec") == "none" for f in formats)),
+    }
+
+
+def resolve_stream(info_dict: dict, format_specs) -> dict | None:
+    """First direct stream matching one of ``format_specs``, tried in order.
+
+    Uses yt-dlp's own selector (``build_format_selector``) on the extracted
+    format list, so specs mean exactly what they mean on the command line.
+    Returns ``{"url", "http_headers", "format_id", "format_spec", "ext"}``
+    or None when no spec matches a direct format.
+    """
+    formats = [f for f in (info_dict or {}).get("formats") or []
+               if f.get("url") and f.get("protocol", "https") in DIRECT_PROTOCOLS]
+    if not formats:
+        return None
+    with yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True}) as ydl:
+        for spec in format_specs:
+            try:
+                selector = ydl.build_format_selector(spec)
+                chosen = next(iter(selector(_selector_context(formats))), None)
+            except Exception:
+                # Invalid spec, or a selector this yt-dlp version cannot apply here
+                continue
+            if chosen and chosen.get("url"):
+                return {
+                    "url": chosen["url"],
+                    "http_headers": dict(chosen.get("http_headers") or {}),
+                    "format_id": chosen.get("format_id"),
+                    "format_spec": spec,
+                    "ext": chosen.get("ext"),
+                }
+    return None
@@ -0,0 +1,89 @@
+"""
+Extracted Info Store
+Keeps yt-dlp info JSON per video ID so downloads can reuse an earlier extraction
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_STORE_DIR = Path(__file__).resolve().parent / "cache" / "info_json"
+
+_VIDEO_ID_RE = re.compile(r"^[0-9A-Za-z_-]{11}$")
+
+
+class InfoStore:
+    """``<video_id>.info.json`` files written from an extraction's info dict.
+
+    The files are what ``yt-dlp --load-info-json`` reads, so a later download
+    runs format selection and fetches streams without extracting again.
+    Stream URLs in the info expire (typically after about six hours), so an
+    entry is only handed out for ``ttl`` seconds after it was written.
+    """
+
+    def __init__(self, root=None, ttl: int = 1800, max_files: int = 500):
+        self.root = Path(root) if root else DEFAULT_STORE_DIR
+        self.ttl = ttl
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, video_id: str) -> Path | None:
+        # Video IDs arrive from request bodies; never let one name another path
+        if not video_id or not _VIDEO_ID_RE.match(video_id):
+            return None
+        return self.root / f"{video_id}.info.json"
+
+    def save(self, video_id: str, info: dict) -> str | None:
+        """Write a sanitized info dict; returns the handle (the video ID) or None if unusable."""
+        path = self._path(video_id)
+        if path is None or not info or not info.get("formats"):
+            return None
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(info, fh)
+            os.replace(tmp, path)
+            self._prune()
+        return video_id
+
+    def path_for(self, handle: str) -> Path | None:
+        """Path of a still-fresh info file, else None."""
+        path = self._path(handle)
+        if path is None:
+            return None
+        try:
+            age = time.time() - path.stat().st_mtime
+        except OSError:
+            return None
+        return path if age < self.ttl else None
+
+    def load(self, handle: str) -> dict | None:
+        path = self.path_for(handle)
+        if path is None:
+            return None
+        try:
+            with open(path, encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def _prune(self) -> None:
+        """Delete expired files, then the oldest beyond ``max_files``."""
+        now = time.time()
+        entries = []
+        for path in self.root.glob("*.info.json"):
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            if now - mtime >= self.ttl:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((mtime, path))
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_files)]:
+            path.unlink(missing_ok=True)
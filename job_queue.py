@@ -0,0 +1,159 @@
+"""
+Conversion Job Queue
+Runs long-running conversions on background workers and tracks them by job ID
+"""
+
+import queue
+import threading
+import time
+import uuid
+
+JOB_STAGES = ("queued", "loading", "converting", "downloading", "done", "failed")
+FINAL_STAGES = ("done", "failed")
+
+
+class Job:
+    """A single queued conversion and its progress."""
+
+    def __init__(self, payload: dict, key: str | None = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.payload = payload
+        self.key = key
+        self.requests = 1
+        self.stage = "queued"
+        self.message = "Waiting for a free worker"
+        self.result: dict = {}
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def set_stage(self, stage: str, message: str | None = None) -> None:
+        """Move the job to ``stage`` (one of JOB_STAGES)."""
+        if stage not in JOB_STAGES:
+            raise ValueError(f"Unknown job stage: {stage}")
+        with self._lock:
+            self.stage = stage
+            if message is not None:
+                self.message = message
+            self.updated_at = time.time()
+            if stage in FINAL_STAGES:
+                self.finished_at = self.updated_at
+
+    def publish(self, **fields) -> None:
+        """Expose partial results (e.g. a live stream URL) before the job finishes."""
+        with self._lock:
+            self.result.update(fields)
+            self.updated_at = time.time()
+
+    def finish(self, result: dict) -> None:
+        """Record the handler's result and mark the job done or failed."""
+        with self._lock:
+            self.result.update(result or {})
+        if self.result.get("success"):
+            self.set_stage("done", "Completed")
+        else:
+            self.set_stage("failed", self.result.get("message") or "Conversion failed")
+
+    @property
+    def is_finished(self) -> bool:
+        return self.stage in FINAL_STAGES
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            data = {
+                "job_id": self.id,
+                "stage": self.stage,
+                "message": self.message,
+                "elapsed": round((self.finished_at or time.time()) - self.created_at, 2),
+                "requests": self.requests,
+            }
+            data.update({k: v for k, v in self.result.items() if k not in data})
+        data["success"] = self.stage != "failed"
+        return data
+
+
+class JobQueue:
+    """FIFO job queue drained by a fixed pool of daemon worker threads.
+
+    ``handler(job)`` does the actual work, reporting progress through
+    ``job.set_stage`` and returning a result dict with a ``success`` flag.
+    Jobs submitted with a ``key`` are single-flight: while one is queued or
+    running, submitting the same key returns that job instead of a new one.
+    """
+
+    def __init__(self, handler, workers=1, max_pending=50, retention_seconds=3600):
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.max_pending = int(max_pending)
+        self.retention_seconds = retention_seconds
+        self._queue = queue.Queue()
+        self._jobs: dict[str, Job] = {}
+        self._inflight: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self) -> None:
+        """Start the worker threads (idempotent)."""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"job-worker-{i + 1}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, payload: dict, key: str | None = None) -> Job | None:
+        """Queue a job, or attach to the unfinished one with the same ``key``.
+
+        Returns None when the backlog is full.
+        """
+        self._prune()
+        with self._lock:
+            if key is not None:
+                job = self._inflight.get(key)
+                if job is not None:
+                    job.requests += 1
+                    print(f"[JOBS] Attached request to running job {job.id} ({key}, {job.requests} requests)")
+                    return job
+            if self.max_pending and self._queue.qsize() >= self.max_pending:
+                return None
+            job = Job(payload, key=key)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._inflight[key] = job
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize()
+
+    def _worker(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                job.set_stage("loading", "Starting conversion")
+                job.finish(self.handler(job))
+            except Exception as e:
+                print(f"[JOBS] Job {job.id} crashed: {e}")
+                job.finish({"success": False, "message": f"Automation error: {str(e)[:100]}"})
+            finally:
+                if job.key is not None:
+                    with self._lock:
+                        if self._inflight.get(job.key) is job:
+                            del self._inflight[job.key]
+                self._queue.task_done()
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the retention window."""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [jid for jid, job in self._jobs.items()
+                       if job.is_finished and job.finished_at < cutoff]
+            for jid in expired:
+                del self._jobs[jid]
@@ -0,0 +1,128 @@
+"""
+Live Audio Streaming
+Lets readers follow a file while it is still being downloaded (tee-streaming)
+"""
+
+import threading
+import time
+
+
+class LiveFile:
+    """A file being written front to back, with a readable watermark.
+
+    The writer reports the number of contiguous bytes on disk with
+    ``update()`` and ends with ``finish()`` or ``fail()``. Readers block in
+    ``wait_for()`` until data past their offset is available.
+    """
+
+    def __init__(self, path, expected_size: int | None = None):
+        self.path = path
+        self.expected_size = expected_size
+        self.written = 0
+        self.done = False
+        self.error = None
+        self.started_at = time.time()
+        self._cond = threading.Condition()
+
+    def update(self, contiguous_bytes: int) -> None:
+        with self._cond:
+            if contiguous_bytes > self.written:
+                self.written = contiguous_bytes
+                self._cond.notify_all()
+
+    def finish(self, final_path=None) -> None:
+        """Mark the download complete; ``final_path`` is where the file now lives."""
+        with self._cond:
+            if final_path is not None:
+                self.path = final_path
+            self.done = True
+            self._cond.notify_all()
+
+    def fail(self, error: str) -> None:
+        with self._cond:
+            self.error = error
+            self.done = True
+            self._cond.notify_all()
+
+    def wait_for(self, offset: int, timeout: float) -> int:
+        """Block until more than ``offset`` bytes exist or the writer is done; return the watermark."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.written > offset or self.done, timeout=timeout)
+            return self.written
+
+    def open(self):
+        """Open the file for reading, following a rename done by ``finish()``.
+
+        Unbuffered: the writer may preallocate the file, so any read-ahead
+        past the watermark would pick up zeros that are not written yet.
+        """
+        with self._cond:
+            path = self.path
+        try:
+            return open(path, "rb", buffering=0)
+        except FileNotFoundError:
+            # Renamed into place just now; finish() publishes the new path
+            with self._cond:
+                self._cond.wait_for(lambda: self.path != path or self.error, timeout=5)
+                return open(self.path, "rb", buffering=0)
+
+
+class LiveRegistry:
+    """In-progress downloads by key (video ID)."""
+
+    def __init__(self):
+        self._files: dict[str, LiveFile] = {}
+        self._lock = threading.Lock()
+
+    def open(self, key: str, path, expected_size: int | None = None) -> LiveFile:
+        live = LiveFile(path, expected_size)
+        with self._lock:
+            self._files[key] = live
+        return live
+
+    def get(self, key: str) -> LiveFile | None:
+        with self._lock:
+            return self._files.get(key)
+
+    def close(self, key: str, live: LiveFile) -> None:
+        """Stop advertising ``live``; readers already attached keep going."""
+        with self._lock:
+            if self._files.get(key) is live:
+                del self._files[key]
+
+
+def iter_live(live: LiveFile, start: int = 0, end: int | None = None,
+              chunk_size: int = 64 * 1024, idle_timeout: float = 30):
+    """Yield bytes ``start..end`` (inclusive) of ``live`` as they are written.
+
+    Stops at ``end``, when the writer finishes and everything is sent, when
+    the writer fails, or after ``idle_timeout`` seconds without progress.
+    """
+    offset = start
+    with live.open() as fh:
+        fh.seek(offset)
+        while end is None or offset <= end:
+            available = live.wait_for(offset, timeout=idle_timeout)
+            if live.error:
+                return
+            if available <= offset:
+                if live.done:
+                    # Writer finished; whatever is on disk is the whole file
+                    data = fh.read(chunk_size)
+                    if not data:
+                        return
+                    if end is not None:
+                        data = data[:end - offset + 1]
+                    offset += len(data)
+                    yield data
+                    continue
+                return  # stalled writer
+            limit = available if end is None else min(available, end + 1)
+            while offset < limit:
+                # Read exactly up to the watermark; nothing beyond it is trustworthy yet
+                fh.seek(offset)
+                data = fh.read(min(chunk_size, limit - offset))
+                if not data:
+                    break
+                offset += len(data)
+                yield data
@@ -0,0 +1,192 @@
+"""
+Video Metadata Cache
+Keeps /fetch_info results per video ID, with separate lifetimes for stats, formats and static details
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / "cache" / "metadata_cache.sqlite3"
+
+# Which response fields belong to which class; each class expires on its own
+FIELD_CLASSES = {
+    "static": ("id", "title", "thumbnail", "channel", "channel_name", "channel_logo", "channel_id",
+               "description", "duration"),
+    "stats": ("subscribers", "likes", "views", "comments"),
+    "formats": ("max_quality", "available_qualities", "formats"),
+}
+DEFAULT_TTLS = {"static": 7 * 24 * 3600, "stats": 300, "formats": 1800}
+# Never written to SQLite: yt-dlp's format list is large and its signed stream URLs expire
+MEMORY_ONLY_FIELDS = ("formats",)
+
+# Refresh a video's last_used in SQLite at most this often; memory hits stay write-free
+TOUCH_INTERVAL = 60
+
+
+def _persisted(fields: dict) -> dict:
+    return {name: value for name, value in fields.items() if name not in MEMORY_ONLY_FIELDS}
+
+
+class MetadataCache:
+    """Maps video IDs to the fields of their /fetch_info response.
+
+    ``lookup()`` returns only the fields whose class is still fresh plus the
+    names of the expired classes, so callers can refresh just those (e.g.
+    re-read counts from the Data API while title and formats stay cached).
+    Entries live in an in-memory LRU of ``max_entries`` videos; with a
+    ``path`` they are also written to SQLite (trimmed to ``max_stored``
+    videos) and survive restarts, without the ``MEMORY_ONLY_FIELDS``.
+    """
+
+    def __init__(self, path=None, ttls=None, max_entries=200, max_stored=5000):
+        self.path = Path(path) if path else None
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.max_stored = max_stored
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # video_id -> ({class: (fields, expires_at)}, touched_at)
+        self._lock = threading.Lock()
+        self._conn = None
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS metadata ("
+                " video_id TEXT NOT NULL,"
+                " field_class TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " PRIMARY KEY (video_id, field_class))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_metadata_last_used ON metadata(last_used)")
+
+    def lookup(self, video_id: str) -> tuple[dict, set]:
+        """Return ``(fields, stale_classes)``; everything is stale on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(video_id)
+            if entry is None and self._conn:
+                rows = self._conn.execute(
+                    "SELECT field_class, data, expires_at FROM metadata WHERE video_id = ? AND expires_at > ?",
+                    (video_id, now),
+                ).fetchall()
+                if rows:
+                    entry = ({cls: (json.loads(data), expires_at) for cls, data, expires_at in rows}, 0.0)
+            classes, touched_at = entry if entry else ({}, 0.0)
+            fresh = {cls: value for cls, value in classes.items() if value[1] > now}
+            fields = {}
+            for cls_fields, _ in fresh.values():
+                fields.update(cls_fields)
+            stale = set(FIELD_CLASSES) - set(fresh)
+            if not fresh:
+                self._memory.pop(video_id, None)
+                self.misses += 1
+                return {}, stale
+            if self._conn and now - touched_at > TOUCH_INTERVAL:
+                self._conn.execute("UPDATE metadata SET last_used = ? WHERE video_id = ?", (now, video_id))
+                touched_at = now
+            self._remember(video_id, (fresh, touched_at))
+            if stale:
+                self.partial_hits += 1
+            else:
+                self.hits += 1
+            return fields, stale
+
+    def store(self, video_id: str, info: dict, classes=None) -> None:
+        """Cache the fields of ``info``, for every class or only the given ``classes``."""
+        if not video_id:
+            return
+        now = time.time()
+        updates = {}
+        for cls in classes or FIELD_CLASSES:
+            fields = {name: info[name] for name in FIELD_CLASSES[cls] if name in info}
+            if fields:
+                updates[cls] = (fields, now + self.ttls[cls])
+        if not updates:
+            return
+        with self._lock:
+            current, _ = self._memory.get(video_id, ({}, 0.0))
+            self._remember(video_id, ({**current, **updates}, now))
+            if self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO metadata (video_id, field_class, data, expires_at, last_used)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    [(video_id, cls, json.dumps(_persisted(fields)), expires_at, now)
+                     for cls, (fields, expires_at) in updates.items()],
+                )
+                self._evict()
+
+    def _remember(self, video_id, entry) -> None:
+        self._memory[video_id] = entry
+        self._memory.move_to_end(video_id)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        """Drop expired rows, then the least recently used videos beyond ``max_stored``."""
+        self._conn.execute("DELETE FROM metadata WHERE expires_at <= ?", (time.time(),))
+        count = self._conn.execute("SELECT COUNT(DISTINCT video_id) FROM metadata").fetchone()[0]
+        excess = count - self.max_stored
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM metadata WHERE video_id IN ("
+                " SELECT video_id FROM metadata GROUP BY video_id ORDER BY MAX(last_used) LIMIT ?)",
+                (excess,),
+            )
+
+    def invalidate(self, video_id: str) -> None:
+        with self._lock:
+            self._memory.pop(video_id, None)
+            if self._conn:
+                self._conn.execute("DELETE FROM metadata WHERE video_id = ?", (video_id,))
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_memory = len(self._memory)
+            stored = (self._conn.execute("SELECT COUNT(DISTINCT video_id) FROM metadata").fetchone()[0]
+                      if self._conn else None)
+        lookups = self.hits + self.partial_hits + self.misses
+        return {
+            "in_memory": in_memory,
+            "stored": stored,
+            "hits": self.hits,
+            "partial_hits": self.partial_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_metadata_cache() -> MetadataCache:
+    """Process-wide cache configured from METADATA_CACHE_* environment variables.
+
+    ``METADATA_CACHE_PATH`` set to an empty string keeps the cache in memory only.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            path = os.environ.get("METADATA_CACHE_PATH", str(DEFAULT_CACHE_PATH))
+            _default_cache = MetadataCache(
+                path=path or None,
+                ttls={
+                    "static": int(os.environ.get("METADATA_CACHE_STATIC_TTL", str(DEFAULT_TTLS["static"]))),
+                    "stats": int(os.environ.get("METADATA_CACHE_STATS_TTL", str(DEFAULT_TTLS["stats"]))),
+                    "formats": int(os.environ.get("METADATA_CACHE_FORMATS_TTL", str(DEFAULT_TTLS["formats"]))),
+                },
+                max_entries=int(os.environ.get("METADATA_CACHE_MAX_ENTRIES", "200")),
+                max_stored=int(os.environ.get("METADATA_CACHE_MAX_STORED", "5000")),
+            )
+        return _default_cache
@@ -0,0 +1,275 @@
+"""
+Prometheus Metrics
+In-process stage histograms, counters and gauges rendered in the Prometheus text format
+"""
+
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Stages range from a cache lookup (ms) to an ezconv conversion (minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        unknown = set(labels) - set(self.labelnames)
+        if unknown:
+            raise ValueError(f"Unknown label(s) for {self.name}: {', '.join(sorted(unknown))}")
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: tuple, **extra) -> dict:
+        labels = dict(zip(self.labelnames, key))
+        labels.update(extra)
+        return labels
+
+    def samples(self):
+        """Yield ``(suffix, labels, value)`` for every series."""
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in sorted(items):
+            yield "", self._labels(key), value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency histogram."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the ``with`` block, whether or not it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(s["counts"]), s["sum"]) for key, s in self._values.items()]
+        for key, counts, total in sorted(items):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield "_bucket", self._labels(key, le=_format_value(bound)), cumulative
+            yield "_sum", self._labels(key), total
+            yield "_count", self._labels(key), cumulative
+
+
+class CallbackMetric(_Metric):
+    """Reads its series from ``fn()`` at scrape time, e.g. from an object's ``stats()``.
+
+    ``fn`` returns an iterable of ``(labels_dict, value)`` pairs.
+    """
+
+    def __init__(self, name: str, help_text: str, fn, kind: str = "gauge"):
+        super().__init__(name, help_text)
+        self.fn = fn
+        self.kind = kind
+
+    def samples(self):
+        try:
+            series = list(self.fn())
+        except Exception as e:
+            print(f"[METRICS] Collecting {self.name} failed: {str(e)[:100]}")
+            return
+        for labels, value in series:
+            yield "", labels, value
+
+
+class Registry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(self, name, help_text, fn, kind="gauge") -> CallbackMetric:
+        return self.register(CallbackMetric(name, help_text, fn, kind))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "sonnix_stage_duration_seconds",
+    "Time spent in each stage of a conversion, download or info lookup.",
+    ("stage",),
+)
+FAILURES = REGISTRY.counter(
+    "sonnix_failures_total",
+    "Failed operations by operation and error class.",
+    ("operation", "error"),
+)
+
+
+class StageTimings:
+    """Per-request stage durations, summed by stage name.
+
+    Stages that run in parallel (e.g. the searches of one batch) add up,
+    so their sum can exceed the request's wall time.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._stages: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._stages[stage] = self._stages.get(stage, 0.0) + seconds
+
+    def as_dict(self, total: bool = True) -> dict:
+        """Durations in milliseconds, in the order the stages first ran."""
+        with self._lock:
+            timings = {stage: round(seconds * 1000, 1) for stage, seconds in self._stages.items()}
+        if total:
+            timings["total"] = round((time.perf_counter() - self.started) * 1000, 1)
+        return timings
+
+
+_current_timings: contextvars.ContextVar = contextvars.ContextVar("stage_timings", default=None)
+
+
+@contextmanager
+def collect_timings():
+    """Record every stage timed inside the block (in this context) into a StageTimings."""
+    timings = StageTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def server_timing_header(timings: dict) -> str:
+    """Format ``{stage: ms}`` as a ``Server-Timing`` header value."""
+    return ", ".join(f"{stage};dur={ms}" for stage, ms in timings.items())
+
+
+@contextmanager
+def time_stage(stage: str):
+    """Time one stage into ``sonnix_stage_duration_seconds`` and the current request's timings."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+def record_failure(operation: str, error) -> None:
+    """Count a failure; ``error`` is an exception (counted by class) or an error code."""
+    if isinstance(error, BaseException):
+        error = type(error).__name__
+    FAILURES.inc(operation=operation, error=error or "unknown")
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,112 @@
+"""
+Browser Network Capture
+Watches Chrome DevTools network events (via the performance log) for a specific response
+"""
+
+import json
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+_REQUEST_EVENTS = ("Network.requestWillBeSent",)
+_RESPONSE_EVENTS = ("Network.responseReceived",)
+_DOWNLOAD_EVENTS = ("Page.downloadWillBegin", "Browser.downloadWillBegin")
+
+
+def enable_performance_logging(chrome_options) -> None:
+    """Ask chromedriver to buffer DevTools Network/Page events for ``NetworkCapture``."""
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+def is_mp3(url: str = "", mime_type: str = "", headers: dict | None = None) -> bool:
+    """Heuristic for "this request/response is the MP3 file"."""
+    if url.startswith("data:") or url.startswith("blob:"):
+        return False
+    if ".mp3" in url.lower().split("#")[0]:
+        return True
+    if mime_type.lower().startswith("audio/"):
+        return True
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    return ".mp3" in headers.get("content-disposition", "").lower()
+
+
+class NetworkCapture:
+    """Finds a network request in the driver's DevTools event stream.
+
+    ``start()`` discards buffered events, so only traffic caused by what the
+    caller does next is considered. ``wait_for(match)`` then drains the
+    performance log until an event satisfies ``match(url, mime_type, headers)``.
+    Call ``stop()`` afterwards: pooled browsers outlive the capture.
+    """
+
+    def __init__(self, driver, deny_downloads: bool = True):
+        self.driver = driver
+        self.deny_downloads = deny_downloads
+
+    def _drain(self) -> list:
+        try:
+            return self.driver.get_log("performance")
+        except WebDriverException:
+            return []
+
+    def start(self) -> None:
+        self._drain()
+        if self.deny_downloads:
+            # The file is fetched with requests; don't let Chrome save a second copy
+            self._set_download_behavior("deny")
+
+    def stop(self) -> None:
+        """Give Chrome back its default download behavior."""
+        if self.deny_downloads:
+            self._set_download_behavior("default")
+
+    def _set_download_behavior(self, behavior: str) -> None:
+        try:
+            self.driver.execute_cdp_cmd("Browser.setDownloadBehavior", {"behavior": behavior})
+        except WebDriverException:
+            pass
+
+    def wait_for(self, match=is_mp3, timeout: float = 15, poll: float = 0.1) -> dict | None:
+        """Return ``{url, status, mime_type, request_headers, response_headers}`` or None.
+
+        Resolves on the first matching request; a response seen in the same
+        drain fills in status and headers.
+        """
+        deadline = time.monotonic() + timeout
+        requests_by_id = {}
+        while True:
+            found = None
+            for entry in self._drain():
+                try:
+                    message = json.loads(entry["message"])["message"]
+                except (KeyError, TypeError, ValueError):
+                    continue
+                method, params = message.get("method"), message.get("params", {})
+                if method in _REQUEST_EVENTS:
+                    req = params.get("request", {})
+                    requests_by_id[params.get("requestId")] = req
+                    if found is None and match(req.get("url", "")):
+                        found = {"url": req["url"], "status": None, "mime_type": "",
+                                 "request_headers": req.get("headers", {}), "response_headers": {},
+                                 "request_id": params.get("requestId")}
+                elif method in _RESPONSE_EVENTS:
+                    resp = params.get("response", {})
+                    url, mime = resp.get("url", ""), resp.get("mimeType", "")
+                    headers = resp.get("headers", {})
+                    if found is not None and found["request_id"] == params.get("requestId"):
+                        found.update(status=resp.get("status"), mime_type=mime, response_headers=headers)
+                    elif found is None and match(url, mime, headers):
+                        req = requests_by_id.get(params.get("requestId"), {})
+                        found = {"url": url, "status": resp.get("status"), "mime_type": mime,
+                                 "request_headers": req.get("headers", {}), "response_headers": headers,
+                                 "request_id": params.get("requestId")}
+                elif method in _DOWNLOAD_EVENTS and found is None and (
+                        match(params.get("url", "")) or match(params.get("suggestedFilename", ""))):
+                    found = {"url": params["url"], "status": None, "mime_type": "",
+                             "request_headers": {}, "response_headers": {}, "request_id": None}
+            if found is not None:
+                found.pop("request_id", None)
+                return found
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
@@ -0,0 +1,78 @@
+"""
+Page-Load Profile
+Request blocklist and load settings that get automation pages interactive sooner
+"""
+
+from pathlib import Path
+
+# Ad, tracker, analytics and web-font hosts that ezconv-style converter pages pull
+# in before they become usable. Patterns use Network.setBlockedURLs wildcards.
+# Keep this to third parties only: never list the converter or its CDN.
+DEFAULT_BLOCKED_URLS = (
+    # Ad networks / exchanges
+    "*doubleclick.net*",
+    "*googlesyndication.com*",
+    "*googleadservices.com*",
+    "*adservice.google.*",
+    "*amazon-adsystem.com*",
+    "*adnxs.com*",
+    "*criteo.com*",
+    "*criteo.net*",
+    "*pubmatic.com*",
+    "*rubiconproject.com*",
+    "*openx.net*",
+    "*casalemedia.com*",
+    "*taboola.com*",
+    "*outbrain.com*",
+    "*media.net*",
+    "*adsterra.com*",
+    "*propellerads.com*",
+    "*popads.net*",
+    "*popcash.net*",
+    "*onclickads.net*",
+    "*hilltopads.net*",
+    "*exoclick.com*",
+    # Analytics / trackers
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*googletagservices.com*",
+    "*connect.facebook.net*",
+    "*hotjar.com*",
+    "*scorecardresearch.com*",
+    "*quantserve.com*",
+    "*clarity.ms*",
+    "*cloudflareinsights.com*",
+    # Web fonts
+    "*fonts.googleapis.com*",
+    "*fonts.gstatic.com*",
+    "*.woff2",
+    "*.woff",
+    "*.ttf",
+)
+
+
+def load_blocklist(path=None) -> list[str]:
+    """Default patterns plus any from ``path`` (one per line, ``#`` comments allowed)."""
+    patterns = list(DEFAULT_BLOCKED_URLS)
+    if path:
+        try:
+            for line in Path(path).read_text(encoding="utf-8").splitlines():
+                line = line.split("#", 1)[0].strip()
+                if line and line not in patterns:
+                    patterns.append(line)
+        except OSError as e:
+            print(f"[PAGE] Could not read blocklist {path}: {e}")
+    return patterns
+
+
+def apply_request_blocking(driver, patterns) -> bool:
+    """Make the browser fail requests matching ``patterns`` before they are sent."""
+    if not patterns:
+        return False
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+        return True
+    except Exception as e:
+        print(f"[PAGE] Request blocking unavailable: {str(e)[:100]}")
+        return False
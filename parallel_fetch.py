@@ -0,0 +1,142 @@
+"""
+Parallel Stream Fetch
+Runs yt-dlp stream downloads side by side with shared progress and fail-fast cancellation
+"""
+
+import logging
+import subprocess
+import threading
+import time
+
+PROGRESS_PREFIX = "[sonnix-progress] "
+# Appended to each yt-dlp command so progress arrives as one parseable line per update
+PROGRESS_ARGS = [
+    "--newline",
+    "--progress-template",
+    "download:" + PROGRESS_PREFIX
+    + "%(progress.downloaded_bytes)s %(progress.total_bytes)s %(progress.total_bytes_estimate)s",
+]
+
+
+def _to_int(value: str) -> int | None:
+    try:
+        return int(float(value))
+    except ValueError:  # "NA" when yt-dlp does not know yet
+        return None
+
+
+class ParallelFetch:
+    """Runs named yt-dlp commands at once, e.g. ``{"video": [...], "audio": [...]}``.
+
+    Progress from every stream is parsed into one shared model (see
+    ``progress()``). As soon as one command fails, the others are terminated
+    and ``run()`` raises ``subprocess.CalledProcessError`` for the failure,
+    so the caller handles it exactly like a failed ``subprocess.run(check=True)``.
+    """
+
+    def __init__(self, commands: dict, logger=None, log_interval: float = 5.0):
+        self.commands = {name: list(cmd) + PROGRESS_ARGS for name, cmd in commands.items()}
+        self.logger = logger or logging.getLogger(__name__)
+        self.log_interval = log_interval
+        self._streams = {name: {"downloaded": 0, "total": None, "done": False} for name in commands}
+        self._output = {name: {"stdout": [], "stderr": []} for name in commands}
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Stop every stream; ``run()`` then raises."""
+        self._cancelled.set()
+
+    def progress(self) -> dict:
+        """Per-stream and combined bytes; ``percent`` is None until every total is known."""
+        with self._lock:
+            streams = {name: dict(stream) for name, stream in self._streams.items()}
+        downloaded = sum(stream["downloaded"] for stream in streams.values())
+        totals = [stream["total"] for stream in streams.values()]
+        total = sum(totals) if None not in totals else None
+        return {
+            "streams": streams,
+            "downloaded": downloaded,
+            "total": total,
+            "percent": round(downloaded * 100 / total, 1) if total else None,
+        }
+
+    def _read(self, name: str, pipe, kind: str) -> None:
+        for line in pipe:
+            line = line.rstrip("\n")
+            if kind == "stdout" and line.startswith(PROGRESS_PREFIX):
+                fields = line[len(PROGRESS_PREFIX):].split()
+                if len(fields) == 3:
+                    downloaded, total, estimate = (_to_int(field) for field in fields)
+                    with self._lock:
+                        stream = self._streams[name]
+                        stream["downloaded"] = downloaded or stream["downloaded"]
+                        stream["total"] = total or estimate or stream["total"]
+                continue
+            self._output[name][kind].append(line)
+        pipe.close()
+
+    def _stop(self, procs: dict) -> None:
+        for proc in procs.values():
+            if proc.poll() is None:
+                proc.terminate()
+        for proc in procs.values():
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+    def run(self) -> dict:
+        """Wait for every stream; returns ``{name: CompletedProcess}``."""
+        procs, readers = {}, []
+        try:
+            for name, cmd in self.commands.items():
+                procs[name] = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                               encoding="utf-8", errors="replace")
+                for kind in ("stdout", "stderr"):
+                    reader = threading.Thread(target=self._read, args=(name, getattr(procs[name], kind), kind),
+                                              daemon=True)
+                    reader.start()
+                    readers.append(reader)
+
+            failed = None
+            running = True
+            next_log = time.monotonic() + self.log_interval
+            while not self._cancelled.is_set():
+                running = False
+                for name, proc in procs.items():
+                    code = proc.poll()
+                    if code is None:
+                        running = True
+                    elif code != 0 and failed is None:
+                        failed = name
+                    elif code == 0:
+                        with self._lock:
+                            self._streams[name]["done"] = True
+                if failed or not running:
+                    break
+                if time.monotonic() >= next_log:
+                    snapshot = self.progress()
+                    self.logger.info(f"Streams {', '.join(procs)}: {snapshot['downloaded']} of "
+                                     f"{snapshot['total'] or '?'} bytes ({snapshot['percent'] or '?'}%)")
+                    next_log += self.log_interval
+                self._cancelled.wait(0.2)
+        finally:
+            # Fail fast: a failed or cancelled stream takes the others down with it
+            self._stop(procs)
+            for reader in readers:
+                reader.join(timeout=5)
+
+        results = {
+            name: subprocess.CompletedProcess(self.commands[name], proc.returncode,
+                                              "\n".join(self._output[name]["stdout"]),
+                                              "\n".join(self._output[name]["stderr"]))
+            for name, proc in procs.items()
+        }
+        if failed:
+            result = results[failed]
+            raise subprocess.CalledProcessError(result.returncode, result.args, result.stdout, result.stderr)
+        if running:
+            raise RuntimeError(f"Download cancelled ({', '.join(procs)})")
+        return results
@@ -0,0 +1,133 @@
+"""
+Batch Search Executor
+Resolves many songs concurrently under a shared, self-adjusting rate limit
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class RateLimited(Exception):
+    """Raised by a search function when the upstream answered HTTP 429."""
+
+    def __init__(self, retry_after: float | None = None):
+        super().__init__(f"Rate limited (retry after {retry_after}s)" if retry_after else "Rate limited")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Thread-safe token bucket with additive-increase / multiplicative-decrease.
+
+    ``acquire()`` blocks until a request may be sent. Each 429 halves the
+    refill rate (down to ``min_rate``) and pauses the bucket; each success
+    nudges the rate back towards the configured ``rate``.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None, min_rate: float = 0.2):
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min(float(min_rate), self.base_rate)
+        self.burst = max(1, int(burst or round(rate) or 1))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._last:
+                    # Paused by a recent backoff
+                    wait = self._last - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                    self._last = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def backoff(self, retry_after: float | None = None) -> None:
+        """Slow down after a 429 and hold all callers for a moment."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            pause = retry_after if retry_after else 1.0 / self.rate
+            self._tokens = 0.0
+            self._last = max(self._last, time.monotonic() + pause)
+        print(f"[SEARCH] Rate limited - slowing to {self.rate:.2f} req/s, pausing {pause:.1f}s")
+
+    def recover(self) -> None:
+        """Creep back towards the base rate after a successful request."""
+        with self._lock:
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * 0.1)
+
+
+class BatchSearcher:
+    """Runs ``search_fn(item)`` for many items on a shared bounded thread pool.
+
+    All batches share one ``TokenBucket``, so concurrent requests to the app
+    cannot exceed the upstream budget between them. An optional
+    ``lookup_fn(item)`` returning ``(hit, result)`` is consulted first; hits
+    are answered without taking a token.
+    """
+
+    def __init__(self, search_fn, limiter: TokenBucket, max_workers: int = 4, max_attempts: int = 3,
+                 lookup_fn=None):
+        self.search_fn = search_fn
+        self.lookup_fn = lookup_fn
+        self.limiter = limiter
+        self.max_attempts = max(1, int(max_attempts))
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)),
+                                            thread_name_prefix="search")
+
+    def _search_one(self, item):
+        if self.lookup_fn:
+            try:
+                hit, result = self.lookup_fn(item)
+            except Exception as e:
+                print(f"[SEARCH] Lookup failed for {item}: {str(e)[:100]}")
+                hit = False
+            if hit:
+                return result
+        for attempt in range(self.max_attempts):
+            self.limiter.acquire()
+            try:
+                result = self.search_fn(item)
+            except RateLimited as e:
+                self.limiter.backoff(e.retry_after)
+                continue
+            except Exception as e:
+                print(f"[SEARCH] Error searching for {item}: {str(e)[:100]}")
+                return None
+            self.limiter.recover()
+            return result
+        print(f"[SEARCH] Giving up on {item} after {self.max_attempts} rate-limited attempts")
+        return None
+
+    def iter_results(self, items):
+        """Yield ``(index, item, result)`` tuples as searches complete."""
+        # Each search runs in a copy of the caller's context (per-request stage timings)
+        futures = {
+            self._executor.submit(contextvars.copy_context().run, self._search_one, item): (i, item)
+            for i, item in enumerate(items)
+        }
+        try:
+            for future in as_completed(futures):
+                i, item = futures[future]
+                yield i, item, future.result()
+        finally:
+            # Consumer went away early (e.g. client disconnect): drop queued work
+            for future in futures:
+                future.cancel()
+
+    def run(self, items) -> list:
+        """Search every item and return results in input order."""
+        items = list(items)
+        results = [None] * len(items)
+        for i, _, result in self.iter_results(items):
+            results[i] = result
+        return results
@@ -0,0 +1,211 @@
+"""
+Segmented Downloader
+Fetches large media URLs over several parallel byte-range connections
+"""
+
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+# Errors worth retrying from the last byte written
+_TRANSIENT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class DownloadError(Exception):
+    """The download failed after all retries."""
+
+
+class _RetryableStatus(Exception):
+    pass
+
+
+class SegmentedDownloader:
+    """Downloads a URL into a file using parallel ``Range`` requests.
+
+    The server is probed with a one-byte range request. If it reports a
+    size and honours ranges, the file is preallocated and split into up to
+    ``segments`` parts (each at least ``min_segment_bytes``) fetched on
+    separate pooled connections. Otherwise the probe response itself is
+    streamed to disk. Failed segments retry from their last written byte;
+    if a segment still fails after ``max_retries``, ``DownloadError`` is raised.
+    """
+
+    def __init__(self, session=None, segments: int = 4, min_segment_bytes: int = 1024 * 1024,
+                 chunk_size: int = 128 * 1024, max_retries: int = 3, timeout=(10, 60)):
+        self.segments = max(1, int(segments))
+        self.min_segment_bytes = max(1, int(min_segment_bytes))
+        self.chunk_size = int(chunk_size)
+        self.max_retries = int(max_retries)
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(10, self.segments * 2))
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def download(self, url: str, dest, headers: dict | None = None, progress=None) -> dict:
+        """Fetch ``url`` into ``dest`` and return transfer stats.
+
+        ``progress(contiguous_bytes, total_bytes)`` is called as data lands,
+        where ``contiguous_bytes`` is the fully written prefix of the file
+        (``total_bytes`` is None when the server sends no size).
+        """
+        dest = str(dest)
+        headers = dict(headers or {})
+        headers.setdefault("Accept-Encoding", "identity")
+        started = time.monotonic()
+        probe = self._get(url, headers, "bytes=0-0")
+        total, ranged = None, False
+        try:
+            if probe.status_code == 206:
+                match = _CONTENT_RANGE_RE.match(probe.headers.get("Content-Range", ""))
+                if match and match.group(3) != "*":
+                    total, ranged = int(match.group(3)), True
+            elif probe.status_code == 200 and probe.headers.get("Content-Length"):
+                total = int(probe.headers["Content-Length"])
+            probe.raise_for_status()
+            if not ranged and probe.status_code != 206:
+                # No usable range support: the probe response is the whole body
+                written = self._stream_whole(probe, dest, total, progress)
+                return self._stats(written, started, 1, 0, False)
+            probe.content  # read the one byte so the connection goes back to the pool
+        finally:
+            probe.close()
+
+        if not ranged:
+            # A partial answer without a total size (bytes 0-0/*) holds only the probe byte;
+            # fetch the whole body again without Range
+            with self._get(url, headers, None) as response:
+                response.raise_for_status()
+                length = response.headers.get("Content-Length")
+                total = int(length) if response.status_code == 200 and length else None
+                written = self._stream_whole(response, dest, total, progress)
+            return self._stats(written, started, 1, 0, False)
+
+        parts = max(1, min(self.segments, total // self.min_segment_bytes))
+        size = -(-total // parts)
+        state = [[i * size, min(total, (i + 1) * size) - 1, 0] for i in range(parts)]
+        with open(dest, "wb") as fh:
+            fh.truncate(total)
+        tracker = _Progress(state, total, progress)
+        retries = [0]
+        errors = []
+
+        def fetch(segment):
+            attempts = 0
+            while True:
+                start, end, done = segment
+                if start + done > end:
+                    return
+                try:
+                    self._fetch_range(url, headers, dest, segment, tracker)
+                    return
+                except (_RetryableStatus, *_TRANSIENT_ERRORS) as e:
+                    attempts += 1
+                    retries[0] += 1
+                    if attempts > self.max_retries:
+                        errors.append(e)
+                        return
+                    time.sleep(min(2 ** attempts * 0.25, 4))
+                except Exception as e:
+                    errors.append(e)
+                    return
+
+        with ThreadPoolExecutor(max_workers=len(state), thread_name_prefix="segment") as pool:
+            list(pool.map(fetch, state))
+        if errors:
+            raise DownloadError(f"{len(errors)} segment(s) failed: {errors[0]}")
+        return self._stats(total, started, len(state), retries[0], True)
+
+    def _get(self, url, headers, byte_range):
+        if byte_range:
+            headers = {**headers, "Range": byte_range}
+        return self.session.get(url, headers=headers, stream=True, timeout=self.timeout, allow_redirects=True)
+
+    def _fetch_range(self, url, headers, dest, segment, tracker) -> None:
+        start, end, done = segment
+        with self._get(url, headers, f"bytes={start + done}-{end}") as response:
+            if response.status_code in (429, 500, 502, 503, 504):
+                raise _RetryableStatus(f"HTTP {response.status_code}")
+            if response.status_code != 206:
+                raise DownloadError(f"Server ignored range request (HTTP {response.status_code})")
+            with open(dest, "r+b", buffering=self.chunk_size) as fh:
+                fh.seek(start + done)
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if not chunk:
+                        continue
+                    chunk = chunk[:end + 1 - (start + segment[2])]
+                    fh.write(chunk)
+                    fh.flush()  # progress only counts bytes that are on disk
+                    tracker.advance(segment, len(chunk))
+                    if start + segment[2] > end:
+                        break
+        if start + segment[2] <= end:
+            raise requests.exceptions.ChunkedEncodingError("Range response ended early")
+
+    def _stream_whole(self, response, dest, total, progress) -> int:
+        written = 0
+        with open(dest, "wb", buffering=self.chunk_size) as fh:
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if chunk:
+                    fh.write(chunk)
+                    fh.flush()
+                    written += len(chunk)
+                    if progress:
+                        progress(written, total)
+        if total is not None and written < total:
+            raise DownloadError(f"Connection closed after {written} of {total} bytes")
+        return written
+
+    def _stats(self, transferred, started, segments, retries, ranged) -> dict:
+        seconds = max(time.monotonic() - started, 1e-6)
+        return {
+            "bytes": transferred,
+            "seconds": round(seconds, 3),
+            "throughput_mbps": round(transferred * 8 / seconds / 1e6, 2),
+            "segments": segments,
+            "retries": retries,
+            "ranged": ranged,
+        }
+
+    @staticmethod
+    def discard(dest) -> None:
+        """Delete a partial download."""
+        try:
+            os.remove(str(dest))
+        except OSError:
+            pass
+
+
+class _Progress:
+    """Tracks per-segment byte counts and reports the contiguous written prefix."""
+
+    def __init__(self, state, total, callback):
+        self.state = state
+        self.total = total
+        self.callback = callback
+        self._lock = threading.Lock()
+
+    def advance(self, segment, nbytes: int) -> None:
+        with self._lock:
+            segment[2] += nbytes
+            if not self.callback:
+                return
+            contiguous = 0
+            for start, end, done in self.state:
+                contiguous = start + done
+                if start + done <= end:
+                    break
+            self.callback(min(contiguous, self.total), self.total)
@@ -0,0 +1,38 @@
+"""
+Server-Timing Responses
+Adds per-request stage durations to Flask responses as a header and a JSON field
+"""
+
+import functools
+import json
+
+from flask import make_response
+
+import metrics
+
+
+def attach_timings(response, timings: dict):
+    """Set ``Server-Timing`` on ``response`` and, for JSON object bodies, a ``timings`` field."""
+    if not timings:
+        return response
+    response.headers["Server-Timing"] = metrics.server_timing_header(timings)
+    if response.is_json and not response.is_streamed:
+        data = response.get_json(silent=True)
+        if isinstance(data, dict) and "timings" not in data:
+            data["timings"] = timings
+            response.set_data(json.dumps(data))
+    return response
+
+
+def timed_view(view):
+    """Collect the stages a view runs (``metrics.time_stage``) and report them on its response.
+
+    Durations are in milliseconds and include a ``total`` for the whole view.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with metrics.collect_timings() as timings:
+            response = make_response(view(*args, **kwargs))
+        return attach_timings(response, timings.as_dict())
+
+    return wrapper
@@ -0,0 +1,92 @@
+"""
+Song List Parser
+Splits pasted "1. Song Name" lists into titles in a single linear pass
+"""
+
+import re
+from typing import Iterator
+
+# Every maximal digit run followed by a dot that is not a decimal point.
+# Which of these are item markers is decided from context in iter_songs.
+_MARKER = re.compile(r"(?<!\d)(\d+)\.(?!\d)")
+# A numbered item at the start of any line after the first.
+_LINE_MARKER = re.compile(r"\n[ \t]*\d+\.(?!\d)")
+# Characters a glued marker may follow ("Rangin2. ", "Worry)3. ").
+# Hyphens are excluded so "Blink-182. " stays part of the title.
+_GLUE_CHARS = frozenset(")]}'\"!?.,:;&*#")
+_SPACES = " \t\r\f\v"
+
+
+def _at_line_start(text: str, pos: int) -> bool:
+    while pos > 0 and text[pos - 1] in _SPACES:
+        pos -= 1
+    return pos == 0 or text[pos - 1] == "\n"
+
+
+def _title_follows(text: str, pos: int) -> bool:
+    """Whether a title starts after ``pos`` on the same line."""
+    while pos < len(text) and text[pos] in _SPACES:
+        pos += 1
+    return pos < len(text) and text[pos] != "\n"
+
+
+def _marker_start(text: str, match, expected: int, line_mode: bool) -> int:
+    """Where the item marker in ``match`` begins, or -1 if it belongs to the title.
+
+    Mid-line markers must carry the next number in sequence (or the one after,
+    so a skipped number does not swallow the rest of the list).
+    """
+    start = match.start(1)
+    if _at_line_start(text, start):
+        return start
+    digits = match.group(1)
+    before = text[start - 1]
+    for wanted in (str(expected), str(expected + 1)):
+        if digits == wanted:
+            if before.isspace():
+                # In line-per-item pastes a spaced marker ending its line ("Vol 2.")
+                # is part of the title; one followed by text ("B 3. C") starts an item.
+                if not line_mode or _title_follows(text, match.end()):
+                    return start
+            elif before.isalpha() or before in _GLUE_CHARS:
+                return start
+        elif digits.endswith(wanted) and not line_mode and before != "-":
+            # "Summer of 692. Next": the title's own digits run into the marker.
+            return start + len(digits) - len(wanted)
+    return -1
+
+
+def iter_songs(text: str) -> Iterator[str]:
+    """Yield song titles from a numbered list, one per item, whitespace normalized.
+
+    Handles one item per line ("1. A\\n2. B"), spaced single-line pastes
+    ("1. A 2. B"), glued ones ("1. A2. B3. C") and mixes of these. Titles may contain digits:
+    mid-line markers only count when they carry the next number in sequence.
+    Text before the first marker is ignored. Runs in time linear in the input.
+    """
+    if not text:
+        return
+    line_mode = _LINE_MARKER.search(text) is not None
+    title_start = -1
+    expected = 0
+    for match in _MARKER.finditer(text):
+        if title_start == -1:
+            start = match.start(1)
+        else:
+            start = _marker_start(text, match, expected, line_mode)
+            if start == -1:
+                continue
+            title = " ".join(text[title_start:start].split())
+            if title:
+                yield title
+        expected = int(text[start:match.end(1)]) + 1
+        title_start = match.end()
+    if title_start != -1:
+        title = " ".join(text[title_start:].split())
+        if title:
+            yield title
+
+
+def parse_song_list(text: str) -> list[str]:
+    """All titles from ``iter_songs`` as a list."""
+    return list(iter_songs(text))
@@ -0,0 +1,60 @@
+"""
+Source Fan-Out
+Runs independent lookups concurrently and keeps whatever finishes before each one's deadline
+"""
+
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class SourceTimeout(TimeoutError):
+    """Stands in for the result of a source that missed its deadline."""
+
+    def __init__(self, name: str, deadline: float):
+        super().__init__(f"{name} did not finish within {deadline:g}s")
+        self.name = name
+        self.deadline = deadline
+
+
+class FanOut:
+    """Launches named sources at once on a shared pool.
+
+    ``run()`` returns ``(values, errors)``: each source lands in exactly one of
+    the two dicts. A source that raised maps to its exception; one still
+    running at its deadline maps to ``SourceTimeout`` and is left to finish
+    in the background, its result discarded. The call therefore takes about
+    as long as the slowest source that makes its deadline, not their sum.
+    """
+
+    def __init__(self, max_workers: int = 12):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fanout")
+
+    def run(self, sources: dict) -> tuple[dict, dict]:
+        """``sources`` maps a name to ``(fn, deadline_seconds)``; ``fn`` takes no arguments."""
+        started = time.monotonic()
+        pending = {}
+        for name, (fn, deadline) in sources.items():
+            # Each source gets the caller's context so per-request stage timings still apply
+            future = self._executor.submit(contextvars.copy_context().run, fn)
+            pending[future] = (name, started + deadline, deadline)
+
+        values, errors = {}, {}
+        while pending:
+            next_deadline = min(due for _, due, _ in pending.values())
+            done, _ = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                name, _, _ = pending.pop(future)
+                try:
+                    values[name] = future.result()
+                except Exception as e:
+                    errors[name] = e
+            now = time.monotonic()
+            for future, (name, due, deadline) in list(pending.items()):
+                if due <= now:
+                    future.cancel()
+                    errors[name] = SourceTimeout(name, deadline)
+                    del pending[future]
+        return values, errors
+
@@ -0,0 +1,97 @@
+"""
+Audio Library
+Checks commit with its sidecar and least-recently-used eviction by bytes and by file count
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from audio_library import AudioLibrary  # noqa: E402
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz: 16000 bytes of audio last one second
+CBR_HEADER = bytes([0xFF, 0xFB, 0x90, 0x00])
+
+
+def add(library, video_id, size, age=0):
+    """Commit a ``size``-byte MP3 as if it was last used ``age`` seconds ago."""
+    temp_path = library.temp_path(video_id)
+    temp_path.write_bytes(CBR_HEADER + bytes(size - len(CBR_HEADER)))
+    meta = library.commit(video_id, temp_path, source_url=f"https://example.com/{video_id}.mp3")
+    if age:
+        library._index[video_id]["last_used"] -= age
+    return meta
+
+
+def test_commit_publishes_file_and_sidecar(tmp_path):
+    library = AudioLibrary(tmp_path)
+    meta = add(library, "aaaaaaaaaaa", 16000)
+
+    assert meta["filename"] == "aaaaaaaaaaa.mp3"
+    assert not list(tmp_path.glob("*.part"))
+    sidecar = json.loads((tmp_path / "aaaaaaaaaaa.json").read_text(encoding="utf-8"))
+    assert sidecar["size"] == 16000
+    assert sidecar["duration"] == 1.0
+    assert sidecar["source_url"] == "https://example.com/aaaaaaaaaaa.mp3"
+
+    stored = library.lookup("aaaaaaaaaaa")
+    assert stored["filename"] == "aaaaaaaaaaa.mp3"
+    assert stored["duration"] == 1.0
+    assert library.lookup("bbbbbbbbbbb") is None
+
+
+def test_library_is_rebuilt_from_disk(tmp_path):
+    add(AudioLibrary(tmp_path), "aaaaaaaaaaa", 4000)
+
+    assert AudioLibrary(tmp_path).lookup("aaaaaaaaaaa")["size"] == 4000
+
+
+def test_eviction_by_bytes_drops_least_recently_used(tmp_path):
+    library = AudioLibrary(tmp_path, max_bytes=10_000)
+    add(library, "oldest00000", 4000, age=30)
+    add(library, "middle00000", 4000, age=20)
+    library.lookup("oldest00000")  # now the most recently used
+    add(library, "newest00000", 4000)
+
+    assert library.lookup("middle00000") is None
+    assert not (tmp_path / "middle00000.mp3").exists()
+    assert not (tmp_path / "middle00000.json").exists()
+    assert library.lookup("oldest00000") is not None
+    assert library.lookup("newest00000") is not None
+    assert library.stats()["bytes"] == 8000
+
+
+def test_eviction_by_file_count(tmp_path):
+    library = AudioLibrary(tmp_path, max_files=2)
+    add(library, "first000000", 1000, age=30)
+    add(library, "second00000", 1000, age=20)
+    add(library, "third000000", 1000)
+
+    assert sorted(p.stem for p in tmp_path.glob("*.mp3")) == ["second00000", "third000000"]
+    assert library.stats()["files"] == 2
+
+
+def test_new_file_is_kept_even_if_over_quota(tmp_path):
+    library = AudioLibrary(tmp_path, max_bytes=1000)
+    add(library, "small000000", 500, age=10)
+    add(library, "large000000", 5000)
+
+    assert library.lookup("small000000") is None
+    assert library.lookup("large000000") is not None
+
+
+def test_stale_partial_downloads_are_cleaned_up(tmp_path):
+    stale = tmp_path / "aaaaaaaaaaa.1.1.part"
+    fresh = tmp_path / "bbbbbbbbbbb.1.1.part"
+    stale.write_bytes(b"x")
+    fresh.write_bytes(b"x")
+    hour_ago = time.time() - 3700
+    os.utime(stale, (hour_ago, hour_ago))
+    AudioLibrary(tmp_path)
+
+    assert not stale.exists()
+    assert fresh.exists()
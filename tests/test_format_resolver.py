@@ -0,0 +1,86 @@
+"""
+Stream Format Resolver
+Checks that yt-dlp format specs pick the expected direct stream from an extracted format list
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+pytest.importorskip("yt_dlp")
+
+from format_resolver import resolve_stream  # noqa: E402
+
+# As in app.py's MP3 route
+AUDIO_STRATEGIES = ["bestaudio", "best[height<=480]/best", "worstaudio", "best"]
+
+
+def fmt(format_id, ext, vcodec="none", acodec="none", height=None, abr=None, tbr=None, protocol="https"):
+    return {
+        "format_id": format_id,
+        "url": f"https://media.example.com/{format_id}",
+        "ext": ext,
+        "vcodec": vcodec,
+        "acodec": acodec,
+        "height": height,
+        "abr": abr,
+        "tbr": tbr or abr,
+        "protocol": protocol,
+        "http_headers": {"User-Agent": "test"},
+    }
+
+
+def info(*formats):
+    # Extracted info lists formats worst to best, which is what yt-dlp's selectors rely on
+    return {"id": "dQw4w9WgXcQ", "formats": list(formats)}
+
+
+def test_bestaudio_picks_best_audio_only_format():
+    stream = resolve_stream(info(
+        fmt("139", "m4a", acodec="mp4a.40.5", abr=48),
+        fmt("140", "m4a", acodec="mp4a.40.2", abr=128),
+        fmt("18", "mp4", vcodec="avc1", acodec="mp4a.40.2", height=360, tbr=500),
+        fmt("251", "webm", acodec="opus", abr=160),
+        fmt("137", "mp4", vcodec="avc1", height=1080, tbr=4000),
+    ), AUDIO_STRATEGIES)
+
+    assert stream["format_id"] == "251"
+    assert stream["format_spec"] == "bestaudio"
+    assert stream["url"] == "https://media.example.com/251"
+    assert stream["http_headers"] == {"User-Agent": "test"}
+    assert stream["ext"] == "webm"
+
+
+def test_manifest_formats_are_skipped():
+    stream = resolve_stream(info(
+        fmt("234", "mp4", acodec="mp4a.40.2", abr=192, protocol="m3u8_native"),
+        fmt("140", "m4a", acodec="mp4a.40.2", abr=128),
+    ), AUDIO_STRATEGIES)
+
+    assert stream["format_id"] == "140"
+
+
+def test_later_spec_is_used_when_earlier_ones_match_nothing():
+    stream = resolve_stream(info(
+        fmt("18", "mp4", vcodec="avc1", acodec="mp4a.40.2", height=360, tbr=500),
+        fmt("22", "mp4", vcodec="avc1", acodec="mp4a.40.2", height=720, tbr=1500),
+        fmt("137", "mp4", vcodec="avc1", height=1080, tbr=4000),
+    ), AUDIO_STRATEGIES)
+
+    assert stream["format_spec"] == "best[height<=480]/best"
+    assert stream["format_id"] == "18"
+
+
+def test_invalid_spec_is_skipped():
+    stream = resolve_stream(info(fmt("140", "m4a", acodec="mp4a.40.2", abr=128)), ["best[[[", "bestaudio"])
+
+    assert stream["format_spec"] == "bestaudio"
+
+
+def test_no_direct_formats():
+    assert resolve_stream({}, AUDIO_STRATEGIES) is None
+    assert resolve_stream(info(fmt("96", "mp4", acodec="aac", protocol="m3u8_native")), AUDIO_STRATEGIES) is None
+    assert resolve_stream(info(fmt("137", "mp4", vcodec="avc1", height=1080)), ["bestaudio"]) is None
@@ -0,0 +1,59 @@
+"""
+Extracted Info Store
+Checks the freshness window, file naming and pruning of stored yt-dlp info
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from info_store import InfoStore  # noqa: E402
+
+VIDEO_ID = "dQw4w9WgXcQ"
+INFO = {"id": VIDEO_ID, "title": "Song", "formats": [{"format_id": "140", "url": "https://example.com/a"}]}
+
+
+def age(path, seconds):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_saved_info_is_loaded_while_fresh(tmp_path):
+    store = InfoStore(tmp_path, ttl=60)
+
+    assert store.save(VIDEO_ID, INFO) == VIDEO_ID
+    assert store.path_for(VIDEO_ID) == tmp_path / f"{VIDEO_ID}.info.json"
+    assert store.load(VIDEO_ID) == INFO
+
+
+def test_info_expires_after_ttl(tmp_path):
+    store = InfoStore(tmp_path, ttl=60)
+    store.save(VIDEO_ID, INFO)
+    age(store.path_for(VIDEO_ID), 61)
+
+    assert store.path_for(VIDEO_ID) is None
+    assert store.load(VIDEO_ID) is None
+
+
+def test_unusable_input_is_not_stored(tmp_path):
+    store = InfoStore(tmp_path)
+
+    assert store.save(VIDEO_ID, {"id": VIDEO_ID, "formats": []}) is None
+    assert store.save("../../etc/passwd", INFO) is None
+    assert store.path_for("../x") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_prunes_expired_and_oldest_files(tmp_path):
+    store = InfoStore(tmp_path, ttl=60, max_files=2)
+    ids = ["aaaaaaaaaaa", "bbbbbbbbbbb", "ccccccccccc"]
+    for i, video_id in enumerate(ids):
+        store.save(video_id, INFO)
+        age(store.root / f"{video_id}.info.json", 100 if i == 0 else 30 - i)
+    store.save(VIDEO_ID, INFO)
+
+    # aaa expired; bbb is the oldest of the rest beyond max_files
+    assert {p.name for p in tmp_path.iterdir()} == {f"{VIDEO_ID}.info.json", "ccccccccccc.info.json"}
@@ -0,0 +1,96 @@
+"""
+Conversion Job Queue
+Checks job completion, single-flight keys, the backlog limit and retention pruning
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from job_queue import JobQueue  # noqa: E402
+
+
+def wait_finished(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.is_finished:
+        assert time.monotonic() < deadline, f"job {job.id} still {job.stage}"
+        time.sleep(0.01)
+
+
+def test_handler_result_finishes_job():
+    jobs = JobQueue(lambda job: {"success": True, "file": job.payload["name"]})
+    jobs.start()
+    job = jobs.submit({"name": "a.mp3"})
+    wait_finished(job)
+
+    assert job.stage == "done"
+    assert job.to_dict()["file"] == "a.mp3"
+    assert jobs.get(job.id) is job
+
+
+def test_crashing_handler_fails_job():
+    def handler(job):
+        raise RuntimeError("browser died")
+
+    jobs = JobQueue(handler)
+    jobs.start()
+    job = jobs.submit({})
+    wait_finished(job)
+
+    assert job.stage == "failed"
+    assert job.to_dict()["success"] is False
+
+
+def test_same_key_attaches_to_unfinished_job():
+    release = threading.Event()
+    calls = []
+
+    def handler(job):
+        calls.append(job.payload)
+        release.wait(5)
+        return {"success": True}
+
+    jobs = JobQueue(handler)
+    jobs.start()
+    first = jobs.submit({"n": 1}, key="video-a")
+    second = jobs.submit({"n": 2}, key="video-a")
+    other = jobs.submit({"n": 3}, key="video-b")
+
+    assert second is first
+    assert first.requests == 2
+    assert other is not first
+    release.set()
+    wait_finished(first)
+    wait_finished(other)
+    # Once finished, the key starts a fresh job
+    again = jobs.submit({"n": 4}, key="video-a")
+    wait_finished(again)
+
+    assert again is not first
+    assert calls == [{"n": 1}, {"n": 3}, {"n": 4}]
+
+
+def test_submit_returns_none_when_backlog_is_full():
+    # Workers never started, so everything stays queued
+    jobs = JobQueue(lambda job: {"success": True}, max_pending=2)
+
+    assert jobs.submit({}) is not None
+    assert jobs.submit({}) is not None
+    assert jobs.submit({}) is None
+    assert jobs.depth() == 2
+
+
+def test_finished_jobs_are_pruned_after_retention():
+    jobs = JobQueue(lambda job: {"success": True}, retention_seconds=60)
+    old, recent, pending = jobs.submit({}), jobs.submit({}), jobs.submit({})
+    old.finish({"success": True})
+    old.finished_at -= 120
+    recent.finish({"success": True})
+    jobs.submit({})  # submit prunes first
+
+    assert jobs.get(old.id) is None
+    assert jobs.get(recent.id) is recent
+    assert jobs.get(pending.id) is pending
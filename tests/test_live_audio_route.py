@@ -0,0 +1,124 @@
+"""
+Live Audio Route
+Checks /audio/<video_id>/live Range handling and the redirect once a conversion is stored
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from audio_library import AudioLibrary  # noqa: E402
+from live_stream import LiveRegistry  # noqa: E402
+
+VIDEO_ID = "dQw4w9WgXcQ"
+PAYLOAD = os.urandom(256 * 1024)
+
+
+@pytest.fixture(scope="module")
+def app_web(tmp_path_factory):
+    # app_web creates its data folders in the working directory and may warm a browser on import
+    os.environ.setdefault("DRIVER_POOL_PREWARM", "0")
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("app_web"))
+    try:
+        import app_web
+    finally:
+        os.chdir(cwd)
+    return app_web
+
+
+@pytest.fixture
+def client(app_web, tmp_path, monkeypatch):
+    library = AudioLibrary(tmp_path)
+    monkeypatch.setattr(app_web, "_audio_library", library)
+    monkeypatch.setattr(app_web, "_live_files", LiveRegistry())
+    return app_web.app.test_client(), app_web._live_files, library
+
+
+def write_growing(live, path, step=16 * 1024, delay=0.005):
+    """Write PAYLOAD to ``path`` in steps, advancing the watermark like a download."""
+    with open(path, "wb") as fh:
+        for offset in range(0, len(PAYLOAD), step):
+            fh.write(PAYLOAD[offset:offset + step])
+            fh.flush()
+            live.update(min(offset + step, len(PAYLOAD)))
+            time.sleep(delay)
+    live.finish()
+
+
+def test_full_stream_while_writing(client, tmp_path):
+    test_client, live_files, _ = client
+    path = tmp_path / "growing.part"
+    path.touch()
+    live = live_files.open(VIDEO_ID, path, expected_size=len(PAYLOAD))
+    writer = threading.Thread(target=write_growing, args=(live, path))
+    writer.start()
+    response = test_client.get(f"/audio/{VIDEO_ID}/live")
+    writer.join()
+
+    assert response.status_code == 200
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert response.headers["Content-Length"] == str(len(PAYLOAD))
+    assert response.data == PAYLOAD
+
+
+def test_range_while_writing(client, tmp_path):
+    test_client, live_files, _ = client
+    path = tmp_path / "growing.part"
+    path.touch()
+    live = live_files.open(VIDEO_ID, path, expected_size=len(PAYLOAD))
+    writer = threading.Thread(target=write_growing, args=(live, path))
+    writer.start()
+    response = test_client.get(f"/audio/{VIDEO_ID}/live", headers={"Range": "bytes=1000-99999"})
+    writer.join()
+
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == f"bytes 1000-99999/{len(PAYLOAD)}"
+    assert response.headers["Content-Length"] == str(99000)
+    assert response.data == PAYLOAD[1000:100000]
+
+
+def test_open_ended_range(client, tmp_path):
+    test_client, live_files, _ = client
+    path = tmp_path / "done.part"
+    live = live_files.open(VIDEO_ID, path, expected_size=len(PAYLOAD))
+    write_growing(live, path, delay=0)
+    response = test_client.get(f"/audio/{VIDEO_ID}/live", headers={"Range": "bytes=200000-"})
+
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == f"bytes 200000-{len(PAYLOAD) - 1}/{len(PAYLOAD)}"
+    assert response.data == PAYLOAD[200000:]
+
+
+def test_unsatisfiable_range(client, tmp_path):
+    test_client, live_files, _ = client
+    live_files.open(VIDEO_ID, tmp_path / "growing.part", expected_size=len(PAYLOAD))
+    response = test_client.get(f"/audio/{VIDEO_ID}/live", headers={"Range": f"bytes={len(PAYLOAD)}-"})
+
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == f"bytes */{len(PAYLOAD)}"
+
+
+def test_redirects_to_stored_file_when_finished(client):
+    test_client, _, library = client
+    temp_path = library.temp_path(VIDEO_ID)
+    temp_path.write_bytes(PAYLOAD)
+    library.commit(VIDEO_ID, temp_path)
+    response = test_client.get(f"/audio/{VIDEO_ID}/live")
+
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith(f"/audio/{VIDEO_ID}.mp3")
+
+
+def test_unknown_video_is_404(client):
+    test_client, _, _ = client
+    response = test_client.get(f"/audio/{VIDEO_ID}/live")
+
+    assert response.status_code == 404
@@ -0,0 +1,68 @@
+"""
+Live Stream Integrity
+Streams a file with iter_live while SegmentedDownloader is still writing it and compares the bytes
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from audio_library import AudioLibrary  # noqa: E402
+from benchmarks.stubs import start_media_server  # noqa: E402
+from live_stream import LiveFile, iter_live  # noqa: E402
+from segmented_downloader import SegmentedDownloader  # noqa: E402
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+@pytest.fixture(scope="module")
+def media():
+    payload = os.urandom(3 * 1024 * 1024)
+    # Throttled so the reader follows the writer instead of finding a finished file
+    server, url = start_media_server(payload, per_conn_bytes_per_sec=2 * 1024 * 1024)
+    yield payload, url
+    server.shutdown()
+
+
+@pytest.mark.parametrize("run", range(5))
+def test_streamed_bytes_match_source(tmp_path, media, run):
+    payload, url = media
+    library = AudioLibrary(tmp_path)
+    temp_path = library.temp_path(VIDEO_ID)
+    live = LiveFile(temp_path)
+    first_bytes = threading.Event()
+    streamed = []
+
+    def on_progress(contiguous, total):
+        live.update(contiguous)
+        if contiguous:
+            first_bytes.set()
+
+    def read():
+        first_bytes.wait(timeout=10)
+        streamed.extend(iter_live(live, idle_timeout=10))
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    try:
+        # Odd-sized chunks move the watermark in steps smaller than a read buffer
+        SegmentedDownloader(segments=4, min_segment_bytes=256 * 1024, chunk_size=3000).download(
+            url, temp_path, progress=on_progress
+        )
+        library.commit(VIDEO_ID, temp_path)
+        live.finish(library.path_for(VIDEO_ID))
+    except Exception as e:
+        live.fail(str(e))
+        raise
+    finally:
+        reader.join(timeout=30)
+
+    data = b"".join(streamed)
+    assert len(data) == len(payload)
+    assert data == payload
+    assert library.path_for(VIDEO_ID).read_bytes() == payload
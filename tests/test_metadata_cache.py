@@ -0,0 +1,111 @@
+"""
+Video Metadata Cache
+Checks that each field class expires on its own and what is written to SQLite
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import metadata_cache  # noqa: E402
+from metadata_cache import MetadataCache  # noqa: E402
+
+VIDEO_ID = "dQw4w9WgXcQ"
+INFO = {
+    "id": VIDEO_ID,
+    "title": "Song",
+    "duration": "3:33",
+    "views": "1.2B",
+    "likes": "17M",
+    "max_quality": "1080p (Full HD)",
+    "available_qualities": ["1080p", "720p"],
+    "formats": [{"format_id": "137", "url": "https://example.com/signed?expire=1"}],
+}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(metadata_cache, "time", SimpleNamespace(time=clock))
+    return clock
+
+
+def make_cache(path=None):
+    return MetadataCache(path=path, ttls={"stats": 10, "formats": 100, "static": 1000})
+
+
+def test_fresh_entry_is_a_full_hit(clock):
+    cache = make_cache()
+    cache.store(VIDEO_ID, INFO)
+    fields, stale = cache.lookup(VIDEO_ID)
+
+    assert stale == set()
+    assert fields == INFO
+    assert cache.stats()["hits"] == 1
+
+
+def test_classes_expire_independently(clock):
+    cache = make_cache()
+    cache.store(VIDEO_ID, INFO)
+
+    clock.now += 11
+    fields, stale = cache.lookup(VIDEO_ID)
+    assert stale == {"stats"}
+    assert "views" not in fields and fields["title"] == "Song" and fields["formats"]
+
+    clock.now += 90
+    fields, stale = cache.lookup(VIDEO_ID)
+    assert stale == {"stats", "formats"}
+    assert set(fields) == {"id", "title", "duration"}
+
+    clock.now += 900
+    assert cache.lookup(VIDEO_ID) == ({}, {"static", "stats", "formats"})
+    assert cache.stats()["partial_hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_refreshing_one_class_keeps_the_others(clock):
+    cache = make_cache()
+    cache.store(VIDEO_ID, INFO)
+    clock.now += 11
+    cache.store(VIDEO_ID, {"views": "1.3B", "likes": "18M", "title": "ignored"}, classes=("stats",))
+    fields, stale = cache.lookup(VIDEO_ID)
+
+    assert stale == set()
+    assert fields["views"] == "1.3B"
+    assert fields["title"] == "Song"
+
+
+def test_sqlite_keeps_classes_but_not_the_format_list(tmp_path, clock):
+    path = tmp_path / "metadata.sqlite3"
+    make_cache(path).store(VIDEO_ID, INFO)
+    fields, stale = make_cache(path).lookup(VIDEO_ID)
+
+    assert stale == set()
+    assert fields["title"] == "Song"
+    assert fields["available_qualities"] == ["1080p", "720p"]
+    assert "formats" not in fields
+    # WAL mode: recent writes may still be in metadata.sqlite3-wal
+    assert not any(b"signed" in f.read_bytes() for f in tmp_path.iterdir())
+
+
+def test_expired_rows_are_not_read_back(tmp_path, clock):
+    path = tmp_path / "metadata.sqlite3"
+    make_cache(path).store(VIDEO_ID, INFO)
+    clock.now += 101
+    fields, stale = make_cache(path).lookup(VIDEO_ID)
+
+    assert stale == {"stats", "formats"}
+    assert fields["title"] == "Song"
@@ -0,0 +1,67 @@
+"""
+Browser Network Capture
+Checks MP3 detection from DevTools events and that the download behavior is restored
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from network_capture import NetworkCapture  # noqa: E402
+
+
+class FakeDriver:
+    """Serves queued performance log batches and records CDP commands."""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.cdp = []
+
+    def get_log(self, kind):
+        return self.batches.pop(0) if self.batches else []
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp.append((command, params))
+
+
+def event(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+def test_request_and_response_are_matched():
+    driver = FakeDriver(
+        [event("Network.requestWillBeSent", requestId="1", request={"url": "https://ads.example.com/x.js"})],
+        [event("Network.requestWillBeSent", requestId="2",
+               request={"url": "https://cdn.example.com/song.mp3?sig=1", "headers": {"Referer": "https://ezconv"}}),
+         event("Network.responseReceived", requestId="2",
+               response={"url": "https://cdn.example.com/song.mp3?sig=1", "status": 200, "mimeType": "audio/mpeg",
+                         "headers": {"Content-Length": "10"}})],
+    )
+    capture = NetworkCapture(driver)
+    capture.start()  # drops the first, stale batch
+    found = capture.wait_for(timeout=1, poll=0)
+
+    assert found["url"] == "https://cdn.example.com/song.mp3?sig=1"
+    assert found["status"] == 200
+    assert found["request_headers"] == {"Referer": "https://ezconv"}
+
+
+def test_download_behavior_is_restored_on_stop():
+    driver = FakeDriver()
+    capture = NetworkCapture(driver)
+    capture.start()
+    assert capture.wait_for(timeout=0) is None
+    capture.stop()
+
+    assert [params["behavior"] for _, params in driver.cdp] == ["deny", "default"]
+
+
+def test_download_behavior_untouched_when_not_denied():
+    driver = FakeDriver()
+    capture = NetworkCapture(driver, deny_downloads=False)
+    capture.start()
+    capture.stop()
+
+    assert driver.cdp == []
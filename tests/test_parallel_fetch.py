@@ -0,0 +1,72 @@
+"""
+Parallel Stream Fetch
+Checks shared progress, fail-fast termination and the CalledProcessError raised on failure
+"""
+
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from parallel_fetch import PROGRESS_PREFIX, ParallelFetch  # noqa: E402
+
+
+def python(code: str) -> list:
+    # PROGRESS_ARGS are appended to every command; the child just ignores them in sys.argv
+    return [sys.executable, "-c", code]
+
+
+def downloads(total: int) -> list:
+    return python(
+        "import time\n"
+        f"for done in range(0, {total} + 1, {total // 4}):\n"
+        f"    print('{PROGRESS_PREFIX}' + f'{{done}} {total} NA', flush=True)\n"
+        "    time.sleep(0.05)\n"
+        "print('[download] finished', flush=True)\n"
+    )
+
+
+def test_streams_finish_with_combined_progress():
+    fetch = ParallelFetch({"video": downloads(4000), "audio": downloads(1000)})
+    results = fetch.run()
+    progress = fetch.progress()
+
+    assert set(results) == {"video", "audio"}
+    assert all(result.returncode == 0 for result in results.values())
+    # Progress lines are parsed, everything else is kept as output
+    assert results["video"].stdout == "[download] finished"
+    assert progress["downloaded"] == progress["total"] == 5000
+    assert progress["percent"] == 100.0
+    assert progress["streams"]["audio"]["done"]
+
+
+def test_failure_terminates_the_other_streams():
+    fetch = ParallelFetch({
+        "video": python("import time; time.sleep(60)"),
+        "audio": python("import sys, time; time.sleep(0.2); print('ERROR: 403 Forbidden', file=sys.stderr); sys.exit(3)"),
+    })
+    started = time.monotonic()
+    with pytest.raises(subprocess.CalledProcessError) as raised:
+        fetch.run()
+
+    assert time.monotonic() - started < 10
+    assert raised.value.returncode == 3
+    assert "403 Forbidden" in raised.value.stderr
+    assert raised.value.cmd[:2] == [sys.executable, "-c"]
+    assert not fetch.progress()["streams"]["video"]["done"]
+
+
+def test_cancel_stops_every_stream():
+    fetch = ParallelFetch({"video": python("import time; time.sleep(60)"),
+                           "audio": python("import time; time.sleep(60)")})
+    threading.Timer(0.3, fetch.cancel).start()
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="cancelled"):
+        fetch.run()
+
+    assert time.monotonic() - started < 10
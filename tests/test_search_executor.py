@@ -0,0 +1,81 @@
+"""
+Batch Search Executor
+Checks the token bucket's backoff on 429 and that batches keep input order
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search_executor import BatchSearcher, RateLimited, TokenBucket  # noqa: E402
+
+
+def test_backoff_halves_rate_down_to_minimum():
+    bucket = TokenBucket(rate=8, burst=1, min_rate=1)
+    bucket.backoff(retry_after=0.01)
+    assert bucket.rate == 4
+    bucket.backoff(retry_after=0.01)
+    bucket.backoff(retry_after=0.01)
+    bucket.backoff(retry_after=0.01)
+    assert bucket.rate == 1
+
+
+def test_recover_creeps_back_to_base_rate():
+    bucket = TokenBucket(rate=10, min_rate=1)
+    bucket.backoff(retry_after=0.01)
+    bucket.recover()
+    assert bucket.rate == 6
+    for _ in range(10):
+        bucket.recover()
+    assert bucket.rate == 10
+
+
+def test_backoff_pauses_acquire():
+    bucket = TokenBucket(rate=1000, burst=5)
+    bucket.backoff(retry_after=0.2)
+    started = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - started >= 0.15
+
+
+def test_rate_limited_search_is_retried():
+    attempts = {}
+
+    def search(item):
+        attempts[item] = attempts.get(item, 0) + 1
+        if attempts[item] == 1:
+            raise RateLimited(retry_after=0.01)
+        return item.upper()
+
+    limiter = TokenBucket(rate=1000, burst=10)
+    results = BatchSearcher(search, limiter, max_workers=1).run(["a", "b"])
+
+    assert results == ["A", "B"]
+    assert attempts == {"a": 2, "b": 2}
+    assert limiter.rate < 1000
+
+
+def test_results_keep_input_order():
+    def search(item):
+        # Finish out of order
+        time.sleep(random.uniform(0, 0.02))
+        return item * 2
+
+    items = list(range(20))
+    searcher = BatchSearcher(search, TokenBucket(rate=1000, burst=20), max_workers=4)
+
+    assert searcher.run(items) == [i * 2 for i in items]
+
+
+def test_failed_search_yields_none():
+    def search(item):
+        if item == "bad":
+            raise ValueError("broken page")
+        return item
+
+    searcher = BatchSearcher(search, TokenBucket(rate=1000, burst=10))
+
+    assert searcher.run(["ok", "bad", "fine"]) == ["ok", None, "fine"]
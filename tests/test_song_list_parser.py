@@ -0,0 +1,53 @@
+"""
+Song List Parser
+Checks numbered lines, inline and glued markers, blank lines and titles containing digits
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from song_list_parser import parse_song_list  # noqa: E402
+
+
+@pytest.mark.parametrize("text, songs", [
+    ("1. Rangin\n2. Don't Worry\n3. Aasha", ["Rangin", "Don't Worry", "Aasha"]),
+    ("  1.  Rangin  \n\t2.Don't   Worry\n", ["Rangin", "Don't Worry"]),
+    ("1. A\n\n\n2. B\n   \n3. C\n", ["A", "B", "C"]),
+    ("My playlist:\n1. A\n2. B", ["A", "B"]),
+    ("1. A 2. B 3. C", ["A", "B", "C"]),
+    ("1. Rangin2. Don't Worry3. Aasha4. Uff", ["Rangin", "Don't Worry", "Aasha", "Uff"]),
+    ("1. Worry)2. Next", ["Worry)", "Next"]),
+    ("1. A 3. C 4. D", ["A", "C", "D"]),
+    ("1. A\n\n2. B 3. C", ["A", "B", "C"]),
+    ("1. A\n2. B 3. C4. D\n5. E", ["A", "B", "C", "D", "E"]),
+])
+def test_item_markers(text, songs):
+    assert parse_song_list(text) == songs
+
+
+@pytest.mark.parametrize("text, songs", [
+    ("1. 7 Rings 2. 22 3. Summer of 69", ["7 Rings", "22", "Summer of 69"]),
+    ("1. Summer of 692. Next", ["Summer of 69", "Next"]),
+    ("1. Blink-182. All the Small Things", ["Blink-182. All the Small Things"]),
+    ("1. Now Hits Vol 2.\n2. Other", ["Now Hits Vol 2.", "Other"]),
+    ("1. Version 1.5\n2. B", ["Version 1.5", "B"]),
+])
+def test_titles_keep_their_digits(text, songs):
+    assert parse_song_list(text) == songs
+
+
+@pytest.mark.parametrize("text", ["", "   \n\n", "no numbers here", "1.\n2.  \n"])
+def test_nothing_to_parse(text):
+    assert parse_song_list(text) == []
+
+
+def test_long_lists_keep_every_item():
+    text = "\n".join(f"{i}. Song number {i}" for i in range(1, 2001))
+    songs = parse_song_list(text)
+
+    assert len(songs) == 2000
+    assert songs[1233] == "Song number 1234"
@@ -0,0 +1,68 @@
+"""
+Source Fan-Out
+Checks that sources run concurrently, each against its own deadline
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from source_fanout import FanOut, SourceTimeout  # noqa: E402
+
+
+def test_sources_run_concurrently():
+    fanout = FanOut(max_workers=3)
+    started = time.monotonic()
+    values, errors = fanout.run({
+        name: (lambda name=name: (time.sleep(0.2), name)[1], 2) for name in ("a", "b", "c")
+    })
+
+    assert values == {"a": "a", "b": "b", "c": "c"}
+    assert errors == {}
+    assert time.monotonic() - started < 0.5
+
+
+def test_late_source_maps_to_source_timeout():
+    release = threading.Event()
+    fanout = FanOut()
+    started = time.monotonic()
+    values, errors = fanout.run({
+        "fast": (lambda: "ok", 1),
+        "slow": (lambda: release.wait(5) and "late", 0.2),
+    })
+    elapsed = time.monotonic() - started
+    release.set()
+
+    assert values == {"fast": "ok"}
+    assert isinstance(errors["slow"], SourceTimeout)
+    assert isinstance(errors["slow"], TimeoutError)
+    assert errors["slow"].name == "slow"
+    assert errors["slow"].deadline == 0.2
+    assert 0.15 <= elapsed < 1
+
+
+def test_each_source_keeps_its_own_deadline():
+    release = threading.Event()
+    fanout = FanOut()
+    values, errors = fanout.run({
+        "short": (lambda: release.wait(5), 0.1),
+        "long": (lambda: (time.sleep(0.3), "done")[1], 2),
+    })
+    release.set()
+
+    # The short deadline passing does not cut off the source with the longer one
+    assert values == {"long": "done"}
+    assert set(errors) == {"short"}
+
+
+def test_raising_source_maps_to_its_exception():
+    def broken():
+        raise ValueError("quota exceeded")
+
+    values, errors = FanOut().run({"api": (broken, 1), "web": (lambda: 3, 1)})
+
+    assert values == {"web": 3}
+    assert isinstance(errors["api"], ValueError)
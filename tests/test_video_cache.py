@@ -0,0 +1,99 @@
+"""
+Song-to-Video Resolution Cache
+Checks hit and miss lifetimes, LRU trimming and that cached searches skip the rate limiter
+"""
+
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import video_cache  # noqa: E402
+from search_executor import BatchSearcher, TokenBucket  # noqa: E402
+from video_cache import VideoCache  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(video_cache, "time", SimpleNamespace(time=clock))
+    return clock
+
+
+def test_hit_expires_after_ttl(tmp_path, clock):
+    cache = VideoCache(tmp_path / "videos.sqlite3", ttl=100, negative_ttl=10)
+    cache.store("Artist - Song", "abcdefghijk")
+
+    assert cache.lookup("  artist   -  SONG ") == (True, "abcdefghijk")
+    clock.now += 99
+    assert cache.lookup("Artist - Song") == (True, "abcdefghijk")
+    clock.now += 2
+    assert cache.lookup("Artist - Song") == (False, None)
+
+
+def test_miss_uses_negative_ttl(tmp_path, clock):
+    cache = VideoCache(tmp_path / "videos.sqlite3", ttl=100, negative_ttl=10)
+    cache.store("Unknown Song", None)
+
+    assert cache.lookup("Unknown Song") == (True, None)
+    assert cache.stats()["negative_hits"] == 1
+    clock.now += 11
+    assert cache.lookup("Unknown Song") == (False, None)
+
+
+def test_entries_survive_restart(tmp_path, clock):
+    VideoCache(tmp_path / "videos.sqlite3").store("Artist - Song", "abcdefghijk")
+
+    assert VideoCache(tmp_path / "videos.sqlite3").lookup("Artist - Song") == (True, "abcdefghijk")
+
+
+def test_least_recently_used_beyond_max_entries_is_dropped(tmp_path, clock):
+    path = tmp_path / "videos.sqlite3"
+    cache = VideoCache(path, max_entries=2)
+    cache.store("first", "aaaaaaaaaaa")
+    clock.now += 1
+    cache.store("second", "bbbbbbbbbbb")
+    clock.now += video_cache.TOUCH_INTERVAL + 1
+    assert cache.lookup("first") == (True, "aaaaaaaaaaa")
+    clock.now += 1
+    cache.store("third", "ccccccccccc")
+
+    for reader in (cache, VideoCache(path, max_entries=2)):
+        assert reader.lookup("second") == (False, None)
+        assert reader.lookup("first") == (True, "aaaaaaaaaaa")
+        assert reader.lookup("third") == (True, "ccccccccccc")
+    assert cache.stats()["entries"] == 2
+
+
+def test_cached_searches_take_no_tokens():
+    searched = []
+
+    def search(item):
+        searched.append(item)
+        return f"fetched {item}"
+
+    def lookup(item):
+        return item.startswith("cached"), f"stored {item}"
+
+    # One token and a crawl of a refill rate: any token taken beyond the first would stall the batch
+    limiter = TokenBucket(rate=0.01, burst=1, min_rate=0.01)
+    items = [f"cached {i}" for i in range(30)] + ["new"]
+    started = time.monotonic()
+    results = BatchSearcher(search, limiter, lookup_fn=lookup).run(items)
+
+    assert time.monotonic() - started < 1
+    assert searched == ["new"]
+    assert results[:2] == ["stored cached 0", "stored cached 1"]
+    assert results[-1] == "fetched new"
@@ -0,0 +1,54 @@
+"""
+Search Page Parser
+Checks ytInitialData parsing and the regex fallback for pages it cannot read
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fixtures import build_search_page  # noqa: E402
+from yt_search_parser import first_long_form, parse_search_results  # noqa: E402
+
+
+def page(initial_data: dict) -> str:
+    # Compact separators, as YouTube serves it
+    data = json.dumps(initial_data, separators=(",", ":"))
+    return f"<html><script>var ytInitialData = {data};</script></html>"
+
+
+def test_known_renderers_skip_leading_shorts():
+    candidates = parse_search_results(build_search_page(videos=5, shorts=3, leading_shorts=2, padding_kb=1))
+
+    assert len(candidates) == 8
+    assert [c["is_short"] for c in candidates[:2]] == [True, True]
+    best = first_long_form(candidates)
+    assert best is not None and not best["is_short"] and best["title"]
+
+
+def test_unknown_renderers_fall_back_to_regex():
+    # A layout change: ytInitialData decodes but holds only renderers the walker does not know
+    data = {"contents": {"twoColumnSearchResultsRenderer": {"primaryContents": {"items": [
+        {"shortsLockupViewModelV2": {"videoId": "aaaaaaaaaaa", "url": "/shorts/aaaaaaaaaaa"}},
+        {"videoLockupViewModel": {"videoId": "bbbbbbbbbbb"}},
+        {"videoLockupViewModel": {"videoId": "ccccccccccc"}},
+    ]}}}}
+    candidates = parse_search_results(page(data))
+
+    assert [c["video_id"] for c in candidates] == ["aaaaaaaaaaa", "bbbbbbbbbbb", "ccccccccccc"]
+    assert first_long_form(candidates)["video_id"] == "bbbbbbbbbbb"
+
+
+def test_empty_results_page_has_no_candidates():
+    data = {"contents": {"twoColumnSearchResultsRenderer": {"primaryContents": {"items": []}}}}
+
+    assert parse_search_results(page(data)) == []
+
+
+def test_page_without_initial_data_uses_regex():
+    html = '<html>{"videoId":"ddddddddddd"} <a href="/shorts/eeeeeeeeeee">{"videoId":"eeeeeeeeeee"}</a></html>'
+    candidates = parse_search_results(html)
+
+    assert [(c["video_id"], c["is_short"]) for c in candidates] == [("ddddddddddd", False), ("eeeeeeeeeee", True)]
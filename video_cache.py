@@ -0,0 +1,150 @@
+"""
+Song-to-Video Resolution Cache
+Persists YouTube search results in SQLite so repeat lookups skip the network entirely
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / "cache" / "video_cache.sqlite3"
+
+# Refresh a row's last_used in SQLite at most this often; memory hits stay write-free
+TOUCH_INTERVAL = 60
+
+
+def normalize_query(query: str) -> str:
+    """Canonical cache key: case-folded with whitespace collapsed."""
+    return re.sub(r"\s+", " ", (query or "").casefold()).strip()
+
+
+class VideoCache:
+    """Maps normalized search queries to YouTube video IDs.
+
+    Hits are served from an in-memory LRU in front of the SQLite table.
+    Misses (no long-form result) are cached too, with a shorter TTL. The
+    table is trimmed to ``max_entries`` rows by least-recent use.
+    """
+
+    def __init__(self, path=None, ttl=7 * 24 * 3600, negative_ttl=3600, max_entries=10000):
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> (video_id, expires_at, touched_at)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS videos ("
+            " query TEXT PRIMARY KEY,"
+            " video_id TEXT,"
+            " expires_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_videos_last_used ON videos(last_used)")
+
+    def lookup(self, query: str) -> tuple[bool, str | None]:
+        """Return ``(hit, video_id)``; a hit with ``video_id=None`` is a cached miss."""
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT video_id, expires_at FROM videos WHERE query = ?", (key,)
+                ).fetchone()
+                if row:
+                    entry = (row[0], row[1], 0.0)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    self._memory.pop(key, None)
+                    self._conn.execute("DELETE FROM videos WHERE query = ?", (key,))
+                self.misses += 1
+                return False, None
+            video_id, expires_at, touched_at = entry
+            if now - touched_at > TOUCH_INTERVAL:
+                self._conn.execute("UPDATE videos SET last_used = ? WHERE query = ?", (now, key))
+                touched_at = now
+            self._remember(key, (video_id, expires_at, touched_at))
+            if video_id:
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+            return True, video_id
+
+    def store(self, query: str, video_id: str | None) -> None:
+        """Cache a resolved video ID, or ``None`` for a definitive miss."""
+        key = normalize_query(query)
+        if not key:
+            return
+        now = time.time()
+        expires_at = now + (self.ttl if video_id else self.negative_ttl)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO videos (query, video_id, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, video_id, expires_at, now),
+            )
+            self._remember(key, (video_id, expires_at, now))
+            self._evict()
+
+    def _remember(self, key, entry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        """Drop expired rows, then the least recently used beyond ``max_entries``."""
+        self._conn.execute("DELETE FROM videos WHERE expires_at <= ?", (time.time(),))
+        count = self._conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM videos WHERE query IN (SELECT query FROM videos ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM videos")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.negative_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_video_cache() -> VideoCache:
+    """Process-wide cache configured from VIDEO_CACHE_* environment variables."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = VideoCache(
+                path=os.environ.get("VIDEO_CACHE_PATH") or None,
+                ttl=int(os.environ.get("VIDEO_CACHE_TTL", str(7 * 24 * 3600))),
+                negative_ttl=int(os.environ.get("VIDEO_CACHE_NEGATIVE_TTL", "3600")),
+                max_entries=int(os.environ.get("VIDEO_CACHE_MAX_ENTRIES", "10000")),
+            )
+        return _default_cache
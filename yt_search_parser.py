@@ -0,0 +1,165 @@
+"""
+YouTube Search Page Parser
+Extracts video candidates from a results page's ytInitialData in a single pass
+"""
+
+import json
+import re
+
+_INITIAL_DATA_MARKERS = (
+    "var ytInitialData = ",
+    'window["ytInitialData"] = ',
+    "ytInitialData = ",
+)
+_decoder = json.JSONDecoder()
+
+# Fallback for pages without parseable ytInitialData: one scan collects both
+# candidate IDs and the IDs that appear behind a /shorts/ link.
+_FALLBACK_PATTERN = re.compile(r'"videoId":"([a-zA-Z0-9_-]{11})"|/shorts/([a-zA-Z0-9_-]{11})')
+
+
+def extract_initial_data(html: str) -> dict | None:
+    """Decode the ytInitialData object embedded in a YouTube page.
+
+    Only the JSON object itself is decoded; the rest of the page is never
+    scanned past the marker.
+    """
+    for marker in _INITIAL_DATA_MARKERS:
+        idx = html.find(marker)
+        if idx == -1:
+            continue
+        try:
+            data, _ = _decoder.raw_decode(html, idx + len(marker))
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def _text(node) -> str | None:
+    """Flatten YouTube's {"simpleText": ...} / {"runs": [...]} text objects."""
+    if not isinstance(node, dict):
+        return None
+    if "simpleText" in node:
+        return node["simpleText"]
+    runs = node.get("runs")
+    if runs:
+        return "".join(run.get("text", "") for run in runs)
+    return None
+
+
+def _view_count(node) -> int | None:
+    text = _text(node)
+    if not text:
+        return None
+    digits = re.sub(r"[^0-9]", "", text)
+    return int(digits) if digits else None
+
+
+def _video_candidate(renderer: dict) -> dict | None:
+    video_id = renderer.get("videoId")
+    if not video_id:
+        return None
+    endpoint = renderer.get("navigationEndpoint") or {}
+    url = endpoint.get("commandMetadata", {}).get("webCommandMetadata", {}).get("url", "")
+    return {
+        "video_id": video_id,
+        "title": _text(renderer.get("title")),
+        "duration": _text(renderer.get("lengthText")),
+        "is_short": url.startswith("/shorts/") or "reelWatchEndpoint" in endpoint,
+        "channel": _text(renderer.get("ownerText") or renderer.get("longBylineText")),
+        "view_count": _view_count(renderer.get("viewCountText")),
+    }
+
+
+def _short_candidate(renderer: dict) -> dict | None:
+    # reelItemRenderer (older layout) or shortsLockupViewModel (current layout)
+    video_id = renderer.get("videoId")
+    if not video_id:
+        reel = (renderer.get("onTap", {}).get("innertubeCommand", {}).get("reelWatchEndpoint", {}))
+        video_id = reel.get("videoId")
+    if not video_id:
+        return None
+    title = _text(renderer.get("headline"))
+    if title is None:
+        title = renderer.get("overlayMetadata", {}).get("primaryText", {}).get("content")
+    return {
+        "video_id": video_id,
+        "title": title,
+        "duration": None,
+        "is_short": True,
+        "channel": None,
+        "view_count": _view_count(renderer.get("viewCountText")),
+    }
+
+
+def iter_candidates(data: dict):
+    """Yield candidate dicts in page order by walking only the result renderers."""
+    root = (data.get("contents", {})
+                .get("twoColumnSearchResultsRenderer", {})
+                .get("primaryContents")) or data
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if "videoRenderer" in node:
+                candidate = _video_candidate(node["videoRenderer"])
+            elif "reelItemRenderer" in node:
+                candidate = _short_candidate(node["reelItemRenderer"])
+            elif "shortsLockupViewModel" in node:
+                candidate = _short_candidate(node["shortsLockupViewModel"])
+            else:
+                stack.extend(reversed(list(node.values())))
+                continue
+            if candidate:
+                yield candidate
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+def _fallback_candidates(html: str) -> list[dict]:
+    ids: list[str] = []
+    shorts: set[str] = set()
+    for match in _FALLBACK_PATTERN.finditer(html):
+        if match.group(1):
+            ids.append(match.group(1))
+        else:
+            shorts.add(match.group(2))
+    return [
+        {"video_id": vid, "title": None, "duration": None, "is_short": vid in shorts,
+         "channel": None, "view_count": None}
+        for vid in dict.fromkeys(ids)
+    ]
+
+
+def parse_search_results(html: str, data: dict | None = None) -> list[dict]:
+    """Return de-duplicated video candidates from a search results page.
+
+    Each candidate has ``video_id``, ``title``, ``duration``, ``is_short``,
+    ``channel`` and ``view_count`` (fields other than the ID and ``is_short``
+    may be None). Pass ``data`` when ytInitialData was already extracted.
+    """
+    if data is None:
+        data = extract_initial_data(html)
+    if data is None:
+        return _fallback_candidates(html)
+    seen: set[str] = set()
+    candidates: list[dict] = []
+    for candidate in iter_candidates(data):
+        if candidate["video_id"] in seen:
+            continue
+        seen.add(candidate["video_id"])
+        candidates.append(candidate)
+    if not candidates:
+        # ytInitialData decoded but none of the known renderers matched (layout change)
+        return _fallback_candidates(html)
+    return candidates
+
+
+def first_long_form(candidates: list[dict], limit: int = 15) -> dict | None:
+    """First non-Shorts candidate among the top ``limit`` results."""
+    for candidate in candidates[:limit]:
+        if not candidate["is_short"]:
+            return candidate
+    return None